@@ -0,0 +1,234 @@
+"""
+Command-line entry point for headless use (servers, cron). Nothing here imports Tk,
+and each subcommand imports and loads only the models it needs:
+
+    python -m app.cli transcribe recording.wav --json
+    python -m app.cli batch *.wav -o batch_transcription.txt --workers 4
+    python -m app.cli analyze output_transcription.txt --audio recording.wav
+    python -m app.cli translate output_transcription.txt --to Hindi
+    python -m app.cli cache stats
+    python -m app.cli serve --port 8765
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+
+def _read_text(args):
+    if args.text is not None:
+        return args.text
+    with open(args.file, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _print_json(data):
+    json.dump(data, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write("\n")
+
+
+def cmd_transcribe(args):
+    from .core.cache import DEFAULT_CACHE_DIR
+    from .core.transcriber import AudioTranscriber, calculate_segment_confidence
+
+    transcriber = AudioTranscriber(
+        args.model, use_cache=not args.no_cache, cache_dir=args.cache_dir or DEFAULT_CACHE_DIR,
+        use_vad=not args.no_vad, long_file_workers=args.workers,
+    )
+    if not transcriber.is_available():
+        print("Error: Whisper model not loaded.", file=sys.stderr)
+        return 1
+
+    failed = 0
+    reports = []
+    for filepath in args.files:
+        output = transcriber.transcribe_audio(filepath, args.output_dir)
+        error = output[len("Error: "):].strip() if output.startswith("Error:") else None
+        failed += error is not None
+        if args.json:
+            reports.append({
+                "file": filepath,
+                "error": error,
+                "text": " ".join(s['text'].strip() for s in transcriber.last_segments),
+                "segments": [
+                    {"start": s['start'], "end": s['end'], "text": s['text'].strip(),
+                     "confidence": round(calculate_segment_confidence(s), 4)}
+                    for s in transcriber.last_segments
+                ],
+                "vad": transcriber.vad_stats,
+            })
+        else:
+            if len(args.files) > 1:
+                print(f"---- Transcription: {os.path.basename(filepath)} ----")
+            print(output.rstrip() + "\n")
+    if args.json:
+        _print_json(reports if len(reports) > 1 else reports[0])
+    return 1 if failed else 0
+
+
+def cmd_batch(args):
+    from .core.batch import BatchTranscriber
+    from .core.cache import DEFAULT_CACHE_DIR
+
+    def on_progress(done, total, filepath, error):
+        status = f"failed: {error}" if error else "done"
+        print(f"[{done}/{total}] {os.path.basename(filepath)} {status}", file=sys.stderr)
+
+    cache_dir = None if args.no_cache else (args.cache_dir or DEFAULT_CACHE_DIR)
+    engine = BatchTranscriber(args.model, args.workers, args.batch_size, cache_dir,
+                              prefetch=args.prefetch, decoders=args.decoders,
+                              prefetch_bytes=int(args.prefetch_mb * 1024 * 1024), use_vad=not args.no_vad)
+    summary = engine.run(args.files, args.output, on_progress=on_progress)
+    if args.json:
+        _print_json(summary)
+    else:
+        print(f"Transcribed {summary['succeeded']} files, skipped {summary['skipped']} already done, "
+              f"{summary['failed']} failed")
+        print(f"Output: {args.output}")
+        print(f"Throughput: {summary['throughput']:.1f} audio-hours per wall-hour on {summary['workers']} workers")
+    return 1 if summary['failed'] else 0
+
+
+def cmd_analyze(args):
+    text, segments = _read_text(args), None
+    if args.file and args.file.endswith(".json"):
+        # Output of `transcribe --json`: classify emotions per timed segment
+        data = json.loads(text)
+        if isinstance(data, list):
+            print(f"Error: {args.file} holds {len(data)} transcriptions; analyze one file at a time "
+                  f"(run `transcribe --json` on a single file)", file=sys.stderr)
+            return 2
+        text, segments = data["text"], data["segments"]
+    both = not (args.emotions or args.topics)
+    report = {}
+    if args.emotions or both:
+        from .core.emotion_analyzer import EmotionAnalyzer
+        analyzer = EmotionAnalyzer()
+        report["emotions"] = analyzer.analyze(text, args.audio, segments=segments)
+        if args.json and analyzer.last_emotion_timeline:
+            report["emotion_timeline"] = analyzer.last_emotion_timeline
+        if args.json and analyzer.last_audio_features:
+            report["voice"] = analyzer.last_audio_features
+    if args.topics or both:
+        from .core.text_analyzer import TextAnalyzer
+        analyzer = TextAnalyzer()
+        analysis = analyzer.analyze_text(text)
+        report["topics"] = analysis if args.json else analyzer.format_analysis_results(analysis)
+    if args.json:
+        _print_json(report)
+    else:
+        print("\n\n".join(report[k].strip() for k in ("emotions", "topics") if k in report))
+    return 0
+
+
+def cmd_translate(args):
+    from .core.translator import LANGUAGES, Translator
+
+    for lang in (args.source, args.target):
+        if lang not in LANGUAGES:
+            print(f"Error: unsupported language '{lang}'. Choose from: {', '.join(LANGUAGES)}", file=sys.stderr)
+            return 2
+    translated = Translator().translate(_read_text(args), args.source, args.target)
+    failed = translated.startswith(("Error:", "Translation failed:"))
+    if args.output and not failed:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(translated)
+    if args.json:
+        _print_json({"source": args.source, "target": args.target, "text": translated, "error": failed})
+    else:
+        print(translated)
+    return 1 if failed else 0
+
+
+def cmd_cache(args):
+    from .core import cache
+
+    argv = [args.command] + (["--dir", args.cache_dir] if args.cache_dir else [])
+    cache.main(argv)
+    return 0
+
+
+def cmd_serve(args):
+    from .service import server
+
+    return server.run(args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="whisper-transcriber", description="Headless transcription and analysis")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="Log progress (-vv for debug)")
+    sub = parser.add_subparsers(dest="subcommand", required=True)
+
+    def add_model_options(p):
+        p.add_argument("--model", default="small", help="Whisper model name (default: small)")
+        p.add_argument("--workers", type=int, default=None, help="Worker processes (default: half the cores)")
+        p.add_argument("--no-cache", action="store_true", help="Do not read or write the transcription cache")
+        p.add_argument("--cache-dir", default=None, help="Transcription cache directory")
+        p.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+
+    def add_text_input(p):
+        source = p.add_mutually_exclusive_group(required=True)
+        source.add_argument("file", nargs="?", help="Text file, e.g. output_transcription.txt")
+        source.add_argument("--text", help="Text to process instead of a file")
+        p.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+
+    p = sub.add_parser("transcribe", help="Transcribe audio files")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--output-dir", default=None, help="Where output_transcription.txt is written")
+    p.add_argument("--no-vad", action="store_true", help="Send silence to Whisper too")
+    add_model_options(p)
+    p.set_defaults(func=cmd_transcribe)
+
+    p = sub.add_parser("batch", help="Transcribe many files in parallel into one resumable output file")
+    p.add_argument("files", nargs="+")
+    p.add_argument("-o", "--output", default="batch_transcription.txt")
+    p.add_argument("--batch-size", type=int, default=1, help="Decode short clips together in batches")
+    p.add_argument("--no-vad", action="store_true", help="Send silence to Whisper too")
+    p.add_argument("--prefetch", type=int, default=4, help="Tasks decoded ahead of the model workers (0 disables)")
+    p.add_argument("--decoders", type=int, default=2, help="Decoder threads for --prefetch")
+    p.add_argument("--prefetch-mb", type=float, default=1024, help="Decoded audio held ahead at most (default: 1024)")
+    add_model_options(p)
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("analyze", help="Emotion and topic analysis of a transcription (text, or JSON from transcribe --json)")
+    add_text_input(p)
+    p.add_argument("--audio", default=None, help="Recording to add voice characteristics from")
+    p.add_argument("--emotions", action="store_true", help="Only emotion analysis")
+    p.add_argument("--topics", action="store_true", help="Only topic/entity analysis")
+    p.set_defaults(func=cmd_analyze)
+
+    p = sub.add_parser("translate", help="Translate a transcription with NLLB-200")
+    add_text_input(p)
+    p.add_argument("--from", dest="source", default="English")
+    p.add_argument("--to", dest="target", default="Hindi")
+    p.add_argument("-o", "--output", default=None, help="Also write the translation to this file")
+    p.set_defaults(func=cmd_translate)
+
+    p = sub.add_parser("cache", help="Inspect or purge the transcription cache")
+    p.add_argument("command", choices=["stats", "list", "purge"])
+    p.add_argument("--cache-dir", default=None)
+    p.set_defaults(func=cmd_cache)
+
+    p = sub.add_parser("serve", help="Run the local HTTP/WebSocket transcription service")
+    p.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: localhost only)")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--model", default="small", help="Whisper model name (default: small)")
+    p.add_argument("--max-queue", type=int, default=32, help="Requests waiting before 429 responses")
+    p.add_argument("--max-batch", type=int, default=8, help="Requests decoded together")
+    p.add_argument("--batch-wait", type=float, default=0.05, help="Seconds to wait for a batch to fill")
+    p.add_argument("--max-streams", type=int, default=4, help="Concurrent WebSocket sessions")
+    p.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Configure logging before app.core is imported: its modules call basicConfig at DEBUG
+    level = [logging.WARNING, logging.INFO, logging.DEBUG][min(args.verbose, 2)]
+    logging.basicConfig(level=level, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stderr)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
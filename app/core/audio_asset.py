@@ -0,0 +1,212 @@
+import atexit
+import collections
+import hashlib
+import logging
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from ..utils.dsp import resample
+
+SAMPLE_RATE = 16000
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # Decoded audio kept in RAM
+DEFAULT_MAX_MAPPED_BYTES = 8 * 1024 * 1024 * 1024  # Decoded audio kept in memory-mapped spill files
+DEFAULT_SPILL_BYTES = 64 * 1024 * 1024  # Views larger than this are memory-mapped
+DEFAULT_SPILL_DIR = os.path.join(os.path.expanduser("~"), ".cache", "whisper_transcriber", "audio")
+
+
+def decode_file(filepath):
+    """Decode a file at its own sample rate to mono float32. Returns (samples, rate)."""
+    try:
+        import soundfile as sf
+
+        data, rate = sf.read(filepath, dtype="float32", always_2d=True)
+        return np.ascontiguousarray(data.mean(axis=1) if data.shape[1] > 1 else data[:, 0]), rate
+    except Exception:
+        # mp3/m4a and anything else soundfile cannot read go through librosa (audioread/ffmpeg)
+        import librosa
+
+        data, rate = librosa.load(filepath, sr=None, mono=True)
+        return data.astype(np.float32), rate
+
+
+class AudioAsset:
+    """
+    One recording on disk. `samples(rate)` decodes the file once and memoizes a
+    read-only mono float32 view per sample rate in the owning AudioAssetStore.
+    """
+
+    def __init__(self, store, filepath):
+        self.store = store
+        self.filepath = os.path.abspath(filepath)
+        stat = os.stat(self.filepath)
+        # Rewriting the file (a new recording to output.wav) changes the key
+        self.key = hashlib.sha1(f"{self.filepath}|{stat.st_size}|{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+
+    def samples(self, rate=SAMPLE_RATE, keep=True):
+        return self.store.samples(self, rate, keep)
+
+    def duration(self):
+        return len(self.samples()) / SAMPLE_RATE
+
+
+class AudioAssetStore:
+    """
+    Decoded-audio cache shared by the transcriber, analyzers and batch code, so a
+    recording is decoded once per process however many components read it.
+
+    Views live in an LRU with two byte budgets. Views up to `spill_bytes` stay in RAM
+    and count against `max_bytes`; larger ones are written to a spill file and
+    memory-mapped, so the OS pages them in and out instead of holding them resident,
+    and count against `max_mapped_bytes`. The least recently used views are dropped
+    (and their spill files deleted) when a budget is exceeded.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_mapped_bytes=DEFAULT_MAX_MAPPED_BYTES,
+                 spill_bytes=DEFAULT_SPILL_BYTES, spill_dir=DEFAULT_SPILL_DIR):
+        self.max_bytes = max_bytes
+        self.max_mapped_bytes = max_mapped_bytes
+        self.spill_bytes = spill_bytes
+        # One directory per process: batch workers each keep their own store
+        self.spill_dir = os.path.join(spill_dir, str(os.getpid()))
+        self._views = collections.OrderedDict()  # (asset key, rate) -> (array, spill path or None)
+        self._resident = 0
+        self._mapped = 0
+        self._lock = threading.Lock()
+        self._loading = {}  # asset key -> Lock, so concurrent readers decode a file only once
+        self.hits = 0
+        self.misses = 0
+        atexit.register(self.clear)
+
+    def asset(self, filepath):
+        return AudioAsset(self, filepath)
+
+    def load(self, filepath, rate=SAMPLE_RATE, keep=True):
+        """
+        Shortcut for `asset(filepath).samples(rate)`. With `keep=False` a view that is not
+        cached yet is decoded for the caller only, for files read once (batch workers).
+        """
+        return self.asset(filepath).samples(rate, keep)
+
+    def put(self, filepath, samples, rate):
+        """Register audio that is already decoded (e.g. the recorder's 16 kHz copy) for `filepath`."""
+        asset = self.asset(filepath)
+        self._store(asset.key, rate, np.asarray(samples, dtype=np.float32))
+        return asset
+
+    def samples(self, asset, rate, keep=True):
+        view = self._get(asset.key, rate)
+        if view is not None:
+            return view
+        with self._lock:
+            loading = self._loading.setdefault(asset.key, threading.Lock())
+        with loading:
+            try:
+                # Another thread may have decoded it while this one waited
+                view = self._get(asset.key, rate)
+                if view is not None:
+                    return view
+                with self._lock:
+                    self.misses += 1
+                source = self._best_source(asset.key)
+                if source is None:
+                    logging.info(f"Decoding {asset.filepath}")
+                    data, native_rate = decode_file(asset.filepath)
+                    if keep and native_rate != rate:
+                        self._store(asset.key, native_rate, data)
+                else:
+                    data, native_rate = source
+                if native_rate != rate:
+                    data = resample(data, native_rate, rate)
+                return self._store(asset.key, rate, data) if keep else data
+            finally:
+                # Threads already waiting hold the lock object; later readers find the view
+                with self._lock:
+                    if self._loading.get(asset.key) is loading:
+                        del self._loading[asset.key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "views": len(self._views),
+                "resident_bytes": self._resident,
+                "mapped_bytes": self._mapped,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+            self._resident = self._mapped = 0
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def _get(self, key, rate):
+        with self._lock:
+            entry = self._views.get((key, rate))
+            if entry is None:
+                return None
+            self._views.move_to_end((key, rate))
+            self.hits += 1
+            return entry[0]
+
+    def _best_source(self, key):
+        """The highest-rate view of this asset already in memory, to resample from."""
+        with self._lock:
+            views = [(rate, entry[0]) for (k, rate), entry in self._views.items() if k == key]
+        if not views:
+            return None
+        rate, data = max(views, key=lambda view: view[0])
+        return data, rate
+
+    def _store(self, key, rate, data):
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        path = None
+        if data.nbytes > self.spill_bytes:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            path = os.path.join(self.spill_dir, f"{key}_{rate}.npy")
+            np.save(path, data)
+            data = np.load(path, mmap_mode="r")
+        else:
+            data.setflags(write=False)
+        evicted = []
+        with self._lock:
+            old = self._views.pop((key, rate), None)
+            if old is not None:
+                self._account(old, -1)
+            self._views[(key, rate)] = (data, path)
+            self._account((data, path), 1)
+            while len(self._views) > 1 and (self._resident > self.max_bytes or self._mapped > self.max_mapped_bytes):
+                _, entry = self._views.popitem(last=False)
+                self._account(entry, -1)
+                evicted.append(entry)
+        for _, spill_path in evicted:
+            if spill_path and spill_path != path:
+                # Arrays already handed out keep their mapping; on Windows the file stays until they are gone
+                try:
+                    os.remove(spill_path)
+                except OSError:
+                    pass
+        return data
+
+    def _account(self, entry, sign):
+        data, path = entry
+        if path:
+            self._mapped += sign * data.nbytes
+        else:
+            self._resident += sign * data.nbytes
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_store():
+    """The process-wide store every core component reads audio through."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = AudioAssetStore()
+        return _default_store
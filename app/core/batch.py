@@ -0,0 +1,333 @@
+import logging
+import os
+import threading
+import time
+
+import soundfile as sf
+
+from ..utils.processes import get_context, hidden_main_module
+from .transcriber import BATCHED_OPTIONS, TRANSCRIBE_OPTIONS, format_segments, load_audio
+from .cache import DEFAULT_CACHE_DIR, TranscriptionCache, hash_file
+from .batched_decoder import BatchedDecoder
+from .batch_manifest import DONE, FAILED, PENDING, BatchManifest
+from .stream_decode import STREAM_SECONDS, probe_duration, transcribe_stream
+from .vad import VAD_OPTIONS, apply_vad
+from .prefetch import DEFAULT_AHEAD, DEFAULT_DECODERS, DEFAULT_MAX_BYTES, DecodeAhead, read_shared
+
+# Model held by each pool worker process, loaded once by _init_worker
+_worker_model = None
+_worker_model_name = None
+_worker_error = None
+_worker_cache = None
+_worker_use_vad = True
+
+
+def default_workers():
+    """Half the cores: every worker holds its own model and runs two torch threads."""
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def audio_duration(filepath):
+    """Duration in seconds from the file header, falling back to file size for ordering."""
+    try:
+        return sf.info(filepath).duration
+    except Exception:
+        try:
+            # Compressed formats soundfile cannot read: ~16 KB/s is a typical speech bitrate
+            return os.path.getsize(filepath) / 16000
+        except OSError:
+            return 0.0
+
+
+def task_options(task_size, use_vad=True):
+    """
+    Decoding options of a task, also its cache identity: the same as single-file
+    transcription for one file, BATCHED_OPTIONS for bundled clips, tagged with the
+    VAD parameters when silence is cut out first.
+    """
+    options = TRANSCRIBE_OPTIONS if task_size == 1 else BATCHED_OPTIONS
+    return dict(options, vad=VAD_OPTIONS) if use_vad else options
+
+
+def _init_worker(model_name, threads, cache_dir, use_vad=True):
+    global _worker_model, _worker_error, _worker_model_name, _worker_cache, _worker_use_vad
+    import torch
+    import whisper
+
+    torch.set_num_threads(threads)
+    _worker_model_name = model_name
+    _worker_use_vad = use_vad
+    _worker_cache = TranscriptionCache(cache_dir) if cache_dir else None
+    # A failing initializer makes Pool respawn workers forever; report it per task instead
+    try:
+        _worker_model = whisper.load_model(model_name)
+    except Exception as e:
+        _worker_error = f"Error loading Whisper model: {e}"
+
+
+def _new_result(index, filepath):
+    return {"index": index, "filepath": filepath, "text": None, "confidence": None,
+            "audio_seconds": 0.0, "error": None}
+
+
+def _apply_segments(result, segments):
+    if not segments:
+        result["error"] = "No speech detected in the audio file."
+    else:
+        result["text"], result["confidence"], _ = format_segments(segments)
+
+
+def _transcribe_files(task):
+    """
+    Runs in a pool worker. A task is a list of (index, filepath, shm_name, n_samples,
+    content_hash); a single file is transcribed normally, several short files are
+    decoded together in one batch. Files decoded ahead by DecodeAhead are read from
+    shared memory, and a content hash it already computed is reused for the cache key.
+    """
+    results = [_new_result(index, filepath) for index, filepath, _, _, _ in task]
+    shared = {index: (shm_name, n_samples) for index, _, shm_name, n_samples, _ in task if shm_name}
+    hashes = {index: content_hash for index, _, _, _, content_hash in task}
+    if _worker_model is None:
+        for result in results:
+            result["error"] = _worker_error
+        return results
+
+    options = task_options(len(results), _worker_use_vad)
+    audios = []
+    for result in results:
+        try:
+            key = None
+            if _worker_cache:
+                content_hash = hashes[result["index"]] or hash_file(result["filepath"])
+                key = _worker_cache.key(content_hash, _worker_model_name, options)
+                cached = _worker_cache.get(key)
+                if cached is not None:
+                    result["audio_seconds"] = cached.get('duration', 0.0)
+                    _apply_segments(result, cached.get('segments', []))
+                    continue
+            if result["index"] in shared:
+                audio = read_shared(*shared[result["index"]])
+            elif len(results) == 1 and (probe_duration(result["filepath"]) or 0) > STREAM_SECONDS:
+                # Multi-hour file: decode and transcribe it window by window
+                output, vad_stats, result["audio_seconds"] = transcribe_stream(
+                    _worker_model.transcribe, result["filepath"], TRANSCRIBE_OPTIONS, _worker_use_vad)
+                if vad_stats:
+                    output = dict(output, vad=vad_stats)
+                if key:
+                    _worker_cache.put(key, dict(output, duration=result["audio_seconds"]))
+                _apply_segments(result, output.get('segments', []))
+                continue
+            else:
+                # Each file is read once per run; don't let it push others out of the store
+                audio = load_audio(result["filepath"], keep=False)
+            result["audio_seconds"] = len(audio) / 16000
+            time_map = vad_stats = None
+            if _worker_use_vad:
+                # The same silence trimming as single-file transcription, so both give the same text
+                audio, time_map, vad_stats = apply_vad(audio)
+                if not len(audio):
+                    _apply_segments(result, [])
+                    continue
+            audios.append((result, audio, key, time_map, vad_stats))
+        except Exception as e:
+            result["error"] = str(e)
+
+    try:
+        if not audios:
+            outputs = []
+        elif len(results) == 1:
+            outputs = [_worker_model.transcribe(audio, **TRANSCRIBE_OPTIONS) for _, audio, _, _, _ in audios]
+        else:
+            decoder = BatchedDecoder(_worker_model, batch_size=len(audios))
+            outputs = decoder.transcribe_many([audio for _, audio, _, _, _ in audios])
+        for (result, _, key, time_map, vad_stats), output in zip(audios, outputs):
+            if time_map is not None:
+                output = dict(time_map.remap(output), vad=vad_stats)
+            if key:
+                _worker_cache.put(key, dict(output, duration=result["audio_seconds"]))
+            _apply_segments(result, output.get('segments', []))
+    except Exception as e:
+        for result, _, _, _, _ in audios:
+            result["error"] = str(e)
+    return results
+
+
+def _make_tasks(filepaths, batch_size, durations=None):
+    """
+    Longest files first, one per task. With batch_size > 1, files no longer than one
+    30-second window are bundled so a worker decodes them in a single batch.
+    `durations` maps paths to seconds already read from their headers.
+    """
+    durations = durations or {}
+    timed = sorted(((durations.get(p) or audio_duration(p), i, p) for i, p in enumerate(filepaths)), reverse=True)
+    tasks = []
+    short = []
+    for duration, index, filepath in timed:
+        if batch_size > 1 and duration <= 30:
+            short.append((index, filepath))
+        else:
+            tasks.append([(index, filepath)])
+    tasks.extend(short[i:i + batch_size] for i in range(0, len(short), batch_size))
+    return tasks
+
+
+def format_result(result):
+    """The same text transcribe_audio() returns: transcript, blank line, confidence details."""
+    return f"{result['text']}\n\n{result['confidence']}"
+
+
+class BatchTranscriber:
+    """
+    Transcribes many files in parallel across worker processes, each holding its own model.
+
+    Files are handed out longest first from a single shared queue, so one long file
+    does not end up as the tail of the batch while other workers sit idle. With
+    `batch_size` > 1, short clips are grouped and decoded together (see BatchedDecoder).
+    With `use_vad`, silence is cut out before decoding exactly as in single-file
+    transcription, so both give the same text and share cache entries.
+
+    Progress is checkpointed in a BatchManifest next to the output file: each finished
+    file is recorded as soon as its result arrives, and running the same batch again
+    only transcribes the files that have not finished yet.
+
+    With `prefetch` > 0, `decoders` threads in this process decode the next `prefetch`
+    tasks into shared memory while the workers run the model (see DecodeAhead), holding
+    at most `prefetch_bytes` of decoded audio, so workers never wait on a decode.
+    """
+
+    def __init__(self, model_name="small", workers=None, batch_size=1, cache_dir=DEFAULT_CACHE_DIR,
+                 prefetch=DEFAULT_AHEAD, decoders=DEFAULT_DECODERS, prefetch_bytes=DEFAULT_MAX_BYTES, use_vad=True):
+        self.model_name = model_name
+        self.workers = workers or default_workers()
+        self.batch_size = batch_size
+        self.cache_dir = cache_dir  # None disables the result cache
+        self.use_vad = use_vad
+        self.prefetch = prefetch
+        self.decoders = decoders
+        self.prefetch_bytes = prefetch_bytes
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop a running batch. Finished files stay recorded and are skipped next time."""
+        self._cancelled.set()
+
+    def run(self, filepaths, output_file, on_progress=None):
+        """
+        Transcribe `filepaths` and rebuild `output_file` from every finished file, in order.
+
+        `on_progress(done, total, filepath, error)` is called as each file finishes.
+        Returns a summary dict including throughput in audio-hours per wall-hour.
+        """
+        self._cancelled.clear()
+        filepaths = list(filepaths)
+        total = len(filepaths)
+        started = time.monotonic()
+
+        manifest = BatchManifest(output_file)
+        entries = manifest.add(filepaths)
+        pending = []
+        results = [None] * total
+        for i, entry in enumerate(entries):
+            if entry["status"] == PENDING or (entry["status"] == FAILED and os.path.exists(entry["filepath"])):
+                pending.append((i, entry["filepath"]))  # Earlier failures are retried
+            elif entry["status"] == FAILED:
+                results[i] = dict(_new_result(i, entry["filepath"]), error=entry["error"])
+        skipped = sum(1 for e in entries if e["status"] == DONE)
+        if skipped:
+            logging.info(f"Skipping {skipped} files already transcribed in {manifest.path}")
+
+        # Longest first: the shared queue hands the next task to whichever worker is free
+        durations = {p: audio_duration(p) for _, p in pending}
+        tasks = _make_tasks([p for _, p in pending], self.batch_size, durations)
+        tasks = [[(pending[j][0], p) for j, p in task] for task in tasks]
+        workers = max(1, min(self.workers, len(tasks)))
+        threads = max(1, (os.cpu_count() or 2) // workers)
+
+        done = total - len(pending)
+        cancelled = False
+        prefetcher = None
+        if tasks and self.prefetch > 0:
+            prefetcher = DecodeAhead(tasks, self._decode_ahead_filter(), durations.get, workers,
+                                     self.prefetch, self.decoders, self.prefetch_bytes)
+            work = prefetcher
+        else:
+            work = [[(index, p, None, 0, None) for index, p in task] for task in tasks]
+        try:
+            if tasks:
+                logging.info(f"Batch transcription of {len(pending)} files on {workers} worker processes")
+                ctx = get_context()
+                with hidden_main_module():
+                    pool = ctx.Pool(workers, initializer=_init_worker,
+                                    initargs=(self.model_name, threads, self.cache_dir, self.use_vad))
+                try:
+                    for task_results in pool.imap_unordered(_transcribe_files, work, chunksize=1):
+                        for result in task_results:
+                            if prefetcher:
+                                prefetcher.release(result["index"])
+                            done += 1
+                            results[result["index"]] = result
+                            entry = entries[result["index"]]
+                            if result["error"]:
+                                logging.error(f"Error transcribing {result['filepath']}: {result['error']}")
+                                manifest.mark_failed(entry, result["error"])
+                            else:
+                                manifest.mark_done(entry, format_result(result))
+                            if on_progress:
+                                on_progress(done, total, result["filepath"], result["error"])
+                        if self._cancelled.is_set():
+                            cancelled = True
+                            logging.info("Batch transcription cancelled")
+                            break
+                finally:
+                    if prefetcher:
+                        # Unblocks the pool's task feeder and frees audio no worker will read
+                        prefetcher.close()
+                    if cancelled:
+                        pool.terminate()
+                    else:
+                        pool.close()
+                    pool.join()
+        finally:
+            # Also after a cancel or error: the output always matches the manifest
+            manifest.write_output()
+
+        processed = [r for r in results if r is not None]
+        wall_seconds = time.monotonic() - started
+        audio_seconds = sum(r["audio_seconds"] for r in processed)
+        failed = sum(1 for r in processed if r["error"])
+        summary = {
+            "files": total,
+            "succeeded": sum(1 for r in processed if not r["error"]),
+            "failed": failed,
+            "skipped": skipped,
+            "cancelled": cancelled,
+            "results": processed,
+            "audio_seconds": audio_seconds,
+            "wall_seconds": wall_seconds,
+            "throughput": audio_seconds / wall_seconds if wall_seconds else 0.0,
+            "workers": workers,
+            "decode_seconds": prefetcher.decode_seconds if prefetcher else 0.0,
+            "manifest": manifest.path,
+        }
+        logging.info(
+            f"Batch finished: {summary['succeeded']} transcribed, {skipped} already done, {failed} failed "
+            f"of {total} files; {audio_seconds / 3600:.2f} audio-hours in {wall_seconds / 3600:.2f} wall-hours "
+            f"({summary['throughput']:.1f} audio-hours per wall-hour)"
+        )
+        return summary
+
+    def _decode_ahead_filter(self):
+        """Which files DecodeAhead decodes: not cache hits, not multi-hour files that stream."""
+        cache = TranscriptionCache(self.cache_dir) if self.cache_dir else None
+
+        def inspect(filepath, task_size):
+            # The same test _transcribe_files uses to stream a file instead of decoding it
+            if task_size == 1 and (probe_duration(filepath) or 0) > STREAM_SECONDS:
+                return False, None
+            if not cache:
+                return True, None
+            content_hash = hash_file(filepath)
+            options = task_options(task_size, self.use_vad)
+            return cache.get(cache.key(content_hash, self.model_name, options)) is None, content_hash
+
+        return inspect
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+def _atomic_write(path, text):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class BatchManifest:
+    """
+    Checkpoint of a batch transcription job, stored next to its output file.
+
+    Every file gets an entry with its status and the path of its own transcript part.
+    Entries are identified by path, size and mtime, so a restarted batch skips files
+    that already finished while edited files run again. The combined output file is
+    always rebuilt from the finished parts in order, never appended to, so a crash or
+    cancel can't leave duplicate sections behind.
+    """
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.path = output_file + ".manifest.json"
+        self.parts_dir = output_file + ".parts"
+        self.entries = []
+        self._by_id = {}
+        if os.path.exists(self.path):
+            self._load()
+        else:
+            self._adopt_legacy_output()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)["entries"]
+        except Exception as e:
+            logging.error(f"Error reading batch manifest {self.path}: {e}")
+            self.entries = []
+        self._by_id = {entry["id"]: entry for entry in self.entries}
+
+    def _adopt_legacy_output(self):
+        """Keep sections written before manifests existed at the top of the rebuilt file."""
+        if not os.path.exists(self.output_file):
+            return
+        os.makedirs(self.parts_dir, exist_ok=True)
+        legacy = os.path.join(self.parts_dir, "legacy.txt")
+        shutil.copyfile(self.output_file, legacy)
+        entry = {"id": "legacy", "filepath": None, "status": DONE, "output": legacy, "error": None, "raw": True}
+        self.entries.append(entry)
+        self._by_id[entry["id"]] = entry
+        self.save()
+
+    @staticmethod
+    def file_id(filepath):
+        st = os.stat(filepath)
+        key = f"{os.path.abspath(filepath)}|{st.st_size}|{int(st.st_mtime)}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+    def add(self, filepaths):
+        """
+        Register files (keeping existing entries) and return the entries of `filepaths`
+        in the given order. Files that cannot be read get a FAILED entry.
+        """
+        selected = []
+        for filepath in filepaths:
+            try:
+                entry_id = self.file_id(filepath)
+            except OSError as e:
+                entry_id = hashlib.sha1(os.path.abspath(filepath).encode("utf-8")).hexdigest()[:16]
+                entry = self._by_id.get(entry_id) or self._new_entry(entry_id, filepath)
+                entry.update(status=FAILED, error=str(e))
+                selected.append(entry)
+                continue
+            entry = self._by_id.get(entry_id) or self._new_entry(entry_id, filepath)
+            selected.append(entry)
+        self.save()
+        return selected
+
+    def _new_entry(self, entry_id, filepath):
+        entry = {"id": entry_id, "filepath": filepath, "status": PENDING, "output": None, "error": None}
+        self.entries.append(entry)
+        self._by_id[entry_id] = entry
+        return entry
+
+    def mark_done(self, entry, text):
+        os.makedirs(self.parts_dir, exist_ok=True)
+        part = os.path.join(self.parts_dir, f"{entry['id']}.txt")
+        _atomic_write(part, text)
+        entry.update(status=DONE, output=part, error=None)
+        self.save()
+
+    def mark_failed(self, entry, error):
+        entry.update(status=FAILED, error=error)
+        self.save()
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _atomic_write(self.path, json.dumps({"entries": self.entries}, indent=2))
+
+    def write_output(self):
+        """Rebuild the combined output from finished parts, in registration order."""
+        sections = []
+        for entry in self.entries:
+            if entry["status"] != DONE or not entry["output"]:
+                continue
+            try:
+                with open(entry["output"], "r", encoding="utf-8") as f:
+                    text = f.read()
+            except OSError as e:
+                logging.error(f"Missing transcript part {entry['output']}: {e}")
+                entry["status"] = PENDING
+                continue
+            if entry.get("raw"):
+                sections.append(text)
+            else:
+                sections.append(f"---- Transcription: {os.path.basename(entry['filepath'])} ----\n{text}\n\n")
+        _atomic_write(self.output_file, "".join(sections))
+        self.save()
+
+    def counts(self):
+        counts = {PENDING: 0, DONE: 0, FAILED: 0}
+        for entry in self.entries:
+            if entry["filepath"] is not None:
+                counts[entry["status"]] += 1
+        return counts
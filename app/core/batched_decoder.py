@@ -0,0 +1,155 @@
+import logging
+
+import numpy as np
+import torch
+import whisper
+from whisper.audio import HOP_LENGTH, N_FRAMES, N_SAMPLES, SAMPLE_RATE
+from whisper.tokenizer import get_tokenizer
+
+TIME_PRECISION = 0.02  # Seconds per timestamp token
+
+
+class _Source:
+    """Decoding state of one file or chunk: where the next window starts and what was found."""
+
+    def __init__(self, index, audio):
+        self.index = index
+        self.audio = audio
+        self.seek = 0  # Next window start, in samples
+        self.segments = []
+
+    @property
+    def finished(self):
+        # Whisper ignores trailing fragments shorter than one mel frame step
+        return len(self.audio) - self.seek < HOP_LENGTH * 2
+
+
+class BatchedDecoder:
+    """
+    Decodes 30-second windows from many sources in a single encoder/decoder batch.
+
+    Each round takes the next window of up to `batch_size` unfinished sources,
+    stacks their log-mel spectrograms and runs one `whisper.decode` call. Timestamp
+    tokens are split into segments, shifted by the window offset and scattered back
+    to their source. Like `model.transcribe`, a source's next window starts at the
+    last complete timestamp, so words are not cut at window edges.
+    """
+
+    def __init__(self, model, batch_size=8, language='en'):
+        self.model = model
+        self.batch_size = batch_size
+        self.language = language
+        self.options = whisper.DecodingOptions(
+            language=language, task="transcribe", temperature=0.0,
+            without_timestamps=False, fp16=model.device.type != "cpu",
+        )
+        try:
+            self.tokenizer = get_tokenizer(
+                model.is_multilingual, num_languages=model.num_languages, language=language, task="transcribe"
+            )
+        except TypeError:
+            # Older whisper releases do not take num_languages
+            self.tokenizer = get_tokenizer(model.is_multilingual, language=language, task="transcribe")
+
+    def transcribe_many(self, audios):
+        """
+        Transcribe a list of 16 kHz float32 arrays. Returns one Whisper-style result dict
+        per input, in input order, each with 'text', 'segments' and 'language'.
+        """
+        sources = [_Source(i, np.asarray(a, dtype=np.float32)) for i, a in enumerate(audios)]
+        active = [s for s in sources if not s.finished]
+        rounds = 0
+        while active:
+            batch, active = active[:self.batch_size], active[self.batch_size:]
+            self._decode_round(batch)
+            # Unfinished sources rejoin at the back so every source keeps making progress
+            active.extend(s for s in batch if not s.finished)
+            rounds += 1
+        logging.info(f"Batched decoding of {len(sources)} sources finished in {rounds} rounds")
+        return [self._result(s) for s in sources]
+
+    def _decode_round(self, batch):
+        mels = []
+        for source in batch:
+            window = whisper.pad_or_trim(source.audio[source.seek:source.seek + N_SAMPLES])
+            mel = whisper.log_mel_spectrogram(window, n_mels=self.model.dims.n_mels)
+            mels.append(whisper.pad_or_trim(mel, N_FRAMES))
+        mel_batch = torch.stack(mels).to(self.model.device)
+        if self.options.fp16:
+            mel_batch = mel_batch.half()
+
+        results = whisper.decode(self.model, mel_batch, self.options)
+        for source, result in zip(batch, results):
+            self._apply(source, result)
+
+    def _apply(self, source, result):
+        window_samples = min(N_SAMPLES, len(source.audio) - source.seek)
+        offset = source.seek / SAMPLE_RATE
+
+        # Same silence rule as model.transcribe: skip the whole window
+        if result.no_speech_prob > 0.6 and result.avg_logprob < -1.0:
+            source.seek += window_samples
+            return
+
+        segments, consumed = self._split_segments(result.tokens, window_samples / SAMPLE_RATE)
+        for start, end, tokens in segments:
+            text = self.tokenizer.decode(tokens)
+            if not text.strip():
+                continue
+            source.segments.append({
+                'id': len(source.segments),
+                'seek': source.seek // HOP_LENGTH,
+                'start': round(offset + start, 3),
+                'end': round(offset + end, 3),
+                'text': text,
+                'tokens': tokens,
+                'temperature': self.options.temperature,
+                'avg_logprob': result.avg_logprob,
+                'compression_ratio': result.compression_ratio,
+                'no_speech_prob': result.no_speech_prob,
+            })
+        # Advance to the last complete timestamp, never by less than one mel step
+        source.seek += max(int(consumed * SAMPLE_RATE), HOP_LENGTH * 2)
+
+    def _split_segments(self, tokens, window_seconds):
+        """
+        Split decoded tokens into (start, end, text_tokens) at timestamp tokens.
+        Returns the segments and how many seconds of the window they account for.
+        """
+        timestamp_begin = self.tokenizer.timestamp_begin
+        segments = []
+        start = None
+        text_tokens = []
+        last_closed = 0.0
+        for token in tokens:
+            if token >= timestamp_begin:
+                time = (token - timestamp_begin) * TIME_PRECISION
+                if start is not None and text_tokens:
+                    segments.append((start, time, text_tokens))
+                    last_closed = time
+                    text_tokens = []
+                    start = None
+                else:
+                    start = time
+            elif token < self.tokenizer.eot:
+                text_tokens.append(token)
+
+        final_window = window_seconds * SAMPLE_RATE < N_SAMPLES
+        if text_tokens:
+            if segments and not final_window:
+                # The last segment was cut off by the window edge: decode it again next round
+                return segments, last_closed
+            segments.append((start if start is not None else last_closed, window_seconds, text_tokens))
+            return segments, window_seconds
+        if start is not None and segments and not final_window:
+            # Ends on an opening timestamp: speech continues past the window edge
+            return segments, last_closed
+        # Ends on a closed segment (or found nothing): the whole window is done
+        return segments, window_seconds
+
+    def _result(self, source):
+        return {
+            'text': "".join(s['text'] for s in source.segments),
+            'segments': source.segments,
+            'language': self.language,
+        }
@@ -0,0 +1,161 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "whisper_transcriber", "transcriptions")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def hash_file(filepath, block_size=1024 * 1024):
+    """SHA-256 of the file contents, so renamed or copied files share an entry."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return "file:" + digest.hexdigest()
+
+
+def hash_array(audio):
+    """SHA-256 of an in-memory float32 recording, hashed without copying."""
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+    return "pcm:" + hashlib.sha256(memoryview(audio).cast("B")).hexdigest()
+
+
+def _to_builtin(value):
+    # Whisper results can contain numpy scalars and arrays
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class TranscriptionCache:
+    """
+    Persistent transcription results keyed by audio content, model and decoding options.
+
+    Each entry is the full Whisper result (segments and words) stored as JSON. Entries
+    are written atomically, so several worker processes can share one directory. A hit
+    refreshes the entry's mtime and the oldest entries are evicted once the directory
+    grows past `max_bytes`.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, content_hash, model_name, options):
+        payload = json.dumps({"audio": content_hash, "model": model_name, "options": options}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path)  # Mark as recently used for LRU eviction
+            logging.info(f"Transcription cache hit ({key[:12]})")
+            return result
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.error(f"Error reading transcription cache entry {path}: {e}")
+            return None
+
+    def put(self, key, result):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f, default=_to_builtin)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.error(f"Error writing transcription cache entry {path}: {e}")
+            return
+        self.evict()
+
+    def entries(self):
+        """List (path, size, mtime) for every entry, oldest first."""
+        found = []
+        for dirpath, _, filenames in os.walk(self.directory):
+            for name in filenames:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue  # Evicted by another process
+                found.append((path, st.st_size, st.st_mtime))
+        return sorted(found, key=lambda e: e[2])
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        if removed:
+            logging.info(f"Evicted {removed} transcription cache entries")
+        return removed
+
+    def stats(self):
+        entries = self.entries()
+        return {
+            "directory": self.directory,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+    def purge(self):
+        removed = 0
+        for path, _, _ in self.entries():
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        logging.info(f"Purged {removed} transcription cache entries")
+        return removed
+
+
+def main(argv=None):
+    """Inspect or purge the cache: python -m app.core.cache {stats,list,purge}"""
+    parser = argparse.ArgumentParser(description="Inspect or purge the transcription cache")
+    parser.add_argument("command", choices=["stats", "list", "purge"])
+    parser.add_argument("--dir", default=DEFAULT_CACHE_DIR, help="Cache directory")
+    args = parser.parse_args(argv)
+
+    cache = TranscriptionCache(args.dir)
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"Directory: {stats['directory']}")
+        print(f"Entries:   {stats['entries']}")
+        print(f"Size:      {stats['bytes'] / 1024 / 1024:.1f} MB of {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+    elif args.command == "list":
+        for path, size, _ in reversed(cache.entries()):
+            print(f"{os.path.basename(path)[:-5]}  {size / 1024:.1f} KB")
+    else:
+        print(f"Removed {cache.purge()} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+import pyaudio
+
+# Drop policies applied when a subscriber's queue is full
+DROP_OLDEST = "drop_oldest"  # Discard the oldest queued buffer (live views, meters)
+DROP_NEWEST = "drop_newest"  # Discard the incoming buffer
+BLOCK = "block"  # Wait up to `block_timeout` for space, then drop the incoming buffer
+
+
+class Subscription:
+    """A bounded queue of captured buffers owned by a single consumer."""
+
+    def __init__(self, engine, name, maxsize, drop_policy, block_timeout=0.5):
+        if drop_policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.engine = engine
+        self.name = name
+        self.drop_policy = drop_policy
+        self.block_timeout = block_timeout
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.closed = False
+        self._pump_thread = None
+
+    def put(self, buffer):
+        """Called from the capture thread; never blocks longer than `block_timeout`."""
+        if self.drop_policy == BLOCK:
+            try:
+                self.queue.put(buffer, timeout=self.block_timeout)
+            except queue.Full:
+                self.dropped += 1
+        elif self.drop_policy == DROP_NEWEST:
+            try:
+                self.queue.put_nowait(buffer)
+            except queue.Full:
+                self.dropped += 1
+        else:
+            while True:
+                try:
+                    self.queue.put_nowait(buffer)
+                    return
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def get(self, timeout=None):
+        """Return the next buffer, or None if nothing arrived within `timeout`."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def __iter__(self):
+        """Yield buffers until the subscription is closed and fully drained."""
+        while True:
+            buffer = self.get(timeout=0.1)
+            if buffer is not None:
+                yield buffer
+            elif self.closed:
+                return
+
+    def pump(self, callback):
+        """Deliver every buffer to `callback` on a dedicated daemon thread."""
+        def run():
+            for buffer in self:
+                try:
+                    callback(buffer)
+                except Exception as e:
+                    logging.error(f"Error in capture subscriber '{self.name}': {e}")
+
+        self._pump_thread = threading.Thread(target=run, daemon=True)
+        self._pump_thread.start()
+        return self
+
+    def close(self, wait=False):
+        self.engine.unsubscribe(self)
+        if wait and self._pump_thread:
+            self._pump_thread.join()
+
+
+class CaptureEngine:
+    """
+    Reads the input device once and fans each buffer out to any number of subscribers.
+
+    The device stream is opened when the first subscriber arrives and closed when the
+    last one leaves, so the recorder, waveform view and live transcriber all share a
+    single PyAudio instance and a single input stream.
+
+    Capture runs in PyAudio callback mode. The callback only copies samples into a
+    preallocated ring buffer (single producer, single consumer, no locks), so a busy
+    GIL cannot stall the device. A dispatcher thread drains the ring in `chunk_size`
+    buffers and publishes them. Overflows, dropped frames and callback timing are
+    counted so lost audio is visible in `stats()`.
+    """
+
+    def __init__(self, rate=44100, channels=1, chunk_size=1024, ring_seconds=10):
+        self.audio = pyaudio.PyAudio()
+        self.format = pyaudio.paInt16
+        self.rate = rate
+        self.channels = channels
+        self.chunk_size = chunk_size
+        self.stream = None
+        self.subscribers = []
+        self.running = False
+        self._lock = threading.Lock()
+        self._thread = None
+        self._data_ready = threading.Event()
+
+        self._ring = np.zeros(rate * ring_seconds * channels, dtype=np.int16)
+        self._write_pos = 0  # Total samples written; only the callback advances it
+        self._read_pos = 0  # Total samples published; only the dispatcher advances it
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.frames_captured = 0
+        self.input_overflows = 0
+        self.dropped_frames = 0
+        self.max_callback_ms = 0.0
+        self.max_input_latency_ms = 0.0
+        self.ring_high_water = 0
+
+    def stats(self):
+        """Counters for the current (or last) capture session."""
+        return {
+            "frames_captured": self.frames_captured,
+            "input_overflows": self.input_overflows,
+            "dropped_frames": self.dropped_frames,
+            "max_callback_ms": round(self.max_callback_ms, 3),
+            "max_input_latency_ms": round(self.max_input_latency_ms, 3),
+            "ring_high_water": round(self.ring_high_water / len(self._ring), 3),
+            "subscriber_drops": {s.name: s.dropped for s in self.subscribers},
+        }
+
+    def subscribe(self, name, maxsize=64, drop_policy=DROP_OLDEST):
+        subscription = Subscription(self, name, maxsize, drop_policy)
+        with self._lock:
+            if not self.running:
+                self._open()
+            self.subscribers.append(subscription)
+        logging.info(f"Capture subscriber '{name}' attached ({drop_policy}, max {maxsize} buffers)")
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription not in self.subscribers:
+                return
+            last = len(self.subscribers) == 1
+        if last:
+            # Close while still attached so the tail of the ring reaches this subscriber
+            self._close()
+        with self._lock:
+            self.subscribers.remove(subscription)
+        subscription.closed = True
+        if subscription.dropped:
+            logging.warning(f"Capture subscriber '{subscription.name}' dropped {subscription.dropped} buffers")
+
+    def _open(self):
+        self._write_pos = self._read_pos = 0
+        self._reset_stats()
+        self.running = True
+        try:
+            self.stream = self.audio.open(
+                format=self.format,
+                channels=self.channels,
+                rate=self.rate,
+                input=True,
+                frames_per_buffer=self.chunk_size,
+                stream_callback=self._callback,
+            )
+        except Exception as e:
+            self.running = False
+            logging.error(f"Error opening capture stream: {e}")
+            raise RuntimeError(f"Error opening capture stream: {e}")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logging.info("Capture stream opened")
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        started = time.perf_counter()
+        if status & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        if time_info and time_info.get("input_buffer_adc_time"):
+            latency = (time_info["current_time"] - time_info["input_buffer_adc_time"]) * 1000
+            self.max_input_latency_ms = max(self.max_input_latency_ms, latency)
+
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        size = len(self._ring)
+        used = self._write_pos - self._read_pos
+        if len(samples) > size - used:
+            # Consumers fell a whole ring behind; drop the new block rather than corrupt unread audio
+            self.dropped_frames += frame_count
+        else:
+            start = self._write_pos % size
+            first = min(len(samples), size - start)
+            self._ring[start:start + first] = samples[:first]
+            self._ring[:len(samples) - first] = samples[first:]
+            self._write_pos += len(samples)
+            self.frames_captured += frame_count
+            self.ring_high_water = max(self.ring_high_water, used + len(samples))
+            self._data_ready.set()
+
+        self.max_callback_ms = max(self.max_callback_ms, (time.perf_counter() - started) * 1000)
+        return (None, pyaudio.paContinue)
+
+    def _run(self):
+        block = self.chunk_size * self.channels
+        size = len(self._ring)
+        while True:
+            running = self.running
+            self._data_ready.wait(timeout=0.05)
+            self._data_ready.clear()
+            available = self._write_pos - self._read_pos
+            # Publish whole chunks while running, everything that is left once stopped
+            while available >= block or (not running and available > 0):
+                n = min(block, available)
+                start = self._read_pos % size
+                index = (start + np.arange(n)) % size
+                buffer = self._ring[index]  # Fancy indexing copies out of the ring
+                with self._lock:
+                    subscribers = list(self.subscribers)
+                for subscription in subscribers:
+                    subscription.put(buffer)
+                self._read_pos += n
+                available -= n
+            if not running:
+                break
+
+    def _close(self):
+        self.running = False
+        if self.stream:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        self._data_ready.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        stats = self.stats()
+        logging.info(
+            f"Capture stream closed: {stats['frames_captured']} frames, "
+            f"{stats['input_overflows']} overflows, {stats['dropped_frames']} dropped frames, "
+            f"max callback {stats['max_callback_ms']} ms"
+        )
+        if stats['input_overflows'] or stats['dropped_frames']:
+            logging.warning("Audio was lost during capture, see CaptureEngine.stats()")
+
+    def terminate(self):
+        for subscription in list(self.subscribers):
+            self.unsubscribe(subscription)
+        self.audio.terminate()
@@ -1,14 +1,69 @@
 import logging
 from transformers import pipeline
-import librosa
 import numpy as np
+from app.core import prosody
+from app.core.audio_asset import get_store
+from app.utils.helpers import format_time
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 3.0
+HOP_SECONDS = 1.0
+FAST_SPEAKING_RATE = 5.5  # Syllables per second of voiced audio
+MIN_RATE_SPEECH_SECONDS = 0.5  # Less speech than this gives no meaningful speaking rate
+WINDOW_TOKENS = 256  # Text windows when there are no segments; the model takes at most 512
+BATCH_SIZE = 32
 
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+def window_features(pitch, energy, voiced, onsets, frame_rate, speech=None,
+                    window_seconds=WINDOW_SECONDS, hop_seconds=HOP_SECONDS):
+    """
+    Aggregate frame-level features into overlapping windows. Means and deviations come
+    from cumulative sums, so the cost is linear in the number of frames however many
+    windows overlap them.
+    """
+    n = len(energy)
+    width = max(1, int(round(window_seconds * frame_rate)))
+    step = hop_seconds * frame_rate
+    # The last window is pulled back so it ends with the recording
+    count = int(np.ceil(max(n - width, 0) / step)) + 1
+    starts = np.minimum(np.round(np.arange(count) * step).astype(int), max(n - width, 0))
+    ends = np.minimum(starts + width, n)
+
+    def window_sums(values):
+        cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+        return cumulative[ends] - cumulative[starts]
+
+    voiced_pitch = np.where(voiced, pitch, 0.0)
+    count = window_sums(voiced.astype(np.float64))
+    safe = np.maximum(count, 1)
+    pitch_mean = window_sums(voiced_pitch) / safe
+    pitch_var = np.maximum(window_sums(voiced_pitch ** 2) / safe - pitch_mean ** 2, 0.0)
+    energy_mean = window_sums(energy) / (ends - starts)
+    onset_count = np.searchsorted(onsets, ends) - np.searchsorted(onsets, starts)
+    # Speaking rate counts pauses between words as speaking time, long silences not
+    speech_seconds = window_sums((voiced if speech is None else speech).astype(np.float64)) / frame_rate
+
+    return [
+        {
+            'start': round(float(starts[i] / frame_rate), 3),
+            'end': round(float(ends[i] / frame_rate), 3),
+            'pitch_mean': float(pitch_mean[i]) if count[i] else 0.0,
+            'pitch_std': float(np.sqrt(pitch_var[i])) if count[i] else 0.0,
+            'energy_mean': float(energy_mean[i]),
+            'voiced_ratio': float(count[i] / (ends[i] - starts[i])),
+            # Syllable nuclei per second of speech
+            'speaking_rate': float(onset_count[i] / speech_seconds[i]) if speech_seconds[i] >= MIN_RATE_SPEECH_SECONDS else 0.0,
+        }
+        for i in range(len(starts))
+    ]
+
 class EmotionAnalyzer:
     def __init__(self):
+        self.last_audio_features = None
+        self.last_emotion_timeline = None
         try:
             # Initialize text emotion analyzer
             self.text_classifier = pipeline(
@@ -21,30 +76,106 @@ class EmotionAnalyzer:
             logging.error(f"Error initializing emotion analyzer: {e}")
             self.text_classifier = None
 
-    def extract_audio_features(self, audio_path):
-        """Extract audio features using librosa"""
+    def extract_audio_features(self, audio_path=None, audio=None, sr=SAMPLE_RATE):
+        """
+        Prosody over the whole recording: pitch, energy and speaking rate per window of
+        WINDOW_SECONDS every HOP_SECONDS, plus summary values across all windows. Pass
+        `audio` (mono float32 at `sr`) to reuse samples that are already decoded.
+        """
         try:
-            # Load audio
-            y, sr = librosa.load(audio_path, duration=3)
-            
-            # Extract features
-            pitch = librosa.yin(y, fmin=librosa.note_to_hz('C2'), 
-                              fmax=librosa.note_to_hz('C7'))
-            energy = librosa.feature.rms(y=y)
-            tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-            
+            if audio is None:
+                # Usually already decoded by the transcriber or registered by the recorder
+                audio, sr = get_store().load(audio_path, SAMPLE_RATE), SAMPLE_RATE
+            y = np.asarray(audio, dtype=np.float32)
+            if len(y) < prosody.FRAME_SECONDS * sr:
+                logging.warning("Recording too short for voice analysis")
+                return None
+
+            # Frame-level features over the entire signal
+            frames = prosody.extract(y, sr)
+            pitch, energy, voiced, speech = frames['pitch'], frames['energy'], frames['voiced'], frames['speech']
+            frame_rate = frames['frame_rate']
+
+            timeline = window_features(pitch, energy, voiced, frames['onsets'], frame_rate, speech)
+            voiced_pitch = pitch[voiced]
+            duration = len(y) / sr
+            speech_seconds = speech.sum() / frame_rate
             return {
-                'pitch_mean': np.mean(pitch),
-                'pitch_std': np.std(pitch),
-                'energy_mean': np.mean(energy),
-                'tempo': tempo
+                'pitch_mean': float(voiced_pitch.mean()) if len(voiced_pitch) else 0.0,
+                'pitch_std': float(voiced_pitch.std()) if len(voiced_pitch) else 0.0,
+                'energy_mean': float(energy.mean()),
+                'speaking_rate': len(frames['onsets']) / speech_seconds if speech_seconds >= MIN_RATE_SPEECH_SECONDS else 0.0,
+                'duration': duration,
+                'timeline': timeline,
             }
         except Exception as e:
             logging.error(f"Error extracting audio features: {e}")
             return None
 
-    def analyze(self, text, audio_path=None):
-        """Analyze emotions from both text and audio if available"""
+    def text_windows(self, text, max_tokens=WINDOW_TOKENS):
+        """Split text into pieces of at most `max_tokens` model tokens, cut on token boundaries."""
+        tokenizer = self.text_classifier.tokenizer
+        encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        offsets = encoding['offset_mapping']
+        windows = []
+        for start in range(0, len(offsets), max_tokens):
+            chunk = offsets[start:start + max_tokens]
+            piece = text[chunk[0][0]:chunk[-1][1]].strip()
+            if piece:
+                windows.append({'start': None, 'end': None, 'text': piece, 'tokens': len(chunk)})
+        return windows
+
+    def classify_segments(self, segments, batch_size=BATCH_SIZE):
+        """
+        Emotion scores for every segment (dicts with 'text' and optionally 'start'/'end'),
+        plus a duration-weighted aggregate. Texts are sorted by length and sent through the
+        pipeline in batches, so each batch is padded only to its own longest text;
+        repeated texts are classified once.
+        """
+        items = [dict(start=s.get('start'), end=s.get('end'), text=s['text'].strip()) for s in segments]
+        items = [item for item in items if item['text']]
+        if not items:
+            # Nothing was said: no scores to weigh, the text is neutral
+            return {'segments': [], 'aggregate': {'neutral': 1.0}, 'weighting': 'length'}
+        unique = sorted(set(item['text'] for item in items), key=len)
+        scores = {}
+        for i in range(0, len(unique), batch_size):
+            batch = unique[i:i + batch_size]
+            results = self.text_classifier(batch, batch_size=len(batch), top_k=None, truncation=True)
+            for text, result in zip(batch, results):
+                scores[text] = {r['label']: r['score'] for r in result}
+
+        labels = sorted({label for result in scores.values() for label in result})
+        matrix = np.array([[scores[item['text']].get(label, 0.0) for label in labels] for item in items])
+        timed = all(item['start'] is not None and item['end'] is not None for item in items)
+        if timed:
+            weights = np.array([max(item['end'] - item['start'], 0.0) for item in items])
+        else:
+            weights = np.array([len(item['text']) for item in items], dtype=float)
+        if not weights.sum():
+            weights = np.ones(len(items))
+        aggregate = (weights @ matrix) / weights.sum()
+
+        timeline = []
+        for item, row in zip(items, matrix):
+            emotions = {label: round(float(score), 4) for label, score in zip(labels, row)}
+            timeline.append(dict(item, emotions=emotions, top=max(emotions, key=emotions.get)))
+        return {
+            'segments': timeline,
+            'aggregate': {label: round(float(score), 4) for label, score in zip(labels, aggregate)},
+            'weighting': 'duration' if timed else 'length',
+        }
+
+    def analyze(self, text, audio_path=None, audio=None, sr=SAMPLE_RATE, segments=None):
+        """
+        Analyze emotions from both text and audio if available. Text is classified per
+        Whisper segment when `segments` are given, else per token-bounded window, so long
+        recordings are scored in full; the per-segment timeline of the last call is kept in
+        `last_emotion_timeline`. `audio` (mono float32 at `sr`) is used instead of decoding
+        `audio_path` again; the voice timeline is kept in `last_audio_features`.
+        """
+        self.last_audio_features = None
+        self.last_emotion_timeline = None
         try:
             if not self.text_classifier:
                 return "Error: Emotion analyzer not initialized."
@@ -52,17 +183,19 @@ class EmotionAnalyzer:
             analysis = []  # Store analysis results
             
             # Text analysis
-            text_results = self.text_classifier(text)[0]
+            emotion_timeline = self.classify_segments(segments or self.text_windows(text))
+            self.last_emotion_timeline = emotion_timeline
+            text_results = sorted(emotion_timeline['aggregate'].items(), key=lambda item: -item[1])[:3]
             analysis.append("\nText-based Emotions:")
-            for result in text_results:
-                emotion = result['label']
-                confidence = result['score']
+            for emotion, confidence in text_results:
                 percentage = round(confidence * 100, 1)
                 analysis.append(f"- {emotion}: {percentage}%")
+            analysis.extend(self.format_emotion_shifts(emotion_timeline['segments']))
             
             # Audio analysis if available
-            if audio_path:
-                audio_features = self.extract_audio_features(audio_path)
+            if audio is not None or audio_path:
+                audio_features = self.extract_audio_features(audio_path, audio, sr)
+                self.last_audio_features = audio_features
                 if audio_features:
                     analysis.append("\nVoice Characteristics:")
                     
@@ -79,13 +212,44 @@ class EmotionAnalyzer:
                         analysis.append("- Low energy level detected (possible calmness/sadness)")
                     
                     # Analyze speaking rate
-                    if audio_features['tempo'] > 120:
+                    if audio_features['speaking_rate'] > FAST_SPEAKING_RATE:
                         analysis.append("- Fast speaking rate detected (possible excitement/anxiety)")
                     else:
                         analysis.append("- Normal/slow speaking rate detected (possible confidence/sadness)")
+
+                    analysis.extend(self.format_timeline_highlights(audio_features['timeline']))
             
             return "\n".join(analysis)
             
         except Exception as e:
             logging.error(f"Error during emotion analysis: {e}")
-            return "Error: Could not analyze emotions."
\ No newline at end of file
+            return "Error: Could not analyze emotions."
+
+    def format_emotion_shifts(self, segments, count=5):
+        """The strongest non-neutral moments of a timed emotion timeline."""
+        timed = [s for s in segments if s['start'] is not None and s['top'] != 'neutral']
+        if len(segments) < 2 or not timed:
+            return []
+        strongest = sorted(timed, key=lambda s: -s['emotions'][s['top']])[:count]
+        lines = [f"\nEmotion Timeline ({len(segments)} segments, strongest moments):"]
+        for s in sorted(strongest, key=lambda s: s['start']):
+            snippet = s['text'] if len(s['text']) <= 60 else s['text'][:57] + "..."
+            lines.append(f"- {format_time(s['start'])}: {s['top']} ({s['emotions'][s['top']]:.0%}) \"{snippet}\"")
+        return lines
+
+    def format_timeline_highlights(self, timeline, count=3):
+        """The most animated stretches of the recording (by energy and pitch movement)."""
+        windows = [w for w in timeline if w['voiced_ratio'] >= 0.3]
+        if len(windows) < 2:
+            return []
+        energy = np.array([w['energy_mean'] for w in windows])
+        movement = np.array([w['pitch_std'] for w in windows])
+        score = energy / (energy.mean() or 1) + movement / (movement.mean() or 1)
+        lines = [f"\nVoice Timeline ({len(timeline)} windows, most animated moments):"]
+        for i in sorted(np.argsort(score)[::-1][:count]):
+            w = windows[i]
+            lines.append(
+                f"- {format_time(w['start'])}-{format_time(w['end'])}: pitch {w['pitch_mean']:.0f} Hz "
+                f"(±{w['pitch_std']:.0f}), {w['speaking_rate']:.1f} syllables/s"
+            )
+        return lines
@@ -0,0 +1,163 @@
+import logging
+import re
+import threading
+
+import numpy as np
+from ..utils.dsp import StreamingResampler, int16_to_float32
+
+
+class LiveTranscriber:
+    """
+    Transcribes audio incrementally while it is still being recorded.
+
+    Captured PCM chunks are appended to a sliding window that a background worker
+    re-decodes every `step_seconds`. Words that two consecutive hypotheses agree on
+    are committed and reported once; the unstable tail is reported as tentative text
+    and decoded again as more context arrives. Committed audio is trimmed from the
+    front of the window so decode cost stays bounded during long sessions.
+    """
+
+    TARGET_RATE = 16000
+
+    def __init__(self, transcriber, source_rate=44100, on_update=None, language='en',
+                 step_seconds=1.0, max_window_seconds=20.0):
+        self.transcriber = transcriber
+        self.source_rate = source_rate
+        self.on_update = on_update
+        self.language = language
+        self.step_seconds = step_seconds
+        self.max_window_seconds = max_window_seconds
+
+        self._resampler = StreamingResampler(source_rate, self.TARGET_RATE)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = []
+        self._window = np.zeros(0, dtype=np.float32)
+        self._window_offset = 0.0  # Recording time (seconds) of the first window sample
+        self._committed = []
+        self._previous_hypothesis = []
+        self._tentative = []
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logging.info("Live transcription started")
+
+    def feed(self, data):
+        """Queue a chunk of int16 mono samples captured at `source_rate`."""
+        with self._lock:
+            self._pending.append(data)
+
+    def stop(self):
+        """Stop the worker, commit whatever is left and return the full transcript."""
+        if not self._running:
+            return self.committed_text
+        self._running = False
+        self._wakeup.set()
+        self._thread.join()
+        self._decode(final=True)
+        logging.info("Live transcription stopped")
+        return self.committed_text
+
+    @property
+    def committed_text(self):
+        return "".join(w['word'] for w in self._committed).strip()
+
+    def _run(self):
+        while self._running:
+            self._wakeup.wait(timeout=self.step_seconds)
+            self._wakeup.clear()
+            if not self._running:
+                break
+            try:
+                self._decode()
+            except Exception as e:
+                logging.error(f"Error during live transcription: {e}")
+
+    def _take_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        samples = self._resampler.process(int16_to_float32(np.concatenate(pending)))
+        self._window = np.concatenate([self._window, samples])
+
+    def _decode(self, final=False):
+        self._take_pending()
+        if len(self._window) < self.TARGET_RATE * 0.5:
+            if final:
+                self._publish(self._tentative, [])
+            return
+
+        prompt = self.committed_text[-200:] or None
+        result = self.transcriber.run_model(
+            self._window, language=self.language, word_timestamps=True,
+            condition_on_previous_text=False, initial_prompt=prompt,
+        )
+        hypothesis = self._hypothesis_words(result)
+
+        if final:
+            self._publish(hypothesis, [])
+            return
+
+        # Commit the longest prefix the last two hypotheses agree on
+        agreed = 0
+        for new, old in zip(hypothesis, self._previous_hypothesis):
+            if _normalize(new['word']) != _normalize(old['word']):
+                break
+            agreed += 1
+        newly_committed, tentative = hypothesis[:agreed], hypothesis[agreed:]
+
+        # Never let the window grow past its limit: force out everything but the last second
+        trim_until = newly_committed[-1]['end'] if newly_committed else None
+        window_seconds = len(self._window) / self.TARGET_RATE
+        if window_seconds > self.max_window_seconds:
+            horizon = self._window_offset + window_seconds - 1.0
+            forced = [w for w in tentative if w['end'] <= horizon]
+            newly_committed += forced
+            tentative = tentative[len(forced):]
+            # Silence and noise have no words to commit: drop their audio anyway, but keep
+            # a word that straddles the horizon whole
+            trim_until = min([horizon] + [w['start'] for w in tentative[:1]])
+            if newly_committed:
+                trim_until = max(trim_until, newly_committed[-1]['end'])
+
+        self._publish(newly_committed, tentative)
+        self._previous_hypothesis = tentative
+
+        if trim_until is not None:
+            self._trim_window(trim_until)
+
+    def _hypothesis_words(self, result):
+        committed_end = self._committed[-1]['end'] if self._committed else 0.0
+        words = []
+        for segment in result.get('segments', []):
+            for word in segment.get('words', []):
+                start = word['start'] + self._window_offset
+                end = word['end'] + self._window_offset
+                # Whisper sometimes repeats words that were already committed at the window edge
+                if end <= committed_end + 0.05:
+                    continue
+                words.append({'word': word['word'], 'start': start, 'end': end})
+        return words
+
+    def _trim_window(self, until):
+        drop = int((until - self._window_offset) * self.TARGET_RATE)
+        drop = max(0, min(drop, len(self._window)))
+        self._window = self._window[drop:]
+        self._window_offset += drop / self.TARGET_RATE
+
+    def _publish(self, newly_committed, tentative):
+        self._committed.extend(newly_committed)
+        self._tentative = tentative
+        if self.on_update:
+            committed_text = "".join(w['word'] for w in newly_committed)
+            tentative_text = "".join(w['word'] for w in tentative)
+            self.on_update(committed_text, tentative_text)
+
+
+def _normalize(word):
+    return re.sub(r"[^\w']", "", word.lower())
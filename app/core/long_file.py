@@ -0,0 +1,229 @@
+import collections
+import logging
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ..utils.processes import get_context, hidden_main_module
+from .vad import SAMPLE_RATE, detect_speech
+
+# Model held by each pool worker process, loaded once by _init_worker
+_worker_model = None
+_worker_error = None
+
+
+def find_pauses(audio, sample_rate=SAMPLE_RATE):
+    """Sample positions in the middle of every pause between detected speech regions."""
+    regions = detect_speech(audio, sample_rate)
+    if len(regions) < 2:
+        return np.zeros(0, dtype=np.int64)
+    return (regions[:-1, 1] + regions[1:, 0]) // 2
+
+
+def plan_chunks(n_samples, pauses, max_chunk_samples, overlap_samples):
+    """
+    Split [0, n_samples) into chunks no longer than `max_chunk_samples`.
+
+    Each cut goes at the last pause that fits, as long as it leaves the chunk at least
+    half full; without one the chunk is cut hard and both neighbours overlap by
+    `overlap_samples` around the cut. Returns (start, end, own_start, own_end) per chunk:
+    the audio to decode and the part of it this chunk is responsible for.
+    """
+    pauses = np.sort(np.asarray(pauses, dtype=np.int64))
+    cuts = [(0, 0)]  # (position, overlap on each side)
+    position = 0
+    while n_samples - position > max_chunk_samples:
+        limit = position + max_chunk_samples
+        fitting = pauses[(pauses > position + max_chunk_samples // 2) & (pauses <= limit)]
+        if len(fitting):
+            cut, overlap = int(fitting[-1]), 0
+        else:
+            cut, overlap = limit - overlap_samples, overlap_samples
+        cuts.append((cut, overlap))
+        position = cut
+    cuts.append((n_samples, 0))
+
+    chunks = []
+    for (own_start, left), (own_end, right) in zip(cuts, cuts[1:]):
+        chunks.append((max(own_start - left, 0), min(own_end + right, n_samples), own_start, own_end))
+    return chunks
+
+
+def stitch(chunk_results, chunks, sample_rate=SAMPLE_RATE):
+    """
+    Merge per-chunk Whisper results into one ordered segment list on the full timeline.
+
+    A word belongs to the chunk whose own range contains its midpoint, so words decoded
+    twice in an overlap are kept once. Segments without word timings use their midpoint.
+    """
+    segments = []
+    for result, (start, _, own_start, own_end) in zip(chunk_results, chunks):
+        offset = start / sample_rate
+        low, high = own_start / sample_rate, own_end / sample_rate
+
+        def owned(item):
+            return low <= offset + (item['start'] + item['end']) / 2 < high
+
+        for segment in result.get('segments', []):
+            segment = dict(segment, start=round(offset + segment['start'], 3), end=round(offset + segment['end'], 3))
+            words = segment.get('words')
+            if words:
+                words = [dict(w, start=round(offset + w['start'], 3), end=round(offset + w['end'], 3))
+                         for w in words if owned(w)]
+                if not words:
+                    continue
+                segment.update(words=words, start=words[0]['start'], end=words[-1]['end'],
+                               text="".join(w['word'] for w in words))
+            elif not low <= (segment['start'] + segment['end']) / 2 < high:
+                continue
+            segment['id'] = len(segments)
+            segments.append(segment)
+    language = next((r.get('language') for r in chunk_results if r.get('language')), None)
+    return {'text': "".join(s['text'] for s in segments), 'segments': segments, 'language': language}
+
+
+def _init_worker(model_name, threads):
+    global _worker_model, _worker_error
+    import torch
+    import whisper
+
+    torch.set_num_threads(threads)
+    # A failing initializer makes Pool respawn workers forever; report it per task instead
+    try:
+        _worker_model = whisper.load_model(model_name)
+    except Exception as e:
+        _worker_error = f"Error loading Whisper model: {e}"
+
+
+def _transcribe_chunk(task):
+    """Runs in a pool worker: decode one chunk of the shared recording."""
+    index, shm_name, n_samples, start, end, options = task
+    if _worker_model is None:
+        return index, None, _worker_error
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # Copy only this chunk out of the shared block: the full recording is never pickled
+        audio = np.array(np.ndarray((n_samples,), dtype=np.float32, buffer=shm.buf)[start:end])
+    finally:
+        shm.close()
+    try:
+        return index, _worker_model.transcribe(audio, **options), None
+    except Exception as e:
+        return index, None, str(e)
+
+
+class LongFileTranscriber:
+    """
+    Transcribes one long recording on several cores at once.
+
+    The audio is split at pauses into bounded chunks (see plan_chunks), placed once in
+    shared memory, and decoded by a pool of worker processes that each hold a model.
+    Chunks are sized so there are at least two per worker, which keeps every core busy
+    until the end; the results are stitched back into one Whisper-style result.
+    """
+
+    def __init__(self, model_name="small", workers=None, max_chunk_seconds=300, min_chunk_seconds=60,
+                 overlap_seconds=1.0):
+        self.model_name = model_name
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.max_chunk_seconds = max_chunk_seconds
+        self.min_chunk_seconds = min_chunk_seconds
+        self.overlap_seconds = overlap_seconds
+
+    def transcribe(self, audio, pauses=None, **options):
+        """
+        Transcribe a 16 kHz float32 array. `pauses` are candidate cut positions in samples;
+        they are detected from the audio when not given.
+        """
+        started = time.monotonic()
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        if pauses is None:
+            pauses = find_pauses(audio)
+
+        duration = len(audio) / SAMPLE_RATE
+        chunk_seconds = min(max(duration / (self.workers * 2), self.min_chunk_seconds), self.max_chunk_seconds)
+        chunks = plan_chunks(len(audio), pauses, int(chunk_seconds * SAMPLE_RATE),
+                             int(self.overlap_seconds * SAMPLE_RATE))
+        workers = min(self.workers, len(chunks))
+        threads = max(1, (os.cpu_count() or 2) // workers)
+        logging.info(f"Long-file mode: {duration / 60:.1f} min in {len(chunks)} chunks on {workers} processes")
+
+        shm = shared_memory.SharedMemory(create=True, size=max(audio.nbytes, 1))
+        try:
+            np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+            tasks = [(i, shm.name, len(audio), start, end, options) for i, (start, end, _, _) in enumerate(chunks)]
+            results = [None] * len(chunks)
+            ctx = get_context()
+            with hidden_main_module():
+                pool = ctx.Pool(workers, initializer=_init_worker, initargs=(self.model_name, threads))
+            try:
+                for index, result, error in pool.imap_unordered(_transcribe_chunk, tasks, chunksize=1):
+                    if error:
+                        raise RuntimeError(f"Chunk {index + 1}/{len(chunks)} failed: {error}")
+                    results[index] = result
+            finally:
+                pool.terminate()
+                pool.join()
+        finally:
+            shm.close()
+            shm.unlink()
+
+        stitched = stitch(results, chunks)
+        wall_seconds = time.monotonic() - started
+        logging.info(f"Long-file mode finished in {wall_seconds:.1f}s ({duration / wall_seconds:.1f}x real time)")
+        return stitched
+
+    def transcribe_windows(self, windows, **options):
+        """
+        Transcribe audio that arrives one window at a time (see stream_decode.iter_windows)
+        on the worker pool. Each window gets its own shared memory block and at most two
+        per worker are decoded and waiting, so memory is bounded by the window size rather
+        than the recording. Returns one result per window, in order; empty windows get an
+        empty result without a trip to the pool.
+        """
+        started = time.monotonic()
+        workers = self.workers
+        threads = max(1, (os.cpu_count() or 2) // workers)
+        results = []
+        in_flight = collections.deque()  # (index, AsyncResult, SharedMemory)
+        ctx = get_context()
+        with hidden_main_module():
+            pool = ctx.Pool(workers, initializer=_init_worker, initargs=(self.model_name, threads))
+
+        def collect():
+            index, pending, shm = in_flight.popleft()
+            try:
+                _, result, error = pending.get()
+            finally:
+                shm.close()
+                shm.unlink()
+            if error:
+                raise RuntimeError(f"Window {index + 1} failed: {error}")
+            results[index] = result
+
+        try:
+            for index, audio in enumerate(windows):
+                results.append({'segments': []})
+                if not len(audio):
+                    continue
+                if len(in_flight) >= 2 * workers:
+                    collect()
+                audio = np.ascontiguousarray(audio, dtype=np.float32)
+                shm = shared_memory.SharedMemory(create=True, size=audio.nbytes)
+                np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+                task = (index, shm.name, len(audio), 0, len(audio), options)
+                in_flight.append((index, pool.apply_async(_transcribe_chunk, (task,)), shm))
+            while in_flight:
+                collect()
+        finally:
+            pool.terminate()
+            pool.join()
+            for _, _, shm in in_flight:
+                shm.close()
+                shm.unlink()
+
+        logging.info(f"Long-file mode finished {len(results)} streamed windows on {workers} processes "
+                     f"in {time.monotonic() - started:.1f}s")
+        return results
@@ -0,0 +1,206 @@
+import collections
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .stream_decode import expected_samples, iter_blocks
+from .vad import SAMPLE_RATE
+
+DEFAULT_AHEAD = 4
+DEFAULT_DECODERS = 2
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # Decoded audio waiting for (or in) a model worker
+GROW_SECONDS = 60  # First block size when the header does not give the length
+
+
+def decode_to_shared(filepath):
+    """
+    Decode a file to 16 kHz mono float32 in a new shared memory block. Returns
+    (SharedMemory, n_samples); the caller unlinks the block.
+
+    The block is sized from the header and every decoded block is written straight
+    into it, so the file is never held twice. If a compressed file's header was short,
+    the block is regrown (the only time a copy is made).
+    """
+    capacity = max(expected_samples(filepath) or int(GROW_SECONDS * SAMPLE_RATE), 1)
+    shm = shared_memory.SharedMemory(create=True, size=capacity * 4)
+    audio = np.ndarray((capacity,), dtype=np.float32, buffer=shm.buf)
+    position = 0
+    try:
+        for block in iter_blocks(filepath):
+            if position + len(block) > capacity:
+                capacity = max(2 * capacity, position + len(block))
+                bigger = shared_memory.SharedMemory(create=True, size=capacity * 4)
+                grown = np.ndarray((capacity,), dtype=np.float32, buffer=bigger.buf)
+                grown[:position] = audio[:position]
+                del audio
+                _unlink(shm)
+                shm, audio = bigger, grown
+            audio[position:position + len(block)] = block
+            position += len(block)
+    except BaseException:
+        del audio
+        _unlink(shm)
+        raise
+    del audio
+    return shm, position
+
+
+def read_shared(shm_name, n_samples):
+    """Copy audio placed by decode_to_shared out of its shared memory block."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        return np.array(np.ndarray((n_samples,), dtype=np.float32, buffer=shm.buf))
+    finally:
+        shm.close()
+
+
+class DecodeAhead:
+    """
+    Decodes batch tasks ahead of the model workers.
+
+    Iterating yields the tasks in order, each file as (index, filepath, shm_name,
+    n_samples, content_hash), while a thread pool of `decoders` decodes upcoming tasks
+    into shared memory; soundfile, ffmpeg and the numpy resampler all run outside the GIL, so
+    decoding overlaps with inference in the worker processes. Pool.imap pulls tasks as
+    fast as they are yielded, so a task counts as outstanding from submission until
+    every file in it is released: at most `workers` running plus `ahead` decoded or
+    decoding are outstanding at once.
+
+    `inspect(filepath, task_size)` returns (decode, content_hash). Files it declines
+    (cache hits, streamed multi-hour files) are passed through with shm_name None and
+    handled by the worker as before; the content hash, if it computed one for the cache
+    lookup, travels with the task so the worker does not read the file again for it.
+
+    Decoded audio counts against `max_bytes` until `release(index)` is called for the
+    file's result; decoding pauses while the budget is used up, but one task is always
+    let through so a file larger than the budget still runs.
+    """
+
+    def __init__(self, tasks, inspect, estimate_seconds, workers, ahead=DEFAULT_AHEAD,
+                 decoders=DEFAULT_DECODERS, max_bytes=DEFAULT_MAX_BYTES):
+        self.tasks = tasks
+        self.workers = max(1, workers)
+        self.inspect = inspect
+        self.estimate_seconds = estimate_seconds
+        self.ahead = max(1, ahead)
+        self.decoders = max(1, decoders)
+        self.max_bytes = max_bytes
+        self._shared = {}  # file index -> SharedMemory
+        self._reserved = {}  # file index -> bytes counted against the budget
+        self._in_flight = 0
+        self._task_of = {}  # file index -> task number, until the file is released
+        self._unreleased = {}  # task number -> files not released yet
+        self._closed = False
+        self._condition = threading.Condition()
+        self.decode_seconds = 0.0  # Spent decoding in the background, summed over decoders
+
+    def __iter__(self):
+        executor = ThreadPoolExecutor(self.decoders, thread_name_prefix="decode-ahead")
+        futures = collections.deque()
+        pending = collections.deque(enumerate(self.tasks))
+        try:
+            while (futures or pending) and not self._closed:
+                while pending and self._has_slot() and self._reserve(*pending[0]):
+                    _, task = pending.popleft()
+                    futures.append(executor.submit(self._prepare, task))
+                if not futures:
+                    # Workers and look-ahead slots are full, or the budget is: wait for a result
+                    with self._condition:
+                        self._condition.wait(0.5)
+                    continue
+                prepared = futures.popleft().result()
+                if not self._closed:
+                    yield prepared
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def release(self, index):
+        """The result for file `index` arrived: free its audio, budget and task slot."""
+        self._free(index)
+        with self._condition:
+            number = self._task_of.pop(index, None)
+            if number is not None:
+                self._unreleased[number] -= 1
+                if not self._unreleased[number]:
+                    del self._unreleased[number]
+                self._condition.notify_all()
+
+    def _has_slot(self):
+        with self._condition:
+            return len(self._unreleased) < self.workers + self.ahead
+
+    def _free(self, index):
+        with self._condition:
+            self._in_flight -= self._reserved.pop(index, 0)
+            shm = self._shared.pop(index, None)
+            self._condition.notify_all()
+        if shm is not None:
+            _unlink(shm)
+
+    def close(self):
+        """Stop decoding and free every block not released yet (cancel or error)."""
+        with self._condition:
+            self._closed = True
+            shared, self._shared = list(self._shared.values()), {}
+            self._reserved.clear()
+            self._in_flight = 0
+            self._task_of.clear()
+            self._unreleased.clear()
+            self._condition.notify_all()
+        for shm in shared:
+            _unlink(shm)
+
+    def _reserve(self, number, task):
+        wanted = {index: self.estimate_seconds(filepath) * SAMPLE_RATE * 4 for index, filepath in task}
+        needed = sum(wanted.values())
+        with self._condition:
+            if self._in_flight and self._in_flight + needed > self.max_bytes:
+                return False
+            self._reserved.update(wanted)
+            self._in_flight += needed
+            self._task_of.update((index, number) for index, _ in task)
+            self._unreleased[number] = len(task)
+            return True
+
+    def _prepare(self, task):
+        return [self._prepare_file(index, filepath, len(task)) for index, filepath in task]
+
+    def _prepare_file(self, index, filepath, task_size):
+        started = time.monotonic()
+        content_hash = None
+        try:
+            if self._closed:
+                self._free(index)
+                return index, filepath, None, 0, None
+            decode, content_hash = self.inspect(filepath, task_size)
+            if not decode:
+                self._free(index)
+                return index, filepath, None, 0, content_hash
+            shm, n_samples = decode_to_shared(filepath)
+        except Exception as e:
+            # The worker decodes it again and reports the error with the result
+            logging.warning(f"Decode-ahead failed for {filepath}: {e}")
+            self._free(index)
+            return index, filepath, None, 0, content_hash
+        with self._condition:
+            self.decode_seconds += time.monotonic() - started
+            if not self._closed:
+                self._shared[index] = shm
+                # Correct the header estimate now the real size is known
+                self._in_flight += shm.size - self._reserved.get(index, 0)
+                self._reserved[index] = shm.size
+                return index, filepath, shm.name, n_samples, content_hash
+        _unlink(shm)
+        return index, filepath, None, 0, content_hash
+
+
+def _unlink(shm):
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
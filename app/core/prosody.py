@@ -0,0 +1,152 @@
+import logging
+
+import numpy as np
+
+from app.core.vad import detect_speech
+from app.utils.dsp import resample
+
+SAMPLE_RATE = 16000
+PITCH_RATE = 8000  # Speech F0 needs far less bandwidth; halves the YIN work
+FRAME_SECONDS = 0.064
+HOP_SECONDS = 0.016
+FMIN = 65.0  # C2
+FMAX = 1000.0
+YIN_THRESHOLD = 0.15
+VOICED_APERIODICITY = 0.3  # Frames whose best YIN dip is above this are unvoiced
+VOICED_RMS = 0.01
+SYLLABLE_GAP_SECONDS = 0.1  # At most ~10 syllables per second
+SYLLABLE_PROMINENCE_DB = 3.0
+
+
+def frame_view(samples, frame_length, hop_length):
+    """(n_frames, frame_length) strided view of `samples`; nothing is copied."""
+    if len(samples) < frame_length:
+        return np.zeros((0, frame_length), dtype=samples.dtype)
+    return np.lib.stride_tricks.sliding_window_view(samples, frame_length)[::hop_length]
+
+
+def frame_rms(samples, frame_length, hop_length):
+    """RMS of every frame, reduced straight from the strided view."""
+    frames = frame_view(samples, frame_length, hop_length)
+    return np.sqrt(np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / frame_length)
+
+
+def yin(samples, sample_rate, frame_length, hop_length, fmin=FMIN, fmax=FMAX,
+        threshold=YIN_THRESHOLD, block_frames=4096):
+    """
+    Vectorized YIN. Returns per-frame F0 in Hz and aperiodicity (the depth of the chosen
+    dip of the cumulative mean normalized difference; near 0 for clean voicing).
+
+    The difference function of a block of frames comes from one batched FFT
+    autocorrelation plus cumulative energy sums, so there are no per-frame Python loops.
+    Lags are refined with parabolic interpolation.
+    """
+    min_lag = max(2, int(sample_rate / fmax))
+    max_lag = int(np.ceil(sample_rate / fmin))
+    window = frame_length - max_lag - 1
+    if window < max_lag:
+        raise ValueError("frame_length too short for fmin")
+    frames = frame_view(np.asarray(samples, dtype=np.float32), frame_length, hop_length)
+    n_frames = len(frames)
+    f0 = np.zeros(n_frames)
+    aperiodicity = np.ones(n_frames)
+    n_fft = 1 << int(np.ceil(np.log2(frame_length + window)))
+    lags = np.arange(max_lag + 1)
+
+    for start in range(0, n_frames, block_frames):
+        block = frames[start:start + block_frames].astype(np.float64)
+        # acf[t] = sum_j x[j] * x[j + t] over the first `window` samples
+        spectrum = np.fft.rfft(block, n_fft, axis=1)
+        head = np.fft.rfft(block[:, :window], n_fft, axis=1)
+        acf = np.fft.irfft(np.conj(head) * spectrum, n_fft, axis=1)[:, :max_lag + 1]
+        energy = np.concatenate((np.zeros((len(block), 1)), np.cumsum(block * block, axis=1)), axis=1)
+        shifted = energy[:, lags + window] - energy[:, lags]
+        diff = np.maximum(shifted[:, :1] + shifted - 2 * acf, 0.0)
+
+        # Cumulative mean normalized difference
+        cmnd = np.ones_like(diff)
+        running = np.cumsum(diff[:, 1:], axis=1)
+        cmnd[:, 1:] = diff[:, 1:] * lags[1:] / np.maximum(running, 1e-12)
+
+        search = cmnd[:, min_lag:max_lag]
+        local_min = np.zeros_like(search, dtype=bool)
+        local_min[:, :-1] = search[:, :-1] <= search[:, 1:]
+        candidates = (search < threshold) & local_min
+        has_dip = candidates.any(axis=1)
+        # First dip below the threshold, else the global minimum
+        best = np.where(has_dip, candidates.argmax(axis=1), search.argmin(axis=1))
+        tau = best + min_lag
+
+        rows = np.arange(len(block))
+        left = cmnd[rows, np.maximum(tau - 1, 0)]
+        mid = cmnd[rows, tau]
+        right = cmnd[rows, np.minimum(tau + 1, max_lag)]
+        curvature = left - 2 * mid + right
+        safe = np.where(np.abs(curvature) > 1e-12, curvature, np.inf)
+        refined = tau + np.clip(0.5 * (left - right) / safe, -1, 1)
+
+        f0[start:start + len(block)] = sample_rate / refined
+        aperiodicity[start:start + len(block)] = mid
+    return f0, aperiodicity
+
+
+def syllable_onsets(energy_db, frame_rate, gate_db, gap_seconds=SYLLABLE_GAP_SECONDS,
+                    prominence_db=SYLLABLE_PROMINENCE_DB):
+    """
+    Frame indexes of syllable nuclei: peaks of the smoothed loudness contour that are
+    the maximum within +-gap_seconds, stand `prominence_db` above the dips on both sides
+    and are louder than `gate_db`. Vowels carry the energy peaks of speech, so unlike
+    beat tracking this follows speaking rate rather than musical tempo.
+    """
+    radius = max(1, int(round(gap_seconds * frame_rate)))
+    if len(energy_db) < 2 * radius + 1:
+        return np.zeros(0, dtype=int)
+    smooth_width = max(1, int(round(0.05 * frame_rate)))
+    contour = np.convolve(energy_db, np.ones(smooth_width) / smooth_width, mode="same")
+    padded = np.pad(contour, radius, mode="edge")
+    neighbourhood = np.lib.stride_tricks.sliding_window_view(padded, 2 * radius + 1)
+    is_peak = contour >= neighbourhood.max(axis=1)
+    left_dip = neighbourhood[:, :radius].min(axis=1)
+    right_dip = neighbourhood[:, radius + 1:].min(axis=1)
+    prominent = contour - np.maximum(left_dip, right_dip) >= prominence_db
+    peaks = np.flatnonzero(is_peak & prominent & (contour > gate_db))
+    # Flat-topped peaks match on several neighbouring frames; keep the first of each run
+    if len(peaks):
+        peaks = peaks[np.concatenate(([True], np.diff(peaks) > radius))]
+    return peaks
+
+
+def extract(audio, sample_rate=SAMPLE_RATE, frame_seconds=FRAME_SECONDS, hop_seconds=HOP_SECONDS):
+    """
+    Frame-level prosody of a mono float32 recording: F0 (Hz), RMS energy, a voiced mask,
+    a speech mask (VAD regions, pauses between words included) and syllable onset frames,
+    all on one frame grid of `1 / hop_seconds` frames per second.
+    """
+    y = np.asarray(audio, dtype=np.float32)
+    frame_length = int(frame_seconds * sample_rate)
+    hop_length = int(hop_seconds * sample_rate)
+    energy = frame_rms(y, frame_length, hop_length)
+
+    pitch_audio = resample(y, sample_rate, PITCH_RATE) if sample_rate > PITCH_RATE else y
+    pitch_rate = min(sample_rate, PITCH_RATE)
+    pitch, aperiodicity = yin(pitch_audio, pitch_rate, int(frame_seconds * pitch_rate), int(hop_seconds * pitch_rate))
+
+    n = min(len(energy), len(pitch))
+    energy, pitch, aperiodicity = energy[:n], pitch[:n], aperiodicity[:n]
+    gate = max(VOICED_RMS, 0.1 * np.percentile(energy, 95)) if n else VOICED_RMS
+    voiced = (energy > gate) & (aperiodicity < VOICED_APERIODICITY)
+    energy_db = 20 * np.log10(np.maximum(energy, 1e-6))
+    onsets = syllable_onsets(energy_db, 1 / hop_seconds, 20 * np.log10(gate))
+
+    regions = detect_speech(y, sample_rate) if sample_rate == SAMPLE_RATE else np.array([[0, len(y)]])
+    centres = np.arange(n) * hop_length + frame_length // 2
+    speech = np.searchsorted(regions[:, 0], centres, side="right") > np.searchsorted(regions[:, 1], centres, side="right")
+    logging.debug(f"Prosody: {n} frames, {voiced.mean() if n else 0:.0%} voiced, {len(onsets)} syllables")
+    return {
+        'pitch': np.where(voiced, pitch, 0.0),
+        'energy': energy,
+        'voiced': voiced,
+        'speech': speech,
+        'onsets': onsets,
+        'frame_rate': 1 / hop_seconds,
+    }
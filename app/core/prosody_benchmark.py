@@ -0,0 +1,191 @@
+"""
+Speed and accuracy of the vectorized prosody engine (app.core.prosody) against the
+librosa path it replaced (librosa.yin over C2-C7, librosa RMS, onset_detect and
+beat_track tempo):
+
+    python -m app.core.prosody_benchmark                      # synthetic speech only
+    python -m app.core.prosody_benchmark recording.wav --json
+
+Synthetic utterances have a known F0 contour and syllable count, so both paths are
+scored against the truth. Recordings have no ground truth; for those the report shows
+how closely the two paths agree.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+import numpy as np
+
+from app.core import prosody
+from app.core.audio_asset import get_store
+
+SAMPLE_RATE = prosody.SAMPLE_RATE
+GROSS_ERROR = 0.2  # Pitch off by more than 20% (octave jumps and the like)
+
+
+def synthetic_utterance(seconds, rate=SAMPLE_RATE, seed=0):
+    """
+    Harmonic "speech" with a wandering F0 and syllables of random length separated by
+    short gaps and occasional pauses. Returns (audio, f0 per sample or 0, syllable count).
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * rate)
+    t = np.arange(n) / rate
+    base = 100 + 120 * rng.random()
+    f0 = base * (1 + 0.15 * np.sin(2 * np.pi * rng.uniform(0.1, 0.4) * t + rng.uniform(0, 2 * np.pi)))
+    phase = 2 * np.pi * np.cumsum(f0) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 16))
+
+    envelope = np.zeros(n)
+    position, syllables = int(0.3 * rate), 0
+    while True:
+        length = int(rng.uniform(0.12, 0.3) * rate)
+        if position + length > n - int(0.2 * rate):
+            break
+        envelope[position:position + length] = np.hanning(length)
+        syllables += 1
+        gap = rng.uniform(0.04, 0.1) if rng.random() > 0.1 else rng.uniform(0.4, 0.8)
+        position += length + int(gap * rate)
+
+    audio = 0.25 * voice * envelope + 0.003 * rng.standard_normal(n)
+    truth = np.where(envelope > 0.3, f0, 0.0)
+    return audio.astype(np.float32), truth, syllables
+
+
+def fast_path(y, sr):
+    frames = prosody.extract(y, sr)
+    hop = 1 / frames['frame_rate']
+    return {
+        'times': np.arange(len(frames['pitch'])) * hop + prosody.FRAME_SECONDS / 2,
+        'pitch': frames['pitch'],
+        'syllables': len(frames['onsets']),
+        'speech_seconds': frames['speech'].sum() * hop,
+    }
+
+
+def librosa_path(y, sr, frame_length=1024, hop_length=256):
+    import librosa
+
+    pitch = librosa.yin(y, fmin=librosa.note_to_hz('C2'), fmax=librosa.note_to_hz('C7'),
+                        sr=sr, frame_length=frame_length, hop_length=hop_length)
+    energy = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
+    n = min(len(pitch), len(energy))
+    pitch, energy = pitch[:n], energy[:n]
+    voiced = energy > max(prosody.VOICED_RMS, 0.1 * np.percentile(energy, 95))
+    onsets = librosa.onset.onset_detect(y=y, sr=sr, hop_length=hop_length, units='frames')
+    tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+    return {
+        'times': np.arange(n) * hop_length / sr,  # librosa centres its frames
+        'pitch': np.where(voiced, pitch, 0.0),
+        'syllables': len(onsets),
+        'beats_per_second': float(np.atleast_1d(tempo)[0]) / 60,
+    }
+
+
+def _timed(fn, y, sr):
+    started = time.perf_counter()
+    result = fn(y, sr)
+    result['seconds'] = time.perf_counter() - started
+    result['realtime'] = len(y) / sr / max(result['seconds'], 1e-9)
+    return result
+
+
+def pitch_error(times, estimate, ref_times, reference):
+    """Median absolute error in cents and gross error rate where both have pitch."""
+    ref = np.interp(times, ref_times, reference, left=0, right=0)
+    # Interpolating across a voicing edge mixes in zeros; only keep frames well inside
+    ref_edges = np.interp(times, ref_times, (reference > 0).astype(float), left=0, right=0)
+    both = (estimate > 0) & (ref > 0) & (ref_edges == 1)
+    if not both.any():
+        return {'frames': 0, 'median_cents': None, 'gross_error_rate': None}
+    ratio = estimate[both] / ref[both]
+    return {
+        'frames': int(both.sum()),
+        'median_cents': round(float(np.median(np.abs(1200 * np.log2(ratio)))), 1),
+        'gross_error_rate': round(float(np.mean(np.abs(ratio - 1) > GROSS_ERROR)), 4),
+    }
+
+
+def _summary(result):
+    return {k: round(v, 4) if isinstance(v, float) else v for k, v in result.items()
+            if k not in ('times', 'pitch')}
+
+
+def benchmark_synthetic(seconds, trials, with_librosa):
+    reports = []
+    for seed in range(trials):
+        y, truth, syllables = synthetic_utterance(seconds, seed=seed)
+        truth_times = np.arange(len(truth)) / SAMPLE_RATE
+        report = {'input': f"synthetic #{seed}", 'seconds': seconds, 'syllables': syllables}
+        paths = [('fast', fast_path)] + ([('librosa', librosa_path)] if with_librosa else [])
+        for name, fn in paths:
+            result = _timed(fn, y, SAMPLE_RATE)
+            report[name] = dict(_summary(result),
+                                pitch=pitch_error(result['times'], result['pitch'], truth_times, truth))
+        reports.append(report)
+    return reports
+
+
+def benchmark_file(path, with_librosa):
+    y = get_store().load(path, SAMPLE_RATE, keep=False)
+    report = {'input': path, 'seconds': round(len(y) / SAMPLE_RATE, 1)}
+    fast = _timed(fast_path, y, SAMPLE_RATE)
+    report['fast'] = _summary(fast)
+    if with_librosa:
+        slow = _timed(librosa_path, y, SAMPLE_RATE)
+        report['librosa'] = _summary(slow)
+        report['agreement'] = pitch_error(fast['times'], fast['pitch'], slow['times'], slow['pitch'])
+    return report
+
+
+def _print_report(report):
+    print(f"{report['input']} ({report['seconds']} s"
+          + (f", {report['syllables']} syllables)" if 'syllables' in report else ")"))
+    for name in ('fast', 'librosa'):
+        if name not in report:
+            continue
+        r = report[name]
+        line = f"  {name:8s} {r['seconds'] * 1000:8.1f} ms  {r['realtime']:7.0f}x realtime  {r['syllables']:4d} syllables"
+        if 'beats_per_second' in r:
+            line += f"  (beat tracker: {r['beats_per_second']:.1f}/s)"
+        if 'pitch' in r and r['pitch']['frames']:
+            line += f"  pitch error {r['pitch']['median_cents']} cents, {r['pitch']['gross_error_rate']:.1%} gross"
+        print(line)
+    if 'agreement' in report and report['agreement']['frames']:
+        a = report['agreement']
+        print(f"  paths differ by {a['median_cents']} cents median, {a['gross_error_rate']:.1%} gross")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the prosody engine against librosa")
+    parser.add_argument("files", nargs="*", help="Recordings to compare the two paths on")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Length of each synthetic utterance")
+    parser.add_argument("--trials", type=int, default=3, help="Synthetic utterances")
+    parser.add_argument("--no-librosa", action="store_true", help="Only time the fast path")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    with_librosa = not args.no_librosa
+    if with_librosa:
+        try:
+            import librosa  # noqa: F401
+        except ImportError:
+            print("librosa is not installed, timing the fast path only", file=sys.stderr)
+            with_librosa = False
+
+    reports = benchmark_synthetic(args.seconds, args.trials, with_librosa)
+    reports += [benchmark_file(path, with_librosa) for path in args.files]
+    if args.json:
+        json.dump(reports, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        for report in reports:
+            _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
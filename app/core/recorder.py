@@ -1,10 +1,18 @@
 import pyaudio
-import wave
 import threading
 import logging
 import os
 import shutil
 import time
+import numpy as np
+from .capture import CaptureEngine, BLOCK
+from .wav_writer import IncrementalWavWriter, recover_wav
+from .audio_asset import get_store
+from ..utils.dsp import StreamingResampler, int16_to_float32
+
+MODEL_SAMPLE_RATE = 16000
+# The 16 kHz copy costs 64 KB/s; longer sessions are transcribed from the WAV instead
+MODEL_AUDIO_MAX_SECONDS = 3600
 
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -12,30 +20,52 @@ logging.basicConfig(
 
 
 class AudioRecorder:
-    def __init__(self):
-        self.audio = pyaudio.PyAudio()
-        self.stream = None
-        self.frames = []
+    def __init__(self, engine=None):
+        # Capture is shared with the waveform view and other consumers through the engine
+        self.engine = engine or CaptureEngine()
+        self.audio = self.engine.audio
+        self.subscription = None
+        self.writer = None
+        self.resampler = None
+        self.model_chunks = []
+        self.model_audio = None
         self.recording = False
         self.filepath = None
         self.recording_start_time = None  
         self.recording_duration = 0 
+        self.capture_stats = {}
     
     def set_save_directory(self, directory):
         self.save_directory = directory
         logging.info(f"Save directory set to: {self.save_directory}")
 
+    def _output_path(self):
+        # Always save as output.wav in the specified directory
+        if hasattr(self, "save_directory"):
+            return os.path.join(self.save_directory, "output.wav")
+        return "output.wav"
+
+    def _recover_previous_recording(self, path):
+        """Keep a recording left behind by a crash instead of overwriting it."""
+        if os.path.exists(path) and recover_wav(path):
+            recovered = path.replace(".wav", f"_recovered_{int(os.path.getmtime(path))}.wav")
+            shutil.move(path, recovered)
+            logging.warning(f"Previous recording was interrupted; recovered audio saved to {recovered}")
+
     def start_recording(self):
-        self.frames = []
         self.recording_start_time = time.time()
         try:
-            self.stream = self.audio.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=44100,
-                input=True,
-                frames_per_buffer=1024,
+            self.filepath = self._output_path()
+            self._recover_previous_recording(self.filepath)
+            self.resampler = StreamingResampler(self.engine.rate, MODEL_SAMPLE_RATE)
+            self.model_chunks = []
+            self.model_audio = None
+            self.writer = IncrementalWavWriter(
+                self.filepath, self.engine.rate, self.engine.channels,
+                self.audio.get_sample_size(pyaudio.paInt16),
             )
+            # The WAV writer must not lose audio, so it waits for queue space instead of dropping
+            self.subscription = self.engine.subscribe("recorder", maxsize=1024, drop_policy=BLOCK)
             self.recording = True
             self.thread = threading.Thread(target=self.record)
             self.thread.start()
@@ -45,33 +75,50 @@ class AudioRecorder:
             raise RuntimeError(f"Error starting recording: {e}")
 
     def record(self):
-        while self.recording:
-            data = self.stream.read(1024)
-            self.frames.append(data)
+        # Samples go straight to disk so memory stays flat however long the session runs
+        model_samples = 0
+        for buffer in self.subscription:
+            self.writer.write(buffer)
+            # Resample for Whisper while capturing so transcription can skip decoding the WAV
+            if self.model_chunks is not None:
+                chunk = self.resampler.process(int16_to_float32(buffer))
+                self.model_chunks.append(chunk)
+                model_samples += len(chunk)
+                if model_samples > MODEL_AUDIO_MAX_SECONDS * MODEL_SAMPLE_RATE:
+                    logging.info("Recording too long to keep in memory; transcription will read the WAV file")
+                    self.model_chunks = None
 
     def stop_recording(self):
         self.recording = False
+        self.subscription.close()
         self.thread.join()
-        self.stream.stop_stream()
-        self.stream.close()
         self.recording_duration = time.time() - self.recording_start_time
+        self.capture_stats = self.engine.stats()
+        if self.model_chunks is not None:
+            self.model_chunks.append(self.resampler.flush())
+            self.model_audio = np.concatenate(self.model_chunks)
+        self.model_chunks = []
         self.save_recording()
         logging.info("Recording stopped and saved")
 
     def save_recording(self):
-        # Always save as output.wav in the specified directory
-        if hasattr(self, "save_directory"):
-            self.filepath = os.path.join(self.save_directory, "output.wav")
-        else:
-            self.filepath = "output.wav"
+        """Finalize the WAV header; the audio itself was written while recording."""
+        self.writer.close()
+        logging.info(f"Recording saved to {self.filepath} ({self.writer.duration:.1f}s)")
+        self._share_model_audio()
+
+    def _share_model_audio(self):
+        # Transcription and analysis of the file then start from this copy instead of decoding it
+        if self.model_audio is not None:
+            get_store().put(self.filepath, self.model_audio, MODEL_SAMPLE_RATE)
+
+    def get_capture_stats(self):
+        """Overflow, dropped-frame and callback-latency counters from the capture engine."""
+        return self.engine.stats()
 
-        wf = wave.open(self.filepath, "wb")
-        wf.setnchannels(1)
-        wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
-        wf.setframerate(44100)
-        wf.writeframes(b"".join(self.frames))
-        wf.close()
-        logging.info(f"Recording saved to {self.filepath}")
+    def get_model_audio(self):
+        """The last recording as 16 kHz mono float32, or None if it was too long to keep."""
+        return self.model_audio
 
     def rename_audio(self, new_name):
         if not self.filepath or not os.path.exists(self.filepath):
@@ -84,6 +131,7 @@ class AudioRecorder:
         try:
             shutil.move(self.filepath, new_filepath)
             self.filepath = new_filepath
+            self._share_model_audio()
             logging.info(f"Audio file renamed to {new_filepath}")
             return True
         except Exception as e:
@@ -0,0 +1,233 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+# Priorities: lower runs first
+INTERACTIVE = 0  # The user is waiting for the result on screen
+NORMAL = 1
+BULK = 2  # Batch work that may take hours
+
+# Resources a job competes for
+MODEL = "model"  # CPU/GPU model inference
+NETWORK = "network"  # Remote LLM calls
+DISK = "disk"  # Large file reads and writes
+
+DEFAULT_LIMITS = {MODEL: 1, NETWORK: 2, DISK: 2}
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", NORMAL: "normal", BULK: "bulk"}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """
+    One unit of background work. The function receives the job itself so it can
+    report progress (`job.report`) and stop early once `job.cancelled` is set.
+    """
+
+    def __init__(self, scheduler, job_id, name, fn, resource, priority, on_done):
+        self.scheduler = scheduler
+        self.id = job_id
+        self.name = name
+        self.fn = fn
+        self.resource = resource
+        self.priority = priority
+        self.on_done = on_done
+        self.status = QUEUED
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.created = time.monotonic()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+        self._cancel_callbacks = []
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def report(self, message):
+        """Update the status message shown in the jobs window."""
+        self.message = message
+        self.scheduler._notify(self)
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled(self.name)
+
+    def on_cancel(self, callback):
+        """Run `callback` when the job is cancelled while running (e.g. engine.cancel)."""
+        self._cancel_callbacks.append(callback)
+        if self.cancelled:
+            callback()
+
+    def cancel(self):
+        self.scheduler.cancel(self)
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return self.result
+
+
+class JobScheduler:
+    """
+    Runs background jobs in priority order under per-resource concurrency limits.
+
+    A job starts when its resource has a free slot; a job blocked on one resource does
+    not hold back jobs for other resources. Each resource keeps one extra slot that only
+    interactive jobs may use, so an hours-long batch never delays work the user is
+    waiting for. Every job runs on its own thread, so limits also bound thread count.
+    """
+
+    def __init__(self, limits=None, history=100):
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.history = history
+        self._lock = threading.Lock()
+        self._queue = []
+        self._running = {}
+        self._jobs = []
+        self._ids = itertools.count(1)
+        self._listeners = []
+        self._closed = False
+
+    def submit(self, name, fn, resource=MODEL, priority=NORMAL, on_done=None):
+        """
+        Queue `fn(job)`. `on_done(job)` is called on the worker thread when the job ends,
+        whether it finished, failed or was cancelled.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Scheduler is shut down")
+            job = Job(self, next(self._ids), name, fn, resource, priority, on_done)
+            heapq.heappush(self._queue, (priority, job.id, job))
+            self._jobs.append(job)
+            self._trim_history()
+        logging.info(f"Job queued: {name} ({PRIORITY_NAMES.get(priority, priority)}, {resource})")
+        self._notify(job)
+        self._dispatch()
+        return job
+
+    def cancel(self, job):
+        with self._lock:
+            if job.status in (DONE, FAILED, CANCELLED):
+                return
+            job._cancel.set()
+            queued = job.status == QUEUED
+            if queued:
+                self._queue = [entry for entry in self._queue if entry[2] is not job]
+                heapq.heapify(self._queue)
+                job.status = CANCELLED
+                job.finished = time.monotonic()
+        logging.info(f"Job cancelled: {job.name}")
+        if queued:
+            self._finish(job)
+        else:
+            for callback in job._cancel_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logging.error(f"Error cancelling job {job.name}: {e}")
+            self._notify(job)
+
+    def jobs(self):
+        """Snapshot of queued, running and recently finished jobs, oldest first."""
+        with self._lock:
+            return list(self._jobs)
+
+    def add_listener(self, callback):
+        """`callback(job)` on every status change; called from worker threads."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def shutdown(self):
+        """Cancel everything still queued or running. Running jobs stop cooperatively."""
+        with self._lock:
+            self._closed = True
+            pending = [job for job in self._jobs if job.status in (QUEUED, RUNNING)]
+        for job in pending:
+            self.cancel(job)
+
+    def _capacity(self, resource, priority):
+        limit = self.limits.get(resource, 1)
+        return limit + 1 if priority == INTERACTIVE else limit
+
+    def _dispatch(self):
+        to_start = []
+        with self._lock:
+            waiting = []
+            while self._queue:
+                priority, job_id, job = heapq.heappop(self._queue)
+                if self._running.get(job.resource, 0) < self._capacity(job.resource, priority):
+                    self._running[job.resource] = self._running.get(job.resource, 0) + 1
+                    job.status = RUNNING
+                    job.started = time.monotonic()
+                    to_start.append(job)
+                else:
+                    waiting.append((priority, job_id, job))
+            for entry in waiting:
+                heapq.heappush(self._queue, entry)
+        for job in to_start:
+            logging.info(f"Job started: {job.name}")
+            self._notify(job)
+            threading.Thread(target=self._run, args=(job,), name=f"job-{job.id}", daemon=True).start()
+
+    def _run(self, job):
+        try:
+            job.result = job.fn(job)
+            job.status = CANCELLED if job.cancelled else DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            logging.error(f"Job failed: {job.name}: {e}")
+            job.error = str(e)
+            job.status = FAILED
+        job.finished = time.monotonic()
+        with self._lock:
+            self._running[job.resource] -= 1
+        if job.status == DONE:
+            logging.info(f"Job finished: {job.name} ({job.elapsed():.1f}s)")
+        self._finish(job)
+        self._dispatch()
+
+    def _finish(self, job):
+        if job.on_done:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                logging.error(f"Error in completion handler of {job.name}: {e}")
+        job._done.set()
+        self._notify(job)
+
+    def _notify(self, job):
+        for listener in list(self._listeners):
+            try:
+                listener(job)
+            except Exception as e:
+                logging.error(f"Error in job listener: {e}")
+
+    def _trim_history(self):
+        finished = [job for job in self._jobs if job.status in (DONE, FAILED, CANCELLED)]
+        excess = len(finished) - self.history
+        if excess > 0:
+            drop = set(id(job) for job in finished[:excess])
+            self._jobs = [job for job in self._jobs if id(job) not in drop]
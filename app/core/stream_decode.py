@@ -0,0 +1,201 @@
+import logging
+import shutil
+import subprocess
+
+import numpy as np
+
+from ..utils.dsp import StreamingResampler
+from .long_file import find_pauses, stitch
+from .vad import SAMPLE_RATE, apply_vad
+
+STREAM_SECONDS = 3600  # Files longer than this are transcribed while they are decoded
+BLOCK_SECONDS = 10.0
+WINDOW_SECONDS = 600.0  # Audio handed to Whisper at once; bounds the samples and mel held in memory
+OVERLAP_SECONDS = 1.0
+PROMPT_CHARS = 200  # Tail of the previous window's text used as the next window's prompt
+
+
+def probe_duration(filepath):
+    """Duration in seconds from the file header (soundfile, else ffprobe), or None."""
+    try:
+        import soundfile as sf
+
+        return sf.info(filepath).duration
+    except Exception:
+        pass
+    if shutil.which("ffprobe"):
+        try:
+            output = subprocess.run(
+                ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", filepath],
+                capture_output=True, text=True, timeout=30, check=True,
+            ).stdout
+            return float(output.strip())
+        except (subprocess.SubprocessError, ValueError):
+            pass
+    return None
+
+
+def expected_samples(filepath, rate=SAMPLE_RATE):
+    """
+    Length of the decoded file at `rate` from its header: exact for formats soundfile
+    reads, an estimate from ffprobe's duration otherwise, None when neither knows.
+    """
+    try:
+        import soundfile as sf
+
+        info = sf.info(filepath)
+        # What iter_blocks yields: StreamingResampler outputs ceil(frames * rate / samplerate)
+        return -(-info.frames * rate // info.samplerate)
+    except Exception:
+        pass
+    duration = probe_duration(filepath)
+    return int(duration * rate) if duration else None
+
+
+def iter_blocks(filepath, rate=SAMPLE_RATE, block_seconds=BLOCK_SECONDS):
+    """
+    Yield the file as mono float32 blocks at `rate` without ever holding all of it.
+    Formats soundfile reads are decoded a block at a time and resampled with
+    StreamingResampler; anything else (mp3, m4a, ...) is decoded and resampled by an
+    ffmpeg process and read from its pipe.
+    """
+    try:
+        import soundfile as sf
+
+        info = sf.info(filepath)
+    except Exception:
+        yield from _ffmpeg_blocks(filepath, rate, block_seconds)
+        return
+
+    resampler = StreamingResampler(info.samplerate, rate) if info.samplerate != rate else None
+    blocksize = max(1, int(block_seconds * info.samplerate))
+    for block in sf.blocks(filepath, blocksize=blocksize, dtype="float32", always_2d=True):
+        samples = block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+        samples = resampler.process(samples) if resampler else np.ascontiguousarray(samples)
+        if len(samples):
+            yield samples
+    if resampler:
+        tail = resampler.flush()
+        if len(tail):
+            yield tail
+
+
+def _ffmpeg_blocks(filepath, rate, block_seconds):
+    if not shutil.which("ffmpeg"):
+        raise RuntimeError(f"Cannot decode {filepath}: soundfile does not support it and ffmpeg is not installed")
+    process = subprocess.Popen(
+        ["ffmpeg", "-nostdin", "-v", "error", "-i", filepath, "-f", "f32le", "-ac", "1", "-ar", str(rate), "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    block_bytes = int(block_seconds * rate) * 4
+    try:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            usable = len(data) - len(data) % 4
+            if usable:
+                yield np.frombuffer(data[:usable], dtype=np.float32)
+        error = process.stderr.read().decode(errors="replace").strip()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg could not decode {filepath}: {error}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def iter_windows(blocks, window_samples, overlap_samples, sample_rate=SAMPLE_RATE):
+    """
+    Regroup a block stream into windows of at most `window_samples`, cut like
+    long_file.plan_chunks: at the last pause in the second half of the window, else hard
+    with `overlap_samples` on both sides of the cut. Yields (start, end, own_start,
+    own_end, audio) in samples of the whole stream; only one window is buffered.
+    """
+    pending, pending_samples = [], 0
+    base = 0  # Stream position of buffer[0]
+    own = 0  # Start of the part this window is responsible for, relative to buffer[0]
+    buffer = np.zeros(0, dtype=np.float32)
+
+    def take(limit):
+        nonlocal buffer, pending, pending_samples
+        if pending:
+            buffer = np.concatenate([buffer] + pending)
+            pending, pending_samples = [], 0
+        return buffer[:limit]
+
+    for block in blocks:
+        pending.append(np.asarray(block, dtype=np.float32))
+        pending_samples += len(block)
+        while len(buffer) + pending_samples - own > window_samples:
+            limit = own + window_samples
+            window = take(limit)
+            pauses = find_pauses(window, sample_rate)
+            fitting = pauses[(pauses > own + window_samples // 2) & (pauses <= limit)]
+            if len(fitting):
+                cut, overlap = int(fitting[-1]), 0
+            else:
+                cut, overlap = limit - overlap_samples, overlap_samples
+            end = min(cut + overlap, len(buffer))
+            yield base, base + end, base + own, base + cut, buffer[:end]
+            keep = cut - overlap
+            buffer = buffer[keep:].copy()
+            base += keep
+            own = overlap
+    take(None)
+    if len(buffer) > own:
+        yield base, base + len(buffer), base + own, base + len(buffer), buffer
+
+
+def transcribe_stream(run_model, filepath, options, use_vad=True, window_seconds=WINDOW_SECONDS,
+                      overlap_seconds=OVERLAP_SECONDS, engine=None):
+    """
+    Transcribe a file window by window while it is decoded. Each window is cut at a
+    pause, filtered with VAD and transcribed on its own, so Whisper computes the log-mel
+    of one window at a time. Returns (result, vad_stats, duration) with the result
+    stitched onto the file's timeline.
+
+    Without `engine`, windows go through `run_model(audio, **options)` one after another
+    and the tail of each window's text prompts the next to keep the wording consistent
+    across cuts. With a LongFileTranscriber as `engine`, windows of its chunk size are
+    decoded in parallel on its worker pool while the file is still being read.
+    """
+    chunks, time_maps = [], []
+    vad_stats = {'total_seconds': 0.0, 'speech_seconds': 0.0, 'skipped_seconds': 0.0, 'regions': 0}
+    if engine is not None:
+        window_seconds = engine.max_chunk_seconds
+        overlap_seconds = engine.overlap_seconds
+    windows = iter_windows(iter_blocks(filepath), int(window_seconds * SAMPLE_RATE),
+                           int(overlap_seconds * SAMPLE_RATE))
+
+    def model_inputs():
+        for start, end, own_start, own_end, audio in windows:
+            logging.info(f"Streaming window {start / SAMPLE_RATE:.0f}-{end / SAMPLE_RATE:.0f}s of {filepath}")
+            chunks.append((start, end, own_start, own_end))
+            if use_vad:
+                audio, time_map, stats = apply_vad(audio)
+                for key in ('total_seconds', 'speech_seconds', 'skipped_seconds', 'regions'):
+                    vad_stats[key] += stats[key]
+                time_maps.append(time_map)
+            else:
+                time_maps.append(None)
+            yield audio
+
+    if engine is not None:
+        results = engine.transcribe_windows(model_inputs(), **options)
+    else:
+        results, previous_text = [], ""
+        for audio in model_inputs():
+            window_options = dict(options, initial_prompt=previous_text[-PROMPT_CHARS:]) if previous_text else options
+            result = run_model(audio, **window_options) if len(audio) else {'segments': []}
+            results.append(result)
+            previous_text = "".join(s['text'] for s in result.get('segments', [])).strip() or previous_text
+    results = [time_map.remap(result) if time_map is not None else result
+               for result, time_map in zip(results, time_maps)]
+
+    duration = chunks[-1][1] / SAMPLE_RATE if chunks else 0.0
+    total = vad_stats['total_seconds']
+    vad_stats['skipped_ratio'] = vad_stats['skipped_seconds'] / total if total else 0.0
+    return stitch(results, chunks), (vad_stats if use_vad else None), duration
@@ -1,83 +1,187 @@
 import os
+import math
 import whisper
 import logging
 import shutil
-import librosa
 import numpy as np
 from ..utils.helpers import format_time
+from .transcription_worker import TranscriptionWorker
+from .cache import DEFAULT_CACHE_DIR, TranscriptionCache, hash_array, hash_file
+from .vad import VAD_OPTIONS, apply_vad
+from .long_file import LongFileTranscriber
+from .audio_asset import get_store
+from .stream_decode import STREAM_SECONDS, probe_duration, transcribe_stream
 
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+SAMPLE_RATE = 16000
+# Decoding options used for every full transcription (single file, batch and workers)
+TRANSCRIBE_OPTIONS = {'language': 'en', 'word_timestamps': True}
+# Cache identity of results produced by BatchedDecoder (greedy, no word timings)
+BATCHED_OPTIONS = {'language': 'en', 'word_timestamps': False, 'decoder': 'batched'}
+
+
+def load_audio(filepath, keep=True):
+    """
+    16 kHz mono float32, the format Whisper expects, through the shared audio store so
+    the analyzers reuse the same decode. `keep=False` skips the store for one-off reads.
+    """
+    return get_store().load(filepath, SAMPLE_RATE, keep=keep)
+
+
+def calculate_segment_confidence(segment):
+    """Calculate confidence score for a segment based on word-level probabilities."""
+    if 'words' in segment and segment['words']:
+        word_probs = []
+        for word in segment['words']:
+            # Handle both possible formats of word confidence
+            prob = word.get('probability', word.get('confidence', 0.0))
+            word_probs.append(prob)
+        return sum(word_probs) / len(word_probs) if word_probs else 0.75
+    if 'avg_logprob' in segment:
+        # Batched decoding has no word timings; fall back to the mean token probability
+        return math.exp(segment['avg_logprob'])
+    return 0.75  # Default confidence if no word-level data available
+
+
+def format_segments(segments):
+    """
+    Turns Whisper segments into the text shown in the UI.
+    Returns (text_content, confidence_content, segments_with_confidence).
+    """
+    text_output = []
+    confidence_output = []
+    segments_with_confidence = []
+
+    for segment in segments:
+        # Extract and store text
+        text = segment['text'].strip()
+        text_output.append(text)
+
+        # Format timestamp and calculate confidence
+        timestamp = f"[{format_time(segment['start'])} - {format_time(segment['end'])}]"
+        confidence = calculate_segment_confidence(segment)
+        confidence_str = f"({confidence:.1%} confidence)"
+
+        # Save segment details for potential further use
+        segments_with_confidence.append({
+            'timestamp': timestamp,
+            'confidence': confidence_str,
+            'text': text
+        })
+
+        confidence_output.extend([timestamp, confidence_str, ""])
+
+    # Combine outputs into strings
+    return " ".join(text_output), "\n".join(confidence_output), segments_with_confidence
+
+
 class AudioTranscriber:
-    def __init__(self):
-        try:
-            self.model = whisper.load_model("small")
-            logging.info("Whisper model loaded successfully.")
-        except Exception as e:
-            logging.error(f"Error loading Whisper model: {e}")
-            self.model = None
+    def __init__(self, model_name="small", use_worker_process=False, use_cache=True, cache_dir=DEFAULT_CACHE_DIR,
+                 use_vad=True, long_file_seconds=1200, long_file_workers=None, stream_seconds=STREAM_SECONDS):
+        self.model_name = model_name
+        self.use_vad = use_vad
+        # Recordings longer than this are split at pauses and decoded on several cores
+        self.long_file_seconds = long_file_seconds
+        self.long_file_workers = long_file_workers
+        # Files longer than this are decoded and transcribed window by window, never whole
+        self.stream_seconds = stream_seconds
+        self.vad_stats = None  # What the voice-activity filter skipped in the last transcription
+        self.cache = TranscriptionCache(cache_dir) if use_cache else None
+        self.model = None
+        self.worker = None
+        if use_worker_process:
+            # Whisper runs in a separate process; the model loads there in the background
+            self.worker = TranscriptionWorker(model_name)
+        else:
+            try:
+                self.model = whisper.load_model(model_name)
+                logging.info("Whisper model loaded successfully.")
+            except Exception as e:
+                logging.error(f"Error loading Whisper model: {e}")
+                self.model = None
         self.transcription_file = None
         self.segments_with_confidence = []
+        self.last_segments = []  # Raw Whisper segments (with word timings) of the last transcription
 
-    def transcribe_audio(self, filepath, save_directory=None):
+    def transcribe_audio(self, filepath, save_directory=None, audio=None):
         """
         Processes a single audio file and returns a combined transcription string.
         This method maintains the existing features (confidence calculation, history update, file saving)
         and is used by the batch processing UI code to process multiple files one by one.
+        If `audio` is given (16 kHz mono float32, e.g. from AudioRecorder.get_model_audio()),
+        it is passed to Whisper directly and the file is not decoded again.
+        With `use_vad`, silence and non-speech are cut out before decoding; timestamps
+        still refer to the original recording.
         """
-        if not self.model:
+        if not self.is_available():
             logging.error("Whisper model is not loaded.")
             return "Error: Whisper model not loaded.\n"
+        self.last_segments = []
         try:
-            if not os.path.exists(filepath):
+            if audio is None and not os.path.exists(filepath):
                 error_msg = f"Audio file not found at: {filepath}"
                 logging.error(error_msg)
                 return f"Error: {error_msg}\n"
 
-            # Load and preprocess audio file using librosa
-            logging.info(f"Loading audio file: {filepath}")
-            audio_data, sr = librosa.load(filepath, sr=16000, mono=True)
-            audio_data = audio_data.astype(np.float32)
-            logging.info(f"Audio loaded successfully. Shape: {audio_data.shape}, dtype: {audio_data.dtype}")
+            # Identical audio with the same model and options is served from the cache
+            options = dict(TRANSCRIBE_OPTIONS, vad=VAD_OPTIONS) if self.use_vad else TRANSCRIBE_OPTIONS
+            cache_key = self._cache_key(filepath, audio, options)
+            result = self.cache.get(cache_key) if cache_key else None
+            self.vad_stats = result.get('vad') if result else None
+
+            if result is None and audio is None and self._should_stream(filepath):
+                logging.info(f"Streaming {filepath} in windows instead of decoding it whole")
+                # Long-file mode stays on for multi-hour files: windows go to its worker pool
+                engine = LongFileTranscriber(self.model_name, self.long_file_workers) if self.long_file_seconds else None
+                result, self.vad_stats, duration = transcribe_stream(
+                    self.run_model, filepath, TRANSCRIBE_OPTIONS, self.use_vad, engine=engine)
+                if self.vad_stats:
+                    result = dict(result, vad=self.vad_stats)
+                if cache_key:
+                    self.cache.put(cache_key, dict(result, duration=duration))
 
-            # Transcribe with word timestamps
-            logging.info("Starting transcription...")
-            result = self.model.transcribe(audio_data, language='en', word_timestamps=True)
+            if result is None:
+                if audio is not None:
+                    # In-memory fast path: no file decode or resample
+                    audio_data = np.ascontiguousarray(audio, dtype=np.float32)
+                    logging.info(f"Using in-memory audio. Shape: {audio_data.shape}, dtype: {audio_data.dtype}")
+                else:
+                    # Decode once; the emotion analyzer reads the same samples from the audio store
+                    logging.info(f"Loading audio file: {filepath}")
+                    audio_data = load_audio(filepath)
+                    logging.info(f"Audio loaded successfully. Shape: {audio_data.shape}, dtype: {audio_data.dtype}")
+
+                duration = len(audio_data) / SAMPLE_RATE
+                if self.use_vad:
+                    speech_audio, time_map, self.vad_stats = apply_vad(audio_data)
+                    if not len(speech_audio):
+                        return "Error: No speech detected in the audio file.\n"
+                else:
+                    speech_audio, time_map = audio_data, None
+
+                # Transcribe with word timestamps
+                logging.info("Starting transcription...")
+                if self.long_file_seconds and len(speech_audio) / SAMPLE_RATE > self.long_file_seconds:
+                    pauses = time_map.boundaries() if time_map is not None else None
+                    result = self.transcribe_long(speech_audio, pauses)
+                else:
+                    result = self.run_model(speech_audio, **TRANSCRIBE_OPTIONS)
+                if time_map is not None:
+                    result = dict(time_map.remap(result), vad=self.vad_stats)
+                if cache_key:
+                    self.cache.put(cache_key, dict(result, duration=duration))
 
             # Process segments from the transcription result
             segments = result.get('segments', [])
+            self.last_segments = segments
             if not segments:
                 return "Error: No speech detected in the audio file.\n"
 
             # Prepare outputs: raw text and confidence details
-            text_output = []
-            confidence_output = []
-            self.segments_with_confidence = []
-
-            for segment in segments:
-                # Extract and store text
-                text = segment['text'].strip()
-                text_output.append(text)
-
-                # Format timestamp and calculate confidence
-                timestamp = f"[{self._format_time(segment['start'])} - {self._format_time(segment['end'])}]"
-                confidence = self._calculate_segment_confidence(segment)
-                confidence_str = f"({confidence:.1%} confidence)"
-
-                # Save segment details for potential further use
-                self.segments_with_confidence.append({
-                    'timestamp': timestamp,
-                    'confidence': confidence_str,
-                    'text': text
-                })
-
-                confidence_output.extend([timestamp, confidence_str, ""])
-
-            # Combine outputs into strings
-            text_content = " ".join(text_output)
-            confidence_content = "\n".join(confidence_output)
+            text_content, confidence_content, self.segments_with_confidence = format_segments(segments)
 
             # Save transcription and confidence details to files
             if save_directory:
@@ -103,19 +207,48 @@ class AudioTranscriber:
             logging.error(error_msg)
             return f"Error: {error_msg}\n"
 
+    def _cache_key(self, filepath, audio, options):
+        if not self.cache:
+            return None
+        content_hash = hash_array(audio) if audio is not None else hash_file(filepath)
+        return self.cache.key(content_hash, self.model_name, options)
+
+    def is_available(self):
+        """True if a model is loaded here or a worker process is (or will be) serving one."""
+        if self.worker:
+            return self.worker.is_alive()
+        return self.model is not None
+
+    def run_model(self, audio, **options):
+        """Run Whisper on a 16 kHz float32 array and return the raw result dict."""
+        if self.worker:
+            return self.worker.transcribe(audio, **options)
+        return self.model.transcribe(audio, **options)
+
+    def _should_stream(self, filepath):
+        if not self.stream_seconds:
+            return False
+        duration = probe_duration(filepath)
+        return duration is not None and duration > self.stream_seconds
+
+    def transcribe_long(self, audio, pauses=None):
+        """
+        Long-file mode: split at pauses and decode the chunks in parallel worker processes.
+        `pauses` are candidate cut positions in samples (e.g. where VAD joined regions).
+        """
+        engine = LongFileTranscriber(self.model_name, self.long_file_workers)
+        return engine.transcribe(audio, pauses, **TRANSCRIBE_OPTIONS)
+
+    def close(self):
+        if self.worker:
+            self.worker.close()
+
     def _calculate_segment_confidence(self, segment):
         """Calculate confidence score for a segment based on word-level probabilities."""
-        if 'words' in segment and segment['words']:
-            word_probs = []
-            for word in segment['words']:
-                # Handle both possible formats of word confidence
-                prob = word.get('probability', word.get('confidence', 0.0))
-                word_probs.append(prob)
-            return sum(word_probs) / len(word_probs) if word_probs else 0.75
-        return 0.75  # Default confidence if no word-level data available
+        return calculate_segment_confidence(segment)
 
     def _format_time(self, seconds):
-        format_time(seconds)
+        return format_time(seconds)
 
     def update_transcription_history(self, text):
         """Appends the transcription to a history file."""
@@ -0,0 +1,169 @@
+import itertools
+import logging
+import queue
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ..utils.processes import get_context, hidden_main_module
+
+
+def _worker_main(model_name, requests, results):
+    """Entry point of the worker process: load the model once, then serve requests."""
+    import whisper
+
+    try:
+        model = whisper.load_model(model_name)
+    except Exception as e:
+        results.put(("failed", None, str(e)))
+        return
+    results.put(("ready", None, None))
+
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        job_id, shm_name, n_samples, options = request
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            # Whisper reads the shared buffer directly, nothing is pickled or copied
+            audio = np.ndarray((n_samples,), dtype=np.float32, buffer=shm.buf)
+            results.put(("done", job_id, model.transcribe(audio, **options)))
+        except Exception as e:
+            results.put(("error", job_id, str(e)))
+        finally:
+            audio = None
+            shm.close()
+
+
+class TranscriptionJob:
+    """Handle for one request; the result arrives once Whisper has decoded all of the audio."""
+
+    def __init__(self, job_id, shm):
+        self.job_id = job_id
+        self.shm = shm
+        self.error = None
+        self._result = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the job finishes and return the usual Whisper result dict."""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Transcription job {self.job_id} timed out")
+        if self.error:
+            raise RuntimeError(self.error)
+        return self._result
+
+    def _finish(self, result=None, error=None):
+        self._result = result
+        self.error = error
+        self._done.set()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class TranscriptionWorker:
+    """
+    Runs Whisper in a persistent child process so long decodes never compete with
+    audio capture or the Tk event loop for the GIL.
+
+    The model is loaded once in the child. Audio is copied into a
+    `multiprocessing.shared_memory` block that the child maps without pickling,
+    and the finished result comes back over a result queue.
+    """
+
+    def __init__(self, model_name="small"):
+        self.model_name = model_name
+        self.load_error = None
+        self._ready = threading.Event()
+        self._jobs = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+        ctx = get_context()
+        self._requests = ctx.Queue()
+        self._results = ctx.Queue()
+        self.process = ctx.Process(
+            target=_worker_main, args=(model_name, self._requests, self._results), daemon=True
+        )
+        with hidden_main_module():
+            self.process.start()
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+        logging.info(f"Transcription worker process started (pid {self.process.pid})")
+
+    def wait_ready(self, timeout=None):
+        """Wait for the child to finish loading the model. Returns False if it failed."""
+        self._ready.wait(timeout)
+        return self._ready.is_set() and self.load_error is None
+
+    def is_alive(self):
+        return self.process.is_alive() and self.load_error is None
+
+    def submit(self, audio, **options):
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(audio.nbytes, 1))
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+        job = TranscriptionJob(next(self._ids), shm)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._requests.put((job.job_id, shm.name, len(audio), options))
+        return job
+
+    def transcribe(self, audio, **options):
+        """Drop-in replacement for `model.transcribe` that runs in the worker."""
+        if not self.wait_ready():
+            raise RuntimeError(f"Whisper worker failed to load model: {self.load_error}")
+        return self.submit(audio, **options).wait()
+
+    def close(self):
+        self._requests.put(None)
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._results.put(("closed", None, None))
+        self._reader.join(timeout=5)
+
+    def _read_results(self):
+        while True:
+            try:
+                kind, job_id, payload = self._results.get(timeout=1.0)
+            except (EOFError, OSError):
+                break
+            except queue.Empty:
+                if not self.process.is_alive():
+                    self._fail_pending(f"Whisper worker exited with code {self.process.exitcode}")
+                    break
+                continue
+            if kind == "closed":
+                break
+            if kind == "ready":
+                logging.info(f"Whisper model '{self.model_name}' loaded in worker process")
+                self._ready.set()
+                continue
+            if kind == "failed":
+                logging.error(f"Error loading Whisper model in worker: {payload}")
+                self.load_error = payload
+                self._ready.set()
+                self._fail_pending(payload)
+                break
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if kind in ("done", "error"):
+                    self._jobs.pop(job_id, None)
+            if job is None:
+                continue
+            if kind == "done":
+                job._finish(result=payload)
+            else:
+                job._finish(error=payload)
+
+    def _fail_pending(self, error):
+        logging.error(error)
+        self.load_error = self.load_error or error
+        self._ready.set()
+        with self._lock:
+            jobs, self._jobs = list(self._jobs.values()), {}
+        for job in jobs:
+            job._finish(error=error)
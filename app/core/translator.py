@@ -0,0 +1,78 @@
+import logging
+
+import torch
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+MODEL_NAME = "facebook/nllb-200-distilled-600M"  # Faster version of NLLB
+
+#  Dictionary of Supported Languages (Including Indian Languages)
+LANGUAGES = {
+    "English": "eng_Latn",
+    "French": "fra_Latn",
+    "Spanish": "spa_Latn",
+    "German": "deu_Latn",
+    "Italian": "ita_Latn",
+    "Russian": "rus_Cyrl",
+    "Chinese": "zho_Hans",
+    # Indian Languages
+    "Hindi": "hin_Deva",
+    "Bengali": "ben_Beng",
+    "Tamil": "tam_Taml",
+    "Telugu": "tel_Telu",
+    "Marathi": "mar_Deva",
+    "Gujarati": "guj_Gujr",
+    "Punjabi": "pan_Guru",
+    "Malayalam": "mal_Mlym",
+    "Kannada": "kan_Knda",
+    "Odia": "ory_Orya",
+    "Urdu": "urd_Arab",
+}
+
+
+class Translator:
+    """NLLB-200 text translation between the languages in LANGUAGES."""
+
+    def __init__(self, model_name=MODEL_NAME, device=None):
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        try:
+            logging.info(f"Loading NLLB-200 model ({model_name}) on {self.device}...")
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name).to(self.device)
+            logging.info("Translation model loaded successfully")
+        except Exception as e:
+            logging.error(f"Failed to load NLLB model: {e}")
+            self.model, self.tokenizer = None, None
+
+    def translate(self, text, src_lang, tgt_lang):
+        if self.model is None or self.tokenizer is None:
+            return "Error: Model not loaded."
+
+        try:
+            # Convert language names to model-specific codes
+            src_lang_code = LANGUAGES.get(src_lang, "eng_Latn")
+            tgt_lang_code = LANGUAGES.get(tgt_lang, "hin_Deva")  # Default to Hindi
+
+            logging.info(f"Translating from {src_lang} ({src_lang_code}) → {tgt_lang} ({tgt_lang_code})")
+
+            #  Set source language in tokenizer
+            self.tokenizer.src_lang = src_lang_code
+
+            # Encode input text
+            inputs = self.tokenizer(text, return_tensors="pt", padding=True, truncation=True).to(self.device)
+
+            #  Get `forced_bos_token_id` correctly
+            tgt_lang_id = self.tokenizer.convert_tokens_to_ids(tgt_lang_code)
+
+            if tgt_lang_id is None or tgt_lang_id == self.tokenizer.unk_token_id:
+                logging.error(f"Invalid target language ID for {tgt_lang_code}.")
+                return "Translation failed: Invalid target language."
+
+            # Generate translation
+            with torch.no_grad():
+                translated_tokens = self.model.generate(**inputs, forced_bos_token_id=tgt_lang_id)
+
+            return self.tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
+
+        except Exception as e:
+            logging.error(f"Translation failed: {e}")
+            return f"Translation failed: {e}"
@@ -0,0 +1,168 @@
+import logging
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+# Parameters are part of the transcription cache key: change VAD_OPTIONS when tuning
+VAD_OPTIONS = {
+    'frame_seconds': 0.03,
+    'energy_margin_db': 12.0,   # Above the estimated noise floor
+    'min_energy_db': -50.0,     # Absolute gate in dBFS
+    'max_flatness': 0.4,        # White-ish noise is ~0.5, voiced speech well below 0.2
+    'min_band_ratio': 0.15,     # Share of energy in the 300-3400 Hz speech band
+    'min_modulation_db': 3.0,   # Speech loudness fluctuates; steady tones and hum do not
+    'min_speech_seconds': 0.25,
+    'min_silence_seconds': 0.6,
+    'pad_seconds': 0.2,
+}
+
+
+def _runs(mask):
+    """Start and end (exclusive) indexes of every run of True in a boolean array."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _moving_std(values, width):
+    # "same" returns max(len(values), width) samples: never let the kernel outgrow the input
+    width = max(1, min(width, len(values)))
+    kernel = np.ones(width) / width
+    mean = np.convolve(values, kernel, mode="same")
+    mean_sq = np.convolve(values * values, kernel, mode="same")
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+def frame_features(audio, frame_length, sample_rate=SAMPLE_RATE, block_frames=4096):
+    """
+    Per-frame energy (dBFS), spectral flatness and speech-band energy ratio for
+    non-overlapping frames. Spectra are computed a block of frames at a time to bound memory.
+    """
+    n_frames = len(audio) // frame_length
+    frames = audio[:n_frames * frame_length].reshape(n_frames, frame_length)
+    energy = 10 * np.log10(np.mean(frames * frames, axis=1, dtype=np.float64) + 1e-10)
+
+    window = np.hanning(frame_length).astype(np.float32)
+    freqs = np.fft.rfftfreq(frame_length, 1 / sample_rate)
+    in_band = (freqs >= 300) & (freqs <= 3400)
+    flatness = np.empty(n_frames)
+    band_ratio = np.empty(n_frames)
+    for start in range(0, n_frames, block_frames):
+        power = np.abs(np.fft.rfft(frames[start:start + block_frames] * window, axis=1)) ** 2 + 1e-12
+        total = power.sum(axis=1)
+        flatness[start:start + block_frames] = np.exp(np.mean(np.log(power), axis=1)) / (total / power.shape[1])
+        band_ratio[start:start + block_frames] = power[:, in_band].sum(axis=1) / total
+    return energy, flatness, band_ratio
+
+
+def detect_speech(audio, sample_rate=SAMPLE_RATE, options=VAD_OPTIONS):
+    """
+    Find speech regions in a mono float32 array. Returns an (n, 2) int array of
+    [start, end) sample ranges, padded and merged, in ascending order.
+    """
+    frame_length = int(options['frame_seconds'] * sample_rate)
+    if len(audio) < frame_length:
+        return np.zeros((0, 2), dtype=np.int64)
+    energy, flatness, band_ratio = frame_features(audio, frame_length, sample_rate)
+
+    # Adaptive gate: the quietest tenth of the recording estimates the noise floor
+    noise_floor = np.percentile(energy, 10)
+    threshold = max(noise_floor + options['energy_margin_db'], options['min_energy_db'])
+    modulation = _moving_std(energy, max(1, int(0.5 / options['frame_seconds'])))
+    speech = (
+        (energy > threshold)
+        & (flatness < options['max_flatness'])
+        & (band_ratio > options['min_band_ratio'])
+        & (modulation > options['min_modulation_db'])
+    )
+
+    starts, ends = _runs(speech)
+    frame_seconds = options['frame_seconds']
+    # Bridge short pauses first so words separated by brief gaps form one region
+    if len(starts) > 1:
+        gaps = starts[1:] - ends[:-1]
+        keep = np.concatenate(([True], gaps * frame_seconds >= options['min_silence_seconds']))
+        starts, ends = starts[keep], np.concatenate((ends[:-1][keep[1:]], ends[-1:]))
+    # Then drop isolated blips (clicks, bumps)
+    long_enough = (ends - starts) * frame_seconds >= options['min_speech_seconds']
+    starts, ends = starts[long_enough], ends[long_enough]
+    if not len(starts):
+        return np.zeros((0, 2), dtype=np.int64)
+
+    pad = int(options['pad_seconds'] * sample_rate)
+    starts = np.maximum(starts * frame_length - pad, 0)
+    ends = np.minimum(ends * frame_length + pad, len(audio))
+    # Padding can make neighbours overlap: merge them
+    merged_start = np.concatenate(([True], starts[1:] > ends[:-1]))
+    region_ends = np.maximum.accumulate(ends)
+    last_of_group = np.concatenate((merged_start[1:], [True]))
+    return np.stack((starts[merged_start], region_ends[last_of_group]), axis=1)
+
+
+class TimeMap:
+    """
+    Maps times in the speech-only audio back to the original recording.
+
+    The speech regions are concatenated without gaps, so a time in the compact audio
+    falls into exactly one region. Start times at a region boundary map to the start
+    of the next region, end times to the end of the previous one.
+    """
+
+    def __init__(self, regions, sample_rate=SAMPLE_RATE):
+        regions = np.asarray(regions, dtype=np.int64).reshape(-1, 2)
+        lengths = (regions[:, 1] - regions[:, 0]) / sample_rate
+        self.original_starts = regions[:, 0] / sample_rate
+        self.compact_starts = np.concatenate(([0.0], np.cumsum(lengths)[:-1]))
+        self.lengths = lengths
+
+    def boundaries(self, sample_rate=SAMPLE_RATE):
+        """Sample positions in the compact audio where two speech regions were joined."""
+        return np.round(self.compact_starts[1:] * sample_rate).astype(np.int64)
+
+    def to_original(self, t, end=False):
+        if not len(self.lengths):
+            return t
+        i = np.searchsorted(self.compact_starts, t, side="left" if end else "right") - 1
+        i = min(max(i, 0), len(self.lengths) - 1)
+        offset = min(max(t - self.compact_starts[i], 0.0), self.lengths[i])
+        return round(float(self.original_starts[i] + offset), 3)
+
+    def remap(self, result):
+        """Copy of a Whisper result with segment and word times on the original timeline."""
+        segments = []
+        for segment in result.get('segments', []):
+            segment = dict(segment, start=self.to_original(segment['start']),
+                           end=self.to_original(segment['end'], end=True))
+            if segment.get('words'):
+                segment['words'] = [
+                    dict(word, start=self.to_original(word['start']), end=self.to_original(word['end'], end=True))
+                    for word in segment['words']
+                ]
+            segments.append(segment)
+        return dict(result, segments=segments)
+
+
+def apply_vad(audio, sample_rate=SAMPLE_RATE, options=VAD_OPTIONS):
+    """
+    Cut non-speech out of `audio`. Returns (speech_audio, time_map, stats); `stats`
+    reports how much of the recording was skipped.
+    """
+    regions = detect_speech(audio, sample_rate, options)
+    if len(regions):
+        speech_audio = np.concatenate([audio[start:end] for start, end in regions])
+    else:
+        speech_audio = audio[:0]
+
+    total = len(audio) / sample_rate
+    kept = len(speech_audio) / sample_rate
+    stats = {
+        'total_seconds': total,
+        'speech_seconds': kept,
+        'skipped_seconds': total - kept,
+        'skipped_ratio': (total - kept) / total if total else 0.0,
+        'regions': len(regions),
+    }
+    logging.info(
+        f"VAD skipped {stats['skipped_seconds']:.1f}s of {total:.1f}s "
+        f"({stats['skipped_ratio']:.0%}), {len(regions)} speech regions"
+    )
+    return speech_audio, TimeMap(regions, sample_rate), stats
@@ -0,0 +1,97 @@
+import logging
+import os
+import struct
+import time
+
+HEADER_SIZE = 44
+MAX_DATA_BYTES = 0xFFFFFFFF - 36  # RIFF sizes are 32-bit
+
+
+def _wav_header(data_bytes, rate, channels, sample_width):
+    data_bytes = min(data_bytes, MAX_DATA_BYTES)
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_bytes, b"WAVE",
+        b"fmt ", 16, 1, channels, rate, rate * block_align, block_align, sample_width * 8,
+        b"data", data_bytes,
+    )
+
+
+class IncrementalWavWriter:
+    """
+    Streams PCM to a WAV file as it arrives instead of buffering the whole recording.
+
+    Every `flush_interval` seconds the RIFF and data sizes in the header are patched to
+    match what has been written and the file is fsynced, so a recording cut off by a
+    crash is a valid WAV up to the last flush. Memory use is independent of duration.
+    """
+
+    def __init__(self, path, rate, channels=1, sample_width=2, flush_interval=2.0):
+        self.path = path
+        self.rate = rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.flush_interval = flush_interval
+        self.data_bytes = 0
+        self.file = open(path, "wb")
+        self.file.write(_wav_header(0, rate, channels, sample_width))
+        self._last_flush = time.monotonic()
+
+    def write(self, data):
+        """Append raw PCM; accepts bytes or any buffer such as an int16 numpy array."""
+        self.file.write(data)
+        self.data_bytes += memoryview(data).nbytes
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Patch the header sizes and push everything written so far to disk."""
+        position = self.file.tell()
+        self.file.seek(0)
+        self.file.write(_wav_header(self.data_bytes, self.rate, self.channels, self.sample_width))
+        self.file.seek(position)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+        if self.data_bytes > MAX_DATA_BYTES:
+            logging.warning(f"{self.path} exceeds the 4 GB WAV limit; header sizes are clamped")
+
+    @property
+    def duration(self):
+        return self.data_bytes / (self.rate * self.channels * self.sample_width)
+
+
+def recover_wav(path):
+    """
+    Rewrites the header of a WAV left behind by an interrupted recording so that it
+    covers every complete frame on disk. Returns True if the header was repaired.
+    """
+    try:
+        size = os.path.getsize(path)
+        if size < HEADER_SIZE:
+            return False
+        with open(path, "r+b") as f:
+            header = f.read(HEADER_SIZE)
+            fields = struct.unpack("<4sI4s4sIHHIIHH4sI", header)
+            riff, _, wave_id, fmt, _, _, channels, rate, _, block_align, bits, data_id, data_bytes = fields
+            if riff != b"RIFF" or wave_id != b"WAVE" or fmt != b"fmt " or data_id != b"data":
+                logging.error(f"{path} was not written by IncrementalWavWriter, cannot recover")
+                return False
+            on_disk = size - HEADER_SIZE
+            on_disk -= on_disk % block_align
+            if data_bytes == min(on_disk, MAX_DATA_BYTES):
+                return False
+            f.seek(0)
+            f.write(_wav_header(on_disk, rate, channels, bits // 8))
+        logging.info(f"Recovered {on_disk / (rate * block_align):.1f}s of audio in {path}")
+        return True
+    except Exception as e:
+        logging.error(f"Error recovering {path}: {e}")
+        return False
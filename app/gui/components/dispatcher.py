@@ -0,0 +1,106 @@
+import collections
+import logging
+import threading
+import tkinter as tk
+
+TICK_MS = 33  # ~30 UI frames per second
+
+_CALL = 0
+_APPEND = 1
+
+
+class UIDispatcher:
+    """
+    Hands work from background threads to the Tk main thread.
+
+    Tk widgets may only be touched from the thread running mainloop, so workers
+    post updates here instead. A fixed `after()` tick drains everything queued since
+    the last frame and merges bursts: consecutive text appended to the same widget
+    becomes a single insert, and `post_latest` keeps only the newest update per key
+    (progress bars, status labels). Safe to call from any thread, including the main one.
+    """
+
+    def __init__(self, root, tick_ms=TICK_MS):
+        self.root = root
+        self.tick_ms = tick_ms
+        self._queue = collections.deque()
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._after_id = None
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.tick_ms, self._tick)
+        return self
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._drain()
+
+    def post(self, callback, *args):
+        """Run `callback(*args)` on the main thread; every posted call runs, in order."""
+        self._queue.append((_CALL, callback, args))
+
+    def post_latest(self, key, callback, *args):
+        """Like `post`, but only the last update per `key` within a frame runs."""
+        with self._lock:
+            self._latest[key] = (callback, args)
+
+    def append(self, widget, text, see=False):
+        """Append `text` to a Text widget, even one kept read-only with state=DISABLED."""
+        self._queue.append((_APPEND, widget, (text, see)))
+
+    def _tick(self):
+        self._after_id = None
+        try:
+            self._drain()
+        finally:
+            self._after_id = self.root.after(self.tick_ms, self._tick)
+
+    def _drain(self):
+        items = []
+        while self._queue:
+            items.append(self._queue.popleft())
+        with self._lock:
+            latest, self._latest = self._latest, {}
+
+        # Merge runs of appends to the same widget, keeping calls in their original order
+        pending = {}  # widget -> [text parts, see]
+        for kind, target, args in items:
+            if kind == _APPEND:
+                text, see = args
+                entry = pending.setdefault(target, [[], False])
+                entry[0].append(text)
+                entry[1] = entry[1] or see
+                continue
+            self._flush(pending)
+            self._run(target, args)
+        self._flush(pending)
+        for callback, args in latest.values():
+            self._run(callback, args)
+
+    def _flush(self, pending):
+        for widget, (parts, see) in pending.items():
+            self._run(_insert_text, (widget, "".join(parts), see))
+        pending.clear()
+
+    def _run(self, callback, args):
+        try:
+            callback(*args)
+        except tk.TclError:
+            pass  # The widget was closed before its update arrived
+        except Exception as e:
+            logging.getLogger(__name__).debug(f"UI update failed: {e}", exc_info=True)
+
+
+def _insert_text(widget, text, see):
+    state = widget.cget("state")
+    if state == tk.DISABLED:
+        widget.config(state=tk.NORMAL)
+    widget.insert(tk.END, text)
+    if state == tk.DISABLED:
+        widget.config(state=tk.DISABLED)
+    if see:
+        widget.see(tk.END)
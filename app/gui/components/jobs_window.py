@@ -0,0 +1,53 @@
+import tkinter as tk
+from tkinter import Toplevel, ttk
+
+from app.core.scheduler import PRIORITY_NAMES, QUEUED, RUNNING
+
+REFRESH_MS = 500
+
+
+def open_jobs_window(root, scheduler):
+    """Shows queued, running and recent jobs with a button to cancel the selected ones."""
+    window = Toplevel(root)
+    window.title("Background Jobs")
+    window.geometry("700x300")
+    window.configure(bg=root.cget("bg"))
+
+    columns = ("name", "priority", "resource", "status", "elapsed", "message")
+    tree = ttk.Treeview(window, columns=columns, show="headings", height=10)
+    widths = {"name": 180, "priority": 80, "resource": 70, "status": 70, "elapsed": 60, "message": 220}
+    for column in columns:
+        tree.heading(column, text=column.capitalize())
+        tree.column(column, width=widths[column], anchor=tk.W)
+    tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+
+    def cancel_selected():
+        selected = set(tree.selection())
+        for job in scheduler.jobs():
+            if str(job.id) in selected:
+                job.cancel()
+
+    tk.Button(window, text="Cancel Selected", command=cancel_selected).pack(pady=(0, 10))
+
+    def refresh():
+        if not window.winfo_exists():
+            return
+        jobs = scheduler.jobs()
+        shown = set(tree.get_children())
+        for job in jobs:
+            elapsed = f"{job.elapsed():.0f}s" if job.status == RUNNING or job.finished else ""
+            values = (job.name, PRIORITY_NAMES.get(job.priority, job.priority), job.resource,
+                      job.status, elapsed, job.message)
+            iid = str(job.id)
+            if iid in shown:
+                tree.item(iid, values=values)
+                shown.discard(iid)
+            else:
+                # Queued and running jobs on top, newest finished ones below them
+                tree.insert("", 0 if job.status in (QUEUED, RUNNING) else tk.END, iid=iid, values=values)
+        for iid in shown:
+            tree.delete(iid)
+        window.after(REFRESH_MS, refresh)
+
+    refresh()
+    return window
@@ -1,13 +1,113 @@
+import collections
 import logging
+import logging.handlers
+import os
+import threading
 import tkinter as tk
+
+DEFAULT_LOG_FILE = os.path.join(os.path.expanduser("~"), ".cache", "whisper_transcriber", "logs", "app.log")
+LEVELS = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARNING": logging.WARNING, "ERROR": logging.ERROR}
+
+
 class TextBoxLogHandler(logging.Handler):
-    def __init__(self, text_widget):
+    """
+    Log panel backed by a fixed-size ring buffer.
+
+    `emit` only appends to the buffer, so it is cheap and safe from any thread. The
+    widget is refreshed on the Tk thread every `refresh_ms` with a single insert, at most
+    `max_lines_per_refresh` lines at a time; records beyond that are replaced by a
+    "N messages suppressed" line. The widget never holds more than `max_lines` lines.
+    All levels are buffered, so lowering the display level shows recent DEBUG records too.
+    """
+    def __init__(self, text_widget, display_level=logging.INFO, capacity=2000, max_lines=500,
+                 refresh_ms=250, max_lines_per_refresh=100):
         super().__init__()
         self.text_widget = text_widget
+        self.display_level = display_level
+        self.max_lines = max_lines
+        self.refresh_ms = refresh_ms
+        self.max_lines_per_refresh = max_lines_per_refresh
+        self._records = collections.deque(maxlen=capacity)  # (levelno, message)
+        self._pending = collections.deque()
+        self._suppressed = 0
+        self._buffer_lock = threading.Lock()
+        self.text_widget.tag_configure("suppressed", foreground="#999999")
+        self._after_id = self.text_widget.after(self.refresh_ms, self._refresh)
 
     def emit(self, record):
-        msg = self.format(record)
-        self.text_widget.config(state=tk.NORMAL)
-        self.text_widget.insert(tk.END, msg + '\n')
-        self.text_widget.config(state=tk.DISABLED)
-        self.text_widget.see(tk.END)
\ No newline at end of file
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._buffer_lock:
+            self._records.append((record.levelno, msg))
+            if record.levelno < self.display_level:
+                return
+            if len(self._pending) < self.max_lines_per_refresh:
+                self._pending.append(msg)
+            else:
+                self._suppressed += 1
+
+    def set_display_level(self, level):
+        """Show records at `level` and above; rebuilds the panel from the ring buffer."""
+        if isinstance(level, str):
+            level = LEVELS[level]
+        with self._buffer_lock:
+            self.display_level = level
+            lines = [msg for levelno, msg in self._records if levelno >= level][-self.max_lines:]
+            self._pending.clear()
+            self._suppressed = 0
+        widget = self.text_widget
+        widget.config(state=tk.NORMAL)
+        widget.delete("1.0", tk.END)
+        if lines:
+            widget.insert(tk.END, "\n".join(lines) + "\n")
+        widget.config(state=tk.DISABLED)
+        widget.see(tk.END)
+
+    def close(self):
+        if self._after_id is not None:
+            try:
+                self.text_widget.after_cancel(self._after_id)
+            except (tk.TclError, RuntimeError):  # Tk already shut down
+                pass
+            self._after_id = None
+        super().close()
+
+    def _refresh(self):
+        try:
+            self._flush_to_widget()
+        except tk.TclError:
+            self._after_id = None  # The window is gone
+            return
+        self._after_id = self.text_widget.after(self.refresh_ms, self._refresh)
+
+    def _flush_to_widget(self):
+        with self._buffer_lock:
+            if not self._pending and not self._suppressed:
+                return
+            lines, self._pending = list(self._pending), collections.deque()
+            suppressed, self._suppressed = self._suppressed, 0
+
+        widget = self.text_widget
+        widget.config(state=tk.NORMAL)
+        if lines:
+            widget.insert(tk.END, "\n".join(lines) + "\n")
+        if suppressed:
+            widget.insert(tk.END, f"... {suppressed} messages suppressed (see the log file) ...\n", "suppressed")
+        # Keep only the newest max_lines lines (the Text widget always ends with one empty line)
+        excess = int(widget.index("end-1c").split(".")[0]) - 1 - self.max_lines
+        if excess > 0:
+            widget.delete("1.0", f"{excess + 1}.0")
+        widget.config(state=tk.DISABLED)
+        widget.see(tk.END)
+
+
+def add_file_handler(path=DEFAULT_LOG_FILE, max_bytes=5 * 1024 * 1024, backups=3):
+    """Write the full log stream (every level) to a rotating file next to the cache."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(threadName)s - %(levelname)s - %(name)s - %(message)s'))
+    logging.getLogger().addHandler(handler)
+    return handler
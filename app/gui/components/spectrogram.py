@@ -0,0 +1,172 @@
+import logging
+import threading
+import time
+import numpy as np
+import matplotlib
+matplotlib.use("TkAgg")
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+from app.core.capture import CaptureEngine, DROP_OLDEST
+from app.utils.dsp import RollingSTFT, int16_to_float32, peak_rms_dbfs
+
+METER_FLOOR_DB = -60.0
+CLIP_DB = -0.5  # Peaks this close to full scale count as clipping
+SILENT_DB = -55.0  # RMS below this for SILENT_SECONDS looks like a muted mic
+SILENT_SECONDS = 2.0
+PEAK_FALL_DB_PER_SECOND = 20.0
+
+
+class SpectrogramView:
+    """
+    Live spectrogram with a peak/RMS level meter, for spotting clipping or a muted mic.
+
+    Capture buffers are only collected on the subscription thread. Each frame on the
+    Tk thread feeds what arrived to a RollingSTFT, which transforms just the new columns,
+    measures the level of the same samples, and blits the image and meter artists.
+    """
+
+    def __init__(self, frame, engine=None, fps=15, seconds=5, n_fft=1024, hop=512, max_khz=8):
+        self.parent = frame
+        self.engine = engine or CaptureEngine()
+        self.subscription = None
+        self.is_recording = False
+        self.frame_ms = int(1000 / fps)
+        self.seconds = seconds
+        self.stft = RollingSTFT(n_fft, hop, columns=max(1, int(seconds * self.engine.rate / hop)))
+        self._pending = []
+        self._lock = threading.Lock()
+        self._after_id = None
+        self._background = None
+        self._peak_hold = METER_FLOOR_DB
+        self._last_tick = None
+        self._last_clip = 0.0
+        self._quiet_since = None
+
+        self.fig = Figure(figsize=(4, 2.2), dpi=100, facecolor='#2b2b2b')
+        grid = self.fig.add_gridspec(1, 2, width_ratios=(8, 1), wspace=0.08)
+        self.ax = self.fig.add_subplot(grid[0])
+        self.meter_ax = self.fig.add_subplot(grid[1])
+        nyquist_khz = self.engine.rate / 2000
+        self.image = self.ax.imshow(
+            self.stft.ordered().T, origin='lower', aspect='auto', cmap='magma',
+            extent=(-seconds, 0, 0, nyquist_khz), vmin=self.stft.floor_db + 20, vmax=0,
+            interpolation='nearest', animated=True,
+        )
+        self.ax.set_ylim(0, min(max_khz, nyquist_khz))
+        self.ax.set_ylabel("kHz")
+
+        self.meter_ax.set_xlim(0, 1)
+        self.meter_ax.set_ylim(METER_FLOOR_DB, 0)
+        self.meter_ax.set_xticks([])
+        self.meter_ax.yaxis.tick_right()
+        self.rms_bar = Rectangle((0, METER_FLOOR_DB), 1, 0, color='#4caf50', animated=True)
+        self.meter_ax.add_patch(self.rms_bar)
+        self.peak_line, = self.meter_ax.plot([0, 1], [METER_FLOOR_DB] * 2, color='white', linewidth=2, animated=True)
+        self.status_text = self.ax.text(0.02, 0.9, "", transform=self.ax.transAxes, color='#ff5252',
+                                        fontsize=9, fontweight='bold', animated=True)
+        self._artists = (self.image, self.status_text, self.rms_bar, self.peak_line)
+        self._style('white', '#2b2b2b')
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.parent)
+        self.canvas_widget = self.canvas.get_tk_widget()
+        self.canvas_widget.configure(bg='#2b2b2b', highlightthickness=0)
+        self.canvas_widget.pack(fill='both', expand=True, padx=10, pady=5)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def start_recording(self):
+        self.is_recording = True
+        self.stft.reset()
+        self._peak_hold = METER_FLOOR_DB
+        self._last_tick = time.monotonic()
+        self._last_clip = 0.0
+        self._quiet_since = None
+        with self._lock:
+            self._pending = []
+        self.subscription = self.engine.subscribe("spectrogram", maxsize=16, drop_policy=DROP_OLDEST).pump(self._on_buffer)
+        self._after_id = self.canvas_widget.after(self.frame_ms, self._tick)
+
+    def stop_recording(self):
+        self.is_recording = False
+        if self.subscription:
+            self.subscription.close()
+            self.subscription = None
+        if self._after_id is not None:
+            self.canvas_widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _on_buffer(self, buffer):
+        with self._lock:
+            self._pending.append(buffer)
+
+    def _tick(self):
+        self._after_id = None
+        if not self.is_recording:
+            return
+        try:
+            self._render()
+        except Exception as e:
+            logging.error(f"Error updating spectrogram: {e}")
+        self._after_id = self.canvas_widget.after(self.frame_ms, self._tick)
+
+    def _render(self):
+        with self._lock:
+            buffers, self._pending = self._pending, []
+        now = time.monotonic()
+        elapsed, self._last_tick = now - self._last_tick, now
+        if not buffers:
+            return
+        samples = int16_to_float32(np.concatenate(buffers))
+        self.stft.feed(samples)
+        peak, rms = peak_rms_dbfs(samples)
+        self._update_meter(peak, rms, elapsed, now)
+
+        self.image.set_data(self.stft.ordered().T)
+        if self._background is None:
+            self.canvas.draw()  # Caches a fresh background via _on_draw
+        self.canvas.restore_region(self._background)
+        for artist in self._artists:
+            artist.axes.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+
+    def _update_meter(self, peak, rms, elapsed, now):
+        # Peak hold falls back slowly so short transients stay visible
+        self._peak_hold = max(peak, self._peak_hold - PEAK_FALL_DB_PER_SECOND * elapsed)
+        if peak >= CLIP_DB:
+            self._last_clip = now
+        if rms < SILENT_DB:
+            self._quiet_since = self._quiet_since or now
+        else:
+            self._quiet_since = None
+
+        clipping = now - self._last_clip < 1.0
+        self.rms_bar.set_height(max(0.0, rms - METER_FLOOR_DB))
+        self.rms_bar.set_color('#ff5252' if clipping else '#4caf50')
+        hold = max(self._peak_hold, METER_FLOOR_DB)
+        self.peak_line.set_ydata([hold, hold])
+        if clipping:
+            self.status_text.set_text("CLIPPING")
+        elif self._quiet_since and now - self._quiet_since >= SILENT_SECONDS:
+            self.status_text.set_text("NO SIGNAL - mic muted?")
+        else:
+            self.status_text.set_text("")
+
+    def _on_draw(self, event):
+        # Full redraws (first show, resize, theme change) invalidate the cached background
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self._artists:
+            artist.axes.draw_artist(artist)
+
+    def _style(self, axis_color, bg):
+        self.fig.set_facecolor(bg)
+        for ax in (self.ax, self.meter_ax):
+            ax.set_facecolor(bg)
+            ax.tick_params(axis='x', colors=axis_color)
+            ax.tick_params(axis='y', colors=axis_color)
+        self.ax.yaxis.label.set_color(axis_color)
+        self.peak_line.set_color(axis_color)
+
+    def update_theme(self, theme):
+        self._style(theme['axis_color'], theme['plot_bg'])
+        self.canvas_widget.configure(bg=theme['plot_bg'])
+        self.canvas.draw()
@@ -1,78 +1,165 @@
-import pyaudio
 import numpy as np
+import threading
 import matplotlib
 matplotlib.use("TkAgg")
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-import threading
+from app.core.capture import CaptureEngine, DROP_OLDEST
+
+WAVEFORM = "waveform"  # The latest capture buffer
+ENVELOPE = "envelope"  # Scrolling min/max of the last `history_seconds`
+
 
 class WaveformVisualizer:
-    def __init__(self, frame):
+    """
+    Live input display, redrawn on the Tk thread at a fixed frame rate.
+
+    Capture buffers only update preallocated arrays: the newest buffer, and a ring of
+    per-column min/max values reduced from just the samples that arrived, so the work per
+    buffer is the same however long the recording runs. Each frame restores the cached
+    axes background and blits the one line artist instead of redrawing the whole figure.
+    Click the plot to switch between the waveform and the envelope view.
+    """
+
+    def __init__(self, frame, engine=None, fps=30, history_seconds=10, columns=400, mode=ENVELOPE):
         self.parent = frame
+        # Shares the recorder's capture stream instead of opening the device a second time
+        self.engine = engine or CaptureEngine()
+        self.subscription = None
         self.is_recording = False
+        self.frame_ms = int(1000 / fps)
+        self.mode = mode
+        self._after_id = None
+        self._lock = threading.Lock()
+        self._background = None
+
+        self.chunk_size = self.engine.chunk_size
+        self.history_seconds = history_seconds
+        self.columns = columns
+        # Samples reduced into each envelope column
+        self.column_samples = max(1, int(self.engine.rate * history_seconds / columns))
+        self._latest = np.zeros(self.chunk_size, dtype=np.int16)
+        self._env_min = np.zeros(columns, dtype=np.int16)
+        self._env_max = np.zeros(columns, dtype=np.int16)
+        self._env_pos = 0  # Next column to write; the oldest column once the ring is full
+        self._carry = np.zeros(0, dtype=np.int16)  # Samples not yet filling a whole column
+        self._dirty = False
+
         # Create matplotlib figure
         self.fig = Figure(figsize=(4, 4), dpi=100, facecolor='#2b2b2b')
         self.ax = self.fig.add_subplot(111)
         self.ax.set_facecolor('#2b2b2b')
         self.ax.tick_params(axis='x', colors='white')
         self.ax.tick_params(axis='y', colors='white')
-        
-        # Set up the line plot with matching dimensions
-        self.chunk_size = 1024
-        self.x = np.arange(0, self.chunk_size)
-        self.line, = self.ax.plot(self.x, np.zeros(self.chunk_size), color='#4caf50')
-        
-        # Configure plot appearance
         self.ax.set_ylim(-32768, 32767)
-        self.ax.set_xlim(0, self.chunk_size)
         self.ax.grid(True, color='#444444')
-        
+        # Animated artists are left out of full redraws and blitted on their own
+        self.line, = self.ax.plot([], [], color='#4caf50', linewidth=1, animated=True)
+        self._apply_mode()
+
         # Create canvas
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.parent)
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.configure(bg='#2b2b2b', highlightthickness=0)
         self.canvas_widget.pack(fill='both', expand=True, padx=10, pady=5)
-        
-        # Audio stream configuration
-        self.format = pyaudio.paInt16
-        self.channels = 1
-        self.rate = 44100
-        self.p = None
-        self.stream = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('button_press_event', lambda event: self.toggle_mode())
 
     def start_recording(self):
         self.is_recording = True
-        threading.Thread(target=self._record_stream, daemon=True).start()
+        with self._lock:
+            self._env_min[:] = 0
+            self._env_max[:] = 0
+            self._env_pos = 0
+            self._carry = np.zeros(0, dtype=np.int16)
+        # Only the latest buffers matter for display, stale ones are dropped
+        self.subscription = self.engine.subscribe("waveform", maxsize=4, drop_policy=DROP_OLDEST).pump(self._on_buffer)
+        self._schedule()
 
     def stop_recording(self):
         self.is_recording = False
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-        if self.p:
-            self.p.terminate()
-
-    def _record_stream(self):
-        self.p = pyaudio.PyAudio()
-        self.stream = self.p.open(
-            format=self.format,
-            channels=self.channels,
-            rate=self.rate,
-            input=True,
-            frames_per_buffer=self.chunk_size
-        )
-
-        while self.is_recording:
-            try:
-                data = self.stream.read(self.chunk_size)
-                audio_data = np.frombuffer(data, dtype=np.int16)
-                self.line.set_ydata(audio_data)
-                self.canvas.draw_idle()
-            except Exception as e:
-                print(f"Error reading audio stream: {e}")
-                break
-
-        self.stop_recording()
+        if self.subscription:
+            self.subscription.close()
+            self.subscription = None
+        if self._after_id is not None:
+            self.canvas_widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def toggle_mode(self):
+        self.mode = WAVEFORM if self.mode == ENVELOPE else ENVELOPE
+        self._apply_mode()
+        self.canvas.draw_idle()
+
+    def _apply_mode(self):
+        if self.mode == ENVELOPE:
+            # Each column is drawn as a vertical stroke from its min to its max
+            self._x = np.repeat(np.linspace(-self.history_seconds, 0, self.columns), 2)
+            self._y = np.zeros(2 * self.columns)
+            self.ax.set_xlim(-self.history_seconds, 0)
+        else:
+            self._x = np.arange(self.chunk_size)
+            self._y = np.zeros(self.chunk_size)
+            self.ax.set_xlim(0, self.chunk_size)
+        self._dirty = True
+
+    def _on_buffer(self, buffer):
+        """Runs on the capture subscription thread for every buffer."""
+        with self._lock:
+            n = min(len(buffer), self.chunk_size)
+            self._latest[:n] = buffer[:n]
+            self._latest[n:] = 0
+            samples = np.concatenate((self._carry, buffer)) if len(self._carry) else buffer
+            count = len(samples) // self.column_samples
+            if count:
+                blocks = samples[:count * self.column_samples].reshape(count, self.column_samples)
+                self._push_columns(blocks.min(axis=1), blocks.max(axis=1))
+            self._carry = samples[count * self.column_samples:].copy()
+            self._dirty = True
+
+    def _push_columns(self, mins, maxs):
+        if len(mins) > self.columns:
+            mins, maxs = mins[-self.columns:], maxs[-self.columns:]
+        index = (self._env_pos + np.arange(len(mins))) % self.columns
+        self._env_min[index] = mins
+        self._env_max[index] = maxs
+        self._env_pos = (self._env_pos + len(mins)) % self.columns
+
+    def _schedule(self):
+        self._after_id = self.canvas_widget.after(self.frame_ms, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        if not self.is_recording:
+            return
+        try:
+            self._render()
+        except Exception as e:
+            print(f"Error updating waveform: {e}")
+        self._schedule()
+
+    def _render(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            if self.mode == ENVELOPE:
+                order = (self._env_pos + np.arange(self.columns)) % self.columns
+                self._y[0::2] = self._env_min[order]
+                self._y[1::2] = self._env_max[order]
+            else:
+                self._y[:] = self._latest
+        self.line.set_data(self._x, self._y)
+        if self._background is None:
+            self.canvas.draw()  # Caches a fresh background via _on_draw
+        self.canvas.restore_region(self._background)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
+
+    def _on_draw(self, event):
+        # Full redraws (first show, resize, theme change) invalidate the cached background
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
+
     def update_theme(self, theme):
         self.fig.set_facecolor(theme['plot_bg'])
         self.ax.set_facecolor(theme['plot_bg'])
@@ -83,4 +170,4 @@ class WaveformVisualizer:
         self.ax.xaxis.label.set_color(theme['axis_color'])
         self.ax.yaxis.label.set_color(theme['axis_color'])
         self.ax.title.set_color(theme['axis_color'])
-        self.canvas.draw()
\ No newline at end of file
+        self.canvas.draw()
@@ -4,6 +4,10 @@ from tkinter import simpledialog
 from tkinter import Toplevel, ttk
 import threading
 import time
+from app.core.live_transcriber import LiveTranscriber
+from app.core.capture import DROP_OLDEST
+from app.core.scheduler import INTERACTIVE, MODEL
+
 def start_recording(Recording,event=None):
     if not Recording['save_directory']:
         logging.warning("Save directory is not set. Please select a directory first.")
@@ -13,6 +17,7 @@ def start_recording(Recording,event=None):
     try:
         Recording['recorder'].start_recording()
         Recording['visualizer'].start_recording()
+        Recording['spectrogram'].start_recording()
         Recording['start_button'].config(state=tk.DISABLED)
         Recording['stop_button'].config(state=tk.NORMAL)
         Recording['transcribe_button'].config(state=tk.DISABLED)
@@ -23,6 +28,7 @@ def start_recording(Recording,event=None):
         # threading.Thread(target = plot_waveform).start()
 
         Recording['transcription_box'].delete(1.0, tk.END)  # Clear previous transcription
+        _start_live_transcription(Recording)
         logging.info("Start recording button clicked")
     except RuntimeError as e:
         logging.error(e)
@@ -31,14 +37,62 @@ def start_recording(Recording,event=None):
         Recording['log_box'].config(state=tk.DISABLED)
 
 def stop_recording(Recording,event=None):
-    Recording['recorder'].stop_recording()
+    # Detach the other consumers first so the recorder, as the last subscriber,
+    # receives every sample still in the capture ring buffer
     Recording['visualizer'].stop_recording()
+    Recording['spectrogram'].stop_recording()
+    _stop_live_transcription(Recording)
+    Recording['recorder'].stop_recording()
     Recording['start_button'].config(state=tk.NORMAL)
     Recording['stop_button'].config(state=tk.DISABLED)
     Recording['transcribe_button'].config(state=tk.NORMAL)
     Recording['rename_audio_button'].config(state=tk.NORMAL)
+    stats = Recording['recorder'].capture_stats
+    if stats['input_overflows'] or stats['dropped_frames']:
+        logging.warning(f"Capture lost audio: {stats['input_overflows']} overflows, {stats['dropped_frames']} dropped frames")
     logging.info("Stop recording button clicked")
 
+def _start_live_transcription(Recording):
+    """Stream captured audio into a LiveTranscriber when live mode is enabled."""
+    live_var = Recording.get('live_var')
+    if not live_var or not live_var.get() or not Recording['transcriber'].is_available():
+        return
+
+    def on_update(committed, tentative):
+        Recording['dispatcher'].post(_show_live_update, Recording, committed, tentative)
+
+    engine = Recording['recorder'].engine
+    live = LiveTranscriber(Recording['transcriber'], source_rate=engine.rate, on_update=on_update)
+    Recording['live_transcriber'] = live
+    Recording['live_subscription'] = engine.subscribe("live", maxsize=256, drop_policy=DROP_OLDEST).pump(live.feed)
+    live.start()
+
+def _stop_live_transcription(Recording):
+    live = Recording.pop('live_transcriber', None)
+    if not live:
+        return
+    subscription = Recording.pop('live_subscription')
+    subscription.close()
+
+    def finish():
+        subscription.close(wait=True)
+        live.stop()
+
+    # The final decode can take a few seconds, keep it off the Tk thread
+    threading.Thread(target=finish, daemon=True).start()
+
+def _show_live_update(Recording, committed, tentative):
+    """Append committed text and replace the greyed-out tentative tail."""
+    box = Recording['transcription_box']
+    box.tag_configure("tentative", foreground="#888888")
+    if box.tag_ranges("tentative"):
+        box.delete("tentative.first", "tentative.last")
+    if committed:
+        box.insert(tk.END, committed)
+    if tentative:
+        box.insert(tk.END, tentative, "tentative")
+    box.see(tk.END)
+
 def transcribe_with_progress(Recording,event=None):
     """
     Automatically displays a progress tracking window during transcription.
@@ -67,13 +121,28 @@ def transcribe_with_progress(Recording,event=None):
     progress_bar["maximum"] = 100
     progress_bar["value"] = 0
 
-    def update_status(message, value):
-        """Updates the status message and progress bar value."""
+    dispatcher = Recording['dispatcher']
+    box = Recording['transcription_box']
+
+    def show_status(message, value):
         status_label.config(text=message)
         progress_bar["value"] = value
-        Recording['root'].update_idletasks()
 
-    def run_transcription():
+    def update_status(message, value):
+        """Updates the status message and progress bar value (from any thread)."""
+        dispatcher.post_latest(progress_win, show_status, message, value)
+
+    def show_transcription(transcription, vad_stats):
+        box.delete(1.0, tk.END)
+        box.insert(tk.END, transcription)
+        if vad_stats and vad_stats['skipped_seconds'] >= 1:
+            box.insert(
+                tk.END,
+                f"\n\nSkipped {vad_stats['skipped_seconds']:.0f}s of silence/non-speech "
+                f"({vad_stats['skipped_ratio']:.0%} of the recording)\n"
+            )
+
+    def run_transcription(job):
         try:
             # Phase 1: Loading file
             update_status("Loading file...", 20)
@@ -82,7 +151,10 @@ def transcribe_with_progress(Recording,event=None):
 
             # Phase 2: Transcribing audio
             update_status("Transcribing...", 50)
-            transcription = Recording['transcriber'].transcribe_audio(Recording['recorder'].filepath, Recording['save_directory'])
+            transcription = Recording['transcriber'].transcribe_audio(
+                Recording['recorder'].filepath, Recording['save_directory'],
+                audio=Recording['recorder'].get_model_audio(),
+            )
 
             # Phase 3: Saving transcription
             update_status("Saving transcription...", 80)
@@ -91,19 +163,16 @@ def transcribe_with_progress(Recording,event=None):
 
             # Finalize progress
             update_status("Complete", 100)
-            Recording['root'].update_idletasks()
 
             # Display the transcription in the transcription box
-            Recording['transcription_box'].delete(1.0, tk.END)
-            Recording['transcription_box'].insert(tk.END, transcription)
+            dispatcher.post(show_transcription, transcription, Recording['transcriber'].vad_stats)
         except Exception as e:
-            Recording['transcription_box'].insert(tk.END, f"Error: {e}\n")
-        finally:
-            progress_win.destroy()
+            dispatcher.append(box, f"Error: {e}\n")
 
-    # Run the transcription process in a background thread
-    t = threading.Thread(target=run_transcription)
-    t.start()
+    # Run the transcription as an interactive job so it never waits behind a batch
+    Recording['scheduler'].submit("Transcribe recording", run_transcription, MODEL, INTERACTIVE,
+        on_done=lambda job: dispatcher.post(progress_win.destroy),  # Also when cancelled before it started
+    )
 
 def rename_audio_file(Recording,event=None):
     if not Recording['recorder'].filepath:
@@ -3,9 +3,9 @@ from tkinter import filedialog, simpledialog
 import tkinter as tk
 import os
 from tkinter import messagebox
-import threading
-import time
 from tkinter import Toplevel, ttk
+from app.core.batch import BatchTranscriber
+from app.core.scheduler import BULK, MODEL
 def browse_directory(Files,event=None):
     directory = filedialog.askdirectory(title="Select Directory")
     if directory:
@@ -40,8 +40,9 @@ def browse_multiple_files(Files):
 
 def process_batch_transcription(Files,filepaths):
     """
-    Processes multiple audio files and appends transcriptions to a single file (batch_transcription.txt)
-    while showing a progress bar with detailed status messages.
+    Processes multiple audio files into a single file (batch_transcription.txt) while showing
+    a progress bar with detailed status messages. Files finished by an earlier, interrupted run
+    of the same batch are skipped.
     """
     batch_file = os.path.join(Files['save_directory'], "batch_transcription.txt")
     Files['transcription_box'].delete(1.0, tk.END)
@@ -63,34 +64,62 @@ def process_batch_transcription(Files,filepaths):
     progress_bar["maximum"] = 100
     progress_bar["value"] = 0
 
-    def update_status(message, value):
+    engine = BatchTranscriber(
+        Files['transcriber'].model_name, Files.get('batch_workers'), Files['batch_size']
+    )
+
+    def cancel_batch():
+        cancel_button.config(state=tk.DISABLED)
+        status_label.config(text="Cancelling after the current files...")
+        job.cancel()
+
+    cancel_button = tk.Button(progress_win, text="Cancel", command=cancel_batch)
+    cancel_button.pack(pady=(0, 10))
+
+    dispatcher = Files['dispatcher']
+    box = Files['transcription_box']
+
+    def show_status(message, value):
         status_label.config(text=message)
         progress_bar["value"] = value
-        Files['root'].update_idletasks()
+
+    def update_status(message, value):
+        # Many files can finish within one frame; only the newest status is drawn
+        dispatcher.post_latest(progress_win, show_status, message, value)
 
     total_files = len(filepaths)
-    progress_increment = 100 / (total_files + 1) if total_files > 0 else 100
 
-    def run_batch():
+    def on_progress(done, total, filepath, error):
+        base_name = os.path.basename(filepath)
+        job.report(f"{done}/{total} files")
+        update_status(f"Finished {base_name} ({done}/{total})...", 100 * done / total)
+        if error:
+            dispatcher.append(box, f"Skipped {base_name} (Error)\n")
+        else:
+            dispatcher.append(box, f"Processed {base_name}\n")
+
+    def run_batch(job):
+        job.on_cancel(engine.cancel)
         try:
-            with open(batch_file, "a", encoding="utf-8") as f:
-                for i, filepath in enumerate(filepaths, start=1):
-                    base_name = os.path.basename(filepath)
-                    update_status(f"Processing {base_name} ({i}/{total_files})...", progress_increment * i)
-                    transcription = Files['transcriber'].transcribe_audio(filepath, Files['save_directory'])
-                    if transcription.startswith("Error:"):
-                        Files['transcription_box'].insert(tk.END, f"Skipped {base_name} (Error)\n")
-                        continue
-                    f.write(f"---- Transcription: {base_name} ----\n")
-                    f.write(transcription + "\n\n")
-                    Files['transcription_box'].insert(tk.END, f"Processed {base_name}\n")
-                    Files['root'].update_idletasks()
-                    # (Optional: add a small delay for smoother UI updates)
-                    time.sleep(0.2)
-            Files['transcription_box'].insert(tk.END, f"\nBatch transcription saved to: {batch_file}\n")
+            update_status(f"Transcribing {total_files} files in parallel...", 0)
+            summary = engine.run(filepaths, batch_file, on_progress=on_progress)
+            for result in summary['results']:
+                if not result['error']:
+                    Files['transcriber'].update_transcription_history(result['text'])
+            if summary['skipped']:
+                dispatcher.append(box, f"Skipped {summary['skipped']} files already transcribed in an earlier run\n")
+            if summary['cancelled']:
+                dispatcher.append(box, "Batch cancelled. Select the same files again to resume.\n")
+            dispatcher.append(
+                box,
+                f"\nBatch transcription saved to: {batch_file}\n"
+                f"Throughput: {summary['throughput']:.1f} audio-hours per wall-hour "
+                f"on {summary['workers']} workers\n"
+            )
         except Exception as e:
-            messagebox.showerror("Error", f"Batch transcription failed: {e}")
-        finally:
-            progress_win.destroy()
+            dispatcher.post(messagebox.showerror, "Error", f"Batch transcription failed: {e}")
 
-    threading.Thread(target=run_batch).start()
\ No newline at end of file
+    # Bulk priority: recordings transcribed meanwhile still get a model slot
+    job = Files['scheduler'].submit(f"Batch transcription ({total_files} files)", run_batch, MODEL, BULK,
+        on_done=lambda job: dispatcher.post(progress_win.destroy),
+    )
@@ -32,6 +32,7 @@ def apply_theme(Theme,theme):
     
     # Update waveform visualizer
     Theme['visualizer'].update_theme(theme)
+    Theme['spectrogram'].update_theme(theme)
     
     # Update seaborn style
     sns.set_style("darkgrid" if theme == styles['dark_theme'] else "whitegrid")
@@ -0,0 +1,118 @@
+import http.client
+import json
+import socket
+import threading
+from urllib.parse import urlencode
+
+import numpy as np
+
+from . import websocket
+
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class TranscriptionClient:
+    """Client for the local transcription service (see app.service.server)."""
+
+    def __init__(self, host="127.0.0.1", port=8765, timeout=600):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def _request(self, method, path, body=None, headers=None):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            data = json.loads(response.read() or b"{}")
+        finally:
+            conn.close()
+        if response.status != 200:
+            raise ServiceError(response.status, data.get("error", response.reason))
+        return data
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def transcribe(self, audio, rate=16000):
+        """
+        Transcribe WAV bytes, or an int16 (or float32 in [-1, 1]) mono array at `rate`.
+        Raises ServiceError; status 429 means the queue was full and the call can be retried.
+        """
+        if isinstance(audio, (bytes, bytearray)):
+            return self._request("POST", "/transcribe", bytes(audio), {"Content-Type": "audio/wav"})
+        body = _to_pcm(audio)
+        return self._request("POST", f"/transcribe?{urlencode({'rate': rate})}", body,
+                             {"Content-Type": "application/octet-stream"})
+
+    def transcribe_file(self, filepath):
+        with open(filepath, "rb") as f:
+            return self.transcribe(f.read())
+
+    def stream(self, chunks, rate=16000, on_message=None):
+        """
+        Send PCM chunks over the WebSocket endpoint as they come (e.g. from a capture
+        loop) and return the final transcript. `on_message(dict)` sees every partial.
+        """
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        rfile = sock.makefile("rb")
+        wfile = sock.makefile("wb")
+        try:
+            key = websocket.new_key()
+            wfile.write((
+                f"GET /ws?{urlencode({'rate': rate})} HTTP/1.1\r\n"
+                f"Host: {self.host}:{self.port}\r\n"
+                "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+            ).encode("ascii"))
+            wfile.flush()
+            status_line = rfile.readline().decode("latin-1")
+            headers = {}
+            for line in iter(rfile.readline, b"\r\n"):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            status = int(status_line.split()[1])
+            if status != 101:
+                body = rfile.read(int(headers.get("content-length", 0)))
+                raise ServiceError(status, json.loads(body or b"{}").get("error", status_line.strip()))
+            if headers.get("sec-websocket-accept") != websocket.accept_key(key):
+                raise ServiceError(status, "Bad WebSocket handshake")
+
+            final = {}
+
+            def read_messages():
+                try:
+                    while True:
+                        _, payload = websocket.read_message(rfile, wfile, mask_replies=True)
+                        message = json.loads(payload)
+                        if on_message:
+                            on_message(message)
+                        if message.get("type") == "final":
+                            final.update(message)
+                            return
+                except (websocket.ConnectionClosed, OSError):
+                    pass
+
+            reader = threading.Thread(target=read_messages, daemon=True)
+            reader.start()
+            for chunk in chunks:
+                websocket.write_frame(wfile, websocket.OP_BINARY, _to_pcm(chunk), mask=True)
+            websocket.write_frame(wfile, websocket.OP_TEXT, "end", mask=True)
+            reader.join(self.timeout)
+            return final.get("text", "")
+        finally:
+            rfile.close()
+            wfile.close()
+            sock.close()
+
+
+def _to_pcm(audio):
+    audio = np.asarray(audio)
+    if audio.dtype != np.int16:
+        audio = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    return audio.astype("<i2").tobytes()
@@ -0,0 +1,132 @@
+"""
+Load test for the local transcription service. Everything stays on localhost.
+
+    python -m app.service.load_test --requests 40 --concurrency 8
+    python -m app.service.load_test --spawn --model tiny --streams 2
+
+With --spawn a server is started in this process on a free port; otherwise the test
+targets an already running one (python -m app.cli serve).
+"""
+import argparse
+import concurrent.futures
+import logging
+import threading
+import time
+
+import numpy as np
+
+from .client import ServiceError, TranscriptionClient
+
+
+def synthetic_speech(seconds, rate=16000, seed=0):
+    """Voiced, syllable-modulated signal so the request is not treated as silence."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    f0 = 110 + 30 * rng.random() + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 15))
+    envelope = (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)) ** 2
+    return (0.2 * voiced * envelope * 32767).astype(np.int16)
+
+
+def _percentile(values, q):
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def run_load(client, requests, concurrency, seconds, streams=0, rate=16000):
+    latencies, batch_sizes = [], []
+    counts = {"ok": 0, "rejected": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def one(i):
+        audio = synthetic_speech(seconds, rate, seed=i)
+        started = time.monotonic()
+        try:
+            response = client.transcribe(audio, rate)
+        except ServiceError as e:
+            with lock:
+                counts["rejected" if e.status == 429 else "errors"] += 1
+            return
+        except OSError:
+            with lock:
+                counts["errors"] += 1
+            return
+        with lock:
+            counts["ok"] += 1
+            latencies.append(time.monotonic() - started)
+            batch_sizes.append(response["batch_size"])
+
+    def one_stream(i):
+        audio = synthetic_speech(seconds, rate, seed=1000 + i)
+        chunk = rate // 10
+        chunks = (audio[j:j + chunk] for j in range(0, len(audio), chunk))
+        started = time.monotonic()
+        try:
+            client.stream(chunks, rate)
+        except (ServiceError, OSError):
+            with lock:
+                counts["errors"] += 1
+            return
+        with lock:
+            latencies.append(time.monotonic() - started)
+
+    started = time.monotonic()
+    with concurrent.futures.ThreadPoolExecutor(concurrency + streams) as pool:
+        futures = [pool.submit(one_stream, i) for i in range(streams)]
+        futures += [pool.submit(one, i) for i in range(requests)]
+        concurrent.futures.wait(futures)
+    wall = time.monotonic() - started
+
+    return {
+        **counts,
+        "wall_seconds": wall,
+        "requests_per_second": counts["ok"] / wall if wall else 0.0,
+        "latency_p50": _percentile(latencies, 50),
+        "latency_p95": _percentile(latencies, 95),
+        "latency_max": max(latencies, default=0.0),
+        "mean_batch_size": float(np.mean(batch_sizes)) if batch_sizes else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the local transcription service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0, help="Audio length per request")
+    parser.add_argument("--streams", type=int, default=0, help="Concurrent WebSocket sessions")
+    parser.add_argument("--spawn", action="store_true", help="Start a server in this process")
+    parser.add_argument("--model", default="tiny", help="Model for --spawn")
+    parser.add_argument("--max-queue", type=int, default=32, help="Queue size for --spawn")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    server = None
+    if args.spawn:
+        from ..core.transcriber import AudioTranscriber
+        from .server import create_server
+
+        server = create_server(AudioTranscriber(args.model), args.host, 0, max_queue=args.max_queue)
+        args.port = server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        client = TranscriptionClient(args.host, args.port)
+        report = run_load(client, args.requests, args.concurrency, args.seconds, args.streams)
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+            server.service.close()
+
+    print(f"ok {report['ok']}  rejected (429) {report['rejected']}  errors {report['errors']}")
+    print(f"{report['requests_per_second']:.2f} requests/s over {report['wall_seconds']:.1f}s, "
+          f"mean batch size {report['mean_batch_size']:.1f}")
+    print(f"latency p50 {report['latency_p50']:.2f}s  p95 {report['latency_p95']:.2f}s  "
+          f"max {report['latency_max']:.2f}s")
+    return 0 if report["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
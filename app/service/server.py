@@ -0,0 +1,375 @@
+"""
+Local transcription service: one warm Whisper model shared by every client.
+
+    POST /transcribe   WAV or raw 16-bit mono PCM (?rate=16000) -> JSON segments
+    GET  /health       queue depth and counters
+    GET  /ws?rate=N    WebSocket: send binary PCM chunks, receive partial text, send "end"
+
+Run with `python -m app.service.server` or `python -m app.cli serve`.
+"""
+import io
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from ..core.batched_decoder import BatchedDecoder
+from ..core.live_transcriber import LiveTranscriber
+from ..core.transcriber import SAMPLE_RATE, TRANSCRIBE_OPTIONS, AudioTranscriber, calculate_segment_confidence
+from ..utils.dsp import int16_to_float32, resample
+from . import websocket
+
+MAX_BODY_BYTES = 200 * 1024 * 1024
+
+
+class QueueFull(Exception):
+    pass
+
+
+class _Request:
+    def __init__(self, audio):
+        self.audio = audio
+        self.enqueued = time.monotonic()
+        self.started = None
+        self.batch_size = 0
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class _LockedTranscriber:
+    """Gives LiveTranscriber sessions the same model, one inference call at a time."""
+
+    def __init__(self, transcriber, lock):
+        self.transcriber = transcriber
+        self.lock = lock
+
+    def run_model(self, audio, **options):
+        with self.lock:
+            return self.transcriber.run_model(audio, **options)
+
+
+class TranscriptionService:
+    """
+    Bounded request queue in front of an AudioTranscriber.
+
+    A dispatcher thread takes the oldest request, waits up to `batch_wait` seconds for
+    more, and decodes up to `max_batch` of them in one BatchedDecoder call. A lone
+    request gets the normal word-timestamped transcription. When the queue is full,
+    submit() raises QueueFull instead of letting latency grow without bound.
+    """
+
+    def __init__(self, transcriber, max_queue=32, max_batch=8, batch_wait=0.05, max_streams=4):
+        self.transcriber = transcriber
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.model_lock = threading.Lock()
+        self.stats = {"requests": 0, "rejected": 0, "batches": 0, "streams": 0}
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._streams = threading.BoundedSemaphore(max_streams)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, audio):
+        request = _Request(audio)
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            self.stats["rejected"] += 1
+            raise QueueFull(f"Queue is full ({self.max_queue} requests waiting)")
+        self.stats["requests"] += 1
+        return request
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def open_stream(self, source_rate, on_update):
+        """Start a live session on the shared model. Raises QueueFull past `max_streams`."""
+        if not self._streams.acquire(blocking=False):
+            self.stats["rejected"] += 1
+            raise QueueFull("Too many live streams")
+        self.stats["streams"] += 1
+        live = LiveTranscriber(_LockedTranscriber(self.transcriber, self.model_lock),
+                               source_rate=source_rate, on_update=on_update)
+        live.start()
+        return live
+
+    def close_stream(self, live):
+        try:
+            return live.stop()
+        finally:
+            self._streams.release()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = time.monotonic() + self.batch_wait
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch):
+        started = time.monotonic()
+        for request in batch:
+            request.started = started
+            request.batch_size = len(batch)
+        try:
+            with self.model_lock:
+                if len(batch) == 1 or self.transcriber.model is None:
+                    # The worker process serves one request at a time, so it cannot batch
+                    results = [self.transcriber.run_model(r.audio, **TRANSCRIBE_OPTIONS) for r in batch]
+                else:
+                    decoder = BatchedDecoder(self.transcriber.model, batch_size=len(batch))
+                    results = decoder.transcribe_many([r.audio for r in batch])
+        except Exception as e:
+            logging.error(f"Error transcribing batch of {len(batch)}: {e}")
+            results = [None] * len(batch)
+            for request in batch:
+                request.error = str(e)
+        self.stats["batches"] += 1
+        for request, result in zip(batch, results):
+            request.result = result
+            request.done.set()
+
+
+def decode_audio(body, content_type, rate):
+    """Decode a WAV (16-bit PCM) or raw int16 mono body to 16 kHz float32."""
+    if content_type in ("audio/wav", "audio/x-wav", "audio/wave") or body[:4] == b"RIFF":
+        with wave.open(io.BytesIO(body), "rb") as wf:
+            if wf.getsampwidth() != 2:
+                raise ValueError("Only 16-bit PCM WAV is supported")
+            rate = wf.getframerate()
+            channels = wf.getnchannels()
+            samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype="<i2")
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    else:
+        if len(body) % 2:
+            raise ValueError("Raw PCM body must be 16-bit samples")
+        samples = np.frombuffer(body, dtype="<i2")
+    audio = int16_to_float32(samples)
+    if rate != SAMPLE_RATE:
+        audio = resample(audio, rate, SAMPLE_RATE)
+    return audio
+
+
+def format_response(request):
+    result = request.result
+    segments = result.get('segments', [])
+    return {
+        "text": " ".join(s['text'].strip() for s in segments),
+        "segments": [
+            {"start": s['start'], "end": s['end'], "text": s['text'].strip(),
+             "confidence": round(calculate_segment_confidence(s), 4)}
+            for s in segments
+        ],
+        "language": result.get('language'),
+        "duration": len(request.audio) / SAMPLE_RATE,
+        "queue_seconds": round(request.started - request.enqueued, 3),
+        "batch_size": request.batch_size,
+    }
+
+
+class _LockedFile:
+    """Serializes frame writes from the handler thread and the live decode thread."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.lock = threading.Lock()
+
+    def write(self, data):
+        with self.lock:
+            self.wfile.write(data)
+            self.wfile.flush()
+
+    def flush(self):
+        pass
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive: load tests reuse connections
+    server_version = "WhisperTranscriber/0.1"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} - {format % args}")
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send_json(200, {
+                "status": "ok" if self.service.transcriber.is_available() else "model unavailable",
+                "queue": self.service.queue_depth(),
+                "max_queue": self.service.max_queue,
+                **self.service.stats,
+            })
+        elif url.path == "/ws":
+            self._websocket(parse_qs(url.query))
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/transcribe":
+            self._send_json(404, {"error": "Not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, {"error": f"Body larger than {MAX_BODY_BYTES} bytes"})
+            return
+        body = self.rfile.read(length)
+        if not self.service.transcriber.is_available():
+            self._send_json(503, {"error": "Whisper model not loaded"})
+            return
+        try:
+            rate = int(parse_qs(url.query).get("rate", [SAMPLE_RATE])[0])
+            audio = decode_audio(body, self.headers.get("Content-Type", ""), rate)
+        except Exception as e:
+            self._send_json(400, {"error": f"Could not decode audio: {e}"})
+            return
+
+        try:
+            request = self.service.submit(audio)
+        except QueueFull as e:
+            self._send_json(429, {"error": str(e)}, {"Retry-After": "1"})
+            return
+        if not request.done.wait(self.server.request_timeout):
+            self._send_json(504, {"error": "Transcription timed out"})
+            return
+        if request.error:
+            self._send_json(500, {"error": request.error})
+            return
+        self._send_json(200, format_response(request))
+
+    def _websocket(self, query):
+        key = self.headers.get("Sec-WebSocket-Key")
+        if self.headers.get("Upgrade", "").lower() != "websocket" or not key:
+            self._send_json(400, {"error": "Expected a WebSocket upgrade"})
+            return
+        rate = int(query.get("rate", [SAMPLE_RATE])[0])
+        out = _LockedFile(self.wfile)
+
+        def on_update(committed, tentative):
+            try:
+                websocket.write_frame(out, websocket.OP_TEXT, json.dumps(
+                    {"type": "partial", "committed": committed, "tentative": tentative}))
+            except OSError:
+                pass  # Client went away; the read loop notices
+
+        try:
+            live = self.service.open_stream(rate, on_update)
+        except QueueFull as e:
+            self._send_json(429, {"error": str(e)}, {"Retry-After": "1"})
+            return
+
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", websocket.accept_key(key))
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+
+        closed = False
+        try:
+            while True:
+                opcode, payload = websocket.read_message(self.rfile, out)
+                if opcode == websocket.OP_BINARY:
+                    live.feed(np.frombuffer(payload, dtype="<i2").copy())
+                elif payload.strip() == b"end":
+                    break
+        except (websocket.ConnectionClosed, OSError):
+            closed = True
+        finally:
+            text = self.service.close_stream(live)
+        if not closed:
+            try:
+                websocket.write_frame(out, websocket.OP_TEXT, json.dumps({"type": "final", "text": text}))
+                websocket.write_frame(out, websocket.OP_CLOSE, b"\x03\xe8")
+            except OSError:
+                pass
+
+
+class TranscriptionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service, request_timeout=600):
+        super().__init__(address, _Handler)
+        self.service = service
+        self.request_timeout = request_timeout
+
+
+def create_server(transcriber, host="127.0.0.1", port=8765, **service_options):
+    """Build a server around an existing AudioTranscriber; call serve_forever() on it."""
+    return TranscriptionServer((host, port), TranscriptionService(transcriber, **service_options))
+
+
+def run(args):
+    transcriber = AudioTranscriber(args.model)
+    if not transcriber.is_available():
+        logging.error("Whisper model not loaded, not starting the service")
+        return 1
+    server = create_server(transcriber, args.host, args.port, max_queue=args.max_queue,
+                           max_batch=args.max_batch, batch_wait=args.batch_wait, max_streams=args.max_streams)
+    logging.warning(f"Transcription service listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+        transcriber.close()
+    return 0
+
+
+def main(argv=None):
+    from ..cli import main as cli_main
+
+    return cli_main(["-v", "serve"] + list(argv if argv is not None else sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+import base64
+import hashlib
+import os
+import struct
+
+# Minimal RFC 6455 framing for the service and its client: enough for binary audio
+# chunks in, JSON text messages out, ping/pong and close. No extensions.
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+class ConnectionClosed(Exception):
+    pass
+
+
+def accept_key(key):
+    """Sec-WebSocket-Accept value for a client's Sec-WebSocket-Key."""
+    return base64.b64encode(hashlib.sha1((key + GUID).encode("ascii")).digest()).decode("ascii")
+
+
+def new_key():
+    return base64.b64encode(os.urandom(16)).decode("ascii")
+
+
+def _read_exact(rfile, n):
+    data = rfile.read(n)
+    if len(data) < n:
+        raise ConnectionClosed("Connection closed mid-frame")
+    return data
+
+
+def read_frame(rfile):
+    """Read one frame. Returns (fin, opcode, payload)."""
+    head = rfile.read(2)
+    if len(head) < 2:
+        raise ConnectionClosed("Connection closed")
+    fin = bool(head[0] & 0x80)
+    opcode = head[0] & 0x0F
+    masked = bool(head[1] & 0x80)
+    length = head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", _read_exact(rfile, 2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", _read_exact(rfile, 8))[0]
+    if length > MAX_MESSAGE_BYTES:
+        raise ConnectionClosed(f"Frame of {length} bytes exceeds the limit")
+    mask = _read_exact(rfile, 4) if masked else None
+    payload = _read_exact(rfile, length)
+    if mask:
+        # XOR with the repeated 4-byte mask, done on whole integers instead of per byte
+        key = int.from_bytes((mask * (length // 4 + 1))[:length], "big")
+        payload = (int.from_bytes(payload, "big") ^ key).to_bytes(length, "big")
+    return fin, opcode, payload
+
+
+def read_message(rfile, wfile, mask_replies=False):
+    """
+    Read a complete data message, joining fragments and answering pings.
+    Returns (opcode, payload); raises ConnectionClosed on a close frame.
+    """
+    opcode, parts, size = None, [], 0
+    while True:
+        fin, frame_opcode, payload = read_frame(rfile)
+        if frame_opcode == OP_CLOSE:
+            try:
+                write_frame(wfile, OP_CLOSE, payload[:2], mask=mask_replies)
+            except OSError:
+                pass
+            raise ConnectionClosed("Closed by peer")
+        if frame_opcode == OP_PING:
+            write_frame(wfile, OP_PONG, payload, mask=mask_replies)
+            continue
+        if frame_opcode == OP_PONG:
+            continue
+        if frame_opcode != OP_CONTINUATION:
+            opcode = frame_opcode
+        size += len(payload)
+        if size > MAX_MESSAGE_BYTES:
+            raise ConnectionClosed("Message exceeds the limit")
+        parts.append(payload)
+        if fin:
+            return opcode, b"".join(parts)
+
+
+def write_frame(wfile, opcode, payload, mask=False):
+    """Write one unfragmented frame. Clients must mask, servers must not."""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    length = len(payload)
+    head = bytes([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        head += bytes([mask_bit | length])
+    elif length < 1 << 16:
+        head += bytes([mask_bit | 126]) + struct.pack("!H", length)
+    else:
+        head += bytes([mask_bit | 127]) + struct.pack("!Q", length)
+    if mask:
+        key = os.urandom(4)
+        mask_int = int.from_bytes((key * (length // 4 + 1))[:length], "big")
+        payload = key + (int.from_bytes(payload, "big") ^ mask_int).to_bytes(length, "big")
+    wfile.write(head + payload)
+    wfile.flush()
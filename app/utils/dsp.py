@@ -0,0 +1,149 @@
+from math import gcd
+
+import numpy as np
+
+
+def int16_to_float32(samples):
+    """Convert int16 PCM to float32 in [-1, 1)."""
+    return samples.astype(np.float32) * (1.0 / 32768.0)
+
+
+class StreamingResampler:
+    """
+    Vectorized polyphase resampler that can be fed audio in arbitrary-sized blocks.
+
+    A Kaiser-windowed sinc low-pass is split into `up` phases of `taps_per_phase`
+    coefficients. Each output sample is a dot product between one phase and the
+    matching input history, computed for a whole block at once with numpy. Filter
+    delay is compensated so output sample n lines up with input time n / target_sr.
+    """
+
+    def __init__(self, orig_sr, target_sr, taps_per_phase=32, beta=8.6):
+        g = gcd(int(orig_sr), int(target_sr))
+        self.up = int(target_sr) // g
+        self.down = int(orig_sr) // g
+        self.taps = taps_per_phase
+
+        # Odd-length filter centred on an integer delay, zero-padded to fill the bank
+        length = self.taps * self.up - 1
+        self.delay = (length - 1) // 2
+        cutoff = 0.5 / max(self.up, self.down) * 0.95
+        t = np.arange(length) - self.delay
+        h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(length, beta)
+        h = np.append(h * self.up / h.sum(), 0.0)
+        # bank[p, k] = h[p + k * up]; reversed along k so it lines up with ascending input
+        self.bank = h.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32)
+
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._base = -(self.taps - 1)  # Global input index of _history[0]
+        self._consumed = 0  # Input samples fed so far
+        self._produced = 0  # Output samples emitted so far
+
+    def process(self, samples):
+        """Resample the next block and return every output sample it completes."""
+        samples = np.asarray(samples, dtype=np.float32)
+        buffer = np.concatenate([self._history, samples])
+        self._consumed += len(samples)
+        out = self._emit(buffer, self._consumed - 1)
+        keep = self.taps - 1
+        self._base += len(buffer) - keep
+        self._history = buffer[-keep:] if keep else buffer[:0]
+        return out
+
+    def flush(self):
+        """Drain the filter tail so the total output length is ceil(len(input) * up / down)."""
+        expected = -(-self._consumed * self.up // self.down)
+        pad = np.zeros(self.delay // self.up + self.taps, dtype=np.float32)
+        buffer = np.concatenate([self._history, pad])
+        out = self._emit(buffer, self._consumed + len(pad) - 1)
+        out = out[:max(0, expected - (self._produced - len(out)))]
+        self._produced = expected
+        self.reset()
+        return out
+
+    def _emit(self, buffer, last_index):
+        # Output n needs input index (n * down + delay) // up, which must already exist
+        stop = ((last_index + 1) * self.up - self.delay + self.down - 1) // self.down
+        if stop <= self._produced:
+            return np.zeros(0, dtype=np.float32)
+        n = np.arange(self._produced, stop, dtype=np.int64)
+        m = n * self.down + self.delay
+        phase = m % self.up
+        newest = m // self.up - self._base
+        index = newest[:, None] - np.arange(self.taps - 1, -1, -1)[None, :]
+        out = np.einsum("nk,nk->n", self.bank[phase], buffer[index])
+        self._produced = stop
+        return out.astype(np.float32)
+
+
+def resample(samples, orig_sr, target_sr, block_size=65536):
+    """Resample a complete signal with StreamingResampler, block by block."""
+    if orig_sr == target_sr:
+        return np.asarray(samples, dtype=np.float32)
+    resampler = StreamingResampler(orig_sr, target_sr)
+    blocks = [resampler.process(samples[i:i + block_size]) for i in range(0, len(samples), block_size)]
+    blocks.append(resampler.flush())
+    return np.concatenate(blocks)
+
+
+def peak_rms_dbfs(samples, floor_db=-100.0):
+    """Peak and RMS level of float samples in [-1, 1), in dB relative to full scale."""
+    samples = np.asarray(samples, dtype=np.float32)
+    if not len(samples):
+        return floor_db, floor_db
+    peak = float(np.abs(samples).max())
+    rms = float(np.sqrt(np.dot(samples, samples) / len(samples)))
+    to_db = lambda x: max(floor_db, 20 * np.log10(x)) if x > 0 else floor_db
+    return to_db(peak), to_db(rms)
+
+
+class RollingSTFT:
+    """
+    Short-time Fourier transform over a stream, kept as a fixed-size ring of columns.
+
+    Each `feed` transforms only the frames that the new samples complete (all of them in
+    one vectorized rfft) and writes their dBFS magnitudes into a preallocated
+    (columns, bins) array; the last n_fft - hop samples are carried over for the next
+    overlapping frame. A full-scale sine reads 0 dB.
+    """
+
+    def __init__(self, n_fft=1024, hop=512, columns=400, floor_db=-100.0):
+        self.n_fft = n_fft
+        self.hop = hop
+        self.columns = columns
+        self.bins = n_fft // 2 + 1
+        self.floor_db = floor_db
+        self.window = np.hanning(n_fft).astype(np.float32)
+        # |X| of a full-scale sine at a bin centre is sum(window) / 2
+        self._power_scale = (2.0 / self.window.sum()) ** 2
+        self.image = np.empty((columns, self.bins), dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        self.image.fill(self.floor_db)
+        self._pos = 0  # Next column to write; the oldest column once the ring is full
+        self._carry = np.zeros(self.n_fft - self.hop, dtype=np.float32)
+
+    def feed(self, samples):
+        """Add float samples; returns how many new columns were computed."""
+        buffer = np.concatenate([self._carry, np.asarray(samples, dtype=np.float32)])
+        count = (len(buffer) - self.n_fft) // self.hop + 1 if len(buffer) >= self.n_fft else 0
+        if count:
+            frames = np.lib.stride_tricks.sliding_window_view(buffer, self.n_fft)[::self.hop][:count]
+            spectrum = np.fft.rfft(frames * self.window, axis=1)
+            power = (spectrum.real ** 2 + spectrum.imag ** 2) * self._power_scale
+            columns = 10 * np.log10(np.maximum(power, 10 ** (self.floor_db / 10)))
+            if count > self.columns:
+                columns = columns[-self.columns:]
+            index = (self._pos + np.arange(len(columns))) % self.columns
+            self.image[index] = columns
+            self._pos = (self._pos + len(columns)) % self.columns
+        self._carry = buffer[count * self.hop:]
+        return count
+
+    def ordered(self):
+        """The ring as a (columns, bins) array, oldest column first."""
+        return np.roll(self.image, -self._pos, axis=0)
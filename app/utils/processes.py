@@ -0,0 +1,31 @@
+import contextlib
+import multiprocessing
+import sys
+
+
+def get_context():
+    """Spawn context: safe with threads, torch and Tk in the parent on every platform."""
+    return multiprocessing.get_context("spawn")
+
+
+@contextlib.contextmanager
+def hidden_main_module():
+    """
+    Start child processes without re-running the parent's main script.
+
+    Spawned children normally re-import `__main__`. ui.py builds the whole Tk window
+    and loads every model at import time, so workers must not see it. Every process
+    started inside this block only imports the module that defines its target.
+    """
+    main = sys.modules["__main__"]
+    saved_file = getattr(main, "__file__", None)
+    saved_spec = getattr(main, "__spec__", None)
+    if saved_file is not None:
+        del main.__file__
+    main.__spec__ = None
+    try:
+        yield
+    finally:
+        if saved_file is not None:
+            main.__file__ = saved_file
+        main.__spec__ = saved_spec
@@ -0,0 +1,78 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.core import audio_asset
+from app.core.audio_asset import AudioAssetStore
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Replace decoding with a 1 s 32 kHz ramp per file and count the decodes."""
+    calls = []
+
+    def decode(filepath):
+        calls.append(filepath)
+        if filepath.endswith("broken.wav"):
+            raise RuntimeError("cannot decode")
+        return np.linspace(-1, 1, 32000, dtype=np.float32), 32000
+
+    monkeypatch.setattr(audio_asset, "decode_file", decode)
+    return calls
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AudioAssetStore(spill_dir=str(tmp_path / "spill"))
+    yield store
+    store.clear()
+
+
+def _file(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(b"audio")
+    return str(path)
+
+
+def test_decodes_once_per_file(tmp_path, store, decodes):
+    path = _file(tmp_path, "a.wav")
+    first = store.load(path, 16000)
+    assert len(first) == 16000
+    assert store.load(path, 16000) is first
+    assert len(store.load(path, 32000)) == 32000  # The native-rate view was kept too
+    assert len(decodes) == 1
+
+
+def test_concurrent_readers_share_one_decode(tmp_path, store, decodes):
+    path = _file(tmp_path, "a.wav")
+    threads = [threading.Thread(target=store.load, args=(path, 16000)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(decodes) == 1
+
+
+def test_loading_locks_are_released(tmp_path, store, decodes):
+    for i in range(20):
+        store.load(_file(tmp_path, f"{i}.wav"), 16000)
+    store.load(_file(tmp_path, "once.wav"), 16000, keep=False)
+    with pytest.raises(RuntimeError):
+        store.load(_file(tmp_path, "broken.wav"), 16000)
+    assert store._loading == {}
+
+
+def test_least_recently_used_view_is_evicted(tmp_path, decodes):
+    # Room for a little more than two 16 kHz views of one second
+    store = AudioAssetStore(max_bytes=2 * 16000 * 4 + 100, spill_dir=str(tmp_path / "spill"))
+    a, b, c = (_file(tmp_path, f"{name}.wav") for name in "abc")
+    store.load(a, 16000, keep=False)
+    store.put(a, np.zeros(16000), 16000)
+    store.put(b, np.zeros(16000), 16000)
+    store.load(a, 16000)  # Refreshes a
+    store.put(c, np.zeros(16000), 16000)
+    store.load(a, 16000)
+    assert store.stats()["views"] == 2
+    store.load(b, 16000)
+    assert len(decodes) == 2  # a with keep=False, then b after eviction
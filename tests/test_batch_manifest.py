@@ -0,0 +1,119 @@
+import json
+import os
+
+from app.core.batch_manifest import DONE, FAILED, PENDING, BatchManifest
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return str(path)
+
+
+def test_new_files_start_pending(tmp_path):
+    audio = _write(tmp_path / "a.wav", "a")
+    manifest = BatchManifest(str(tmp_path / "out.txt"))
+    (entry,) = manifest.add([audio])
+    assert entry["status"] == PENDING
+    assert manifest.counts() == {PENDING: 1, DONE: 0, FAILED: 0}
+    assert os.path.exists(manifest.path)
+
+
+def test_resume_keeps_finished_files(tmp_path):
+    first = _write(tmp_path / "a.wav", "a")
+    second = _write(tmp_path / "b.wav", "b")
+    output = str(tmp_path / "out.txt")
+    manifest = BatchManifest(output)
+    done, failed = manifest.add([first, second])
+    manifest.mark_done(done, "hello")
+    manifest.mark_failed(failed, "decode error")
+
+    resumed = BatchManifest(output)
+    entries = resumed.add([first, second])
+    assert [e["status"] for e in entries] == [DONE, FAILED]
+    assert entries[1]["error"] == "decode error"
+    # Registering the same files again does not duplicate them
+    assert len(resumed.entries) == 2
+
+
+def test_edited_file_runs_again(tmp_path):
+    audio = _write(tmp_path / "a.wav", "a")
+    output = str(tmp_path / "out.txt")
+    manifest = BatchManifest(output)
+    (entry,) = manifest.add([audio])
+    manifest.mark_done(entry, "old")
+
+    _write(tmp_path / "a.wav", "a longer recording")
+    (entry,) = BatchManifest(output).add([audio])
+    assert entry["status"] == PENDING
+
+
+def test_missing_file_is_failed(tmp_path):
+    manifest = BatchManifest(str(tmp_path / "out.txt"))
+    (entry,) = manifest.add([str(tmp_path / "missing.wav")])
+    assert entry["status"] == FAILED
+    assert entry["error"]
+
+
+def test_failed_file_can_finish_on_retry(tmp_path):
+    audio = _write(tmp_path / "a.wav", "a")
+    output = str(tmp_path / "out.txt")
+    manifest = BatchManifest(output)
+    (entry,) = manifest.add([audio])
+    manifest.mark_failed(entry, "out of memory")
+
+    resumed = BatchManifest(output)
+    (entry,) = resumed.add([audio])
+    resumed.mark_done(entry, "text")
+    assert entry["status"] == DONE and entry["error"] is None
+    assert BatchManifest(output).counts()[DONE] == 1
+
+
+def test_output_rebuilt_from_parts_in_order(tmp_path):
+    first = _write(tmp_path / "a.wav", "a")
+    second = _write(tmp_path / "b.wav", "b")
+    output = str(tmp_path / "out.txt")
+    manifest = BatchManifest(output)
+    a, b = manifest.add([first, second])
+    # Finished out of order, written in registration order; rebuilding twice does not duplicate
+    manifest.mark_done(b, "second")
+    manifest.mark_done(a, "first")
+    manifest.write_output()
+    manifest.write_output()
+    with open(output, encoding="utf-8") as f:
+        text = f.read()
+    assert text == ("---- Transcription: a.wav ----\nfirst\n\n"
+                    "---- Transcription: b.wav ----\nsecond\n\n")
+
+
+def test_missing_part_goes_back_to_pending(tmp_path):
+    audio = _write(tmp_path / "a.wav", "a")
+    manifest = BatchManifest(str(tmp_path / "out.txt"))
+    (entry,) = manifest.add([audio])
+    manifest.mark_done(entry, "text")
+    os.remove(entry["output"])
+    manifest.write_output()
+    assert entry["status"] == PENDING
+
+
+def test_legacy_output_is_kept_first(tmp_path):
+    output = _write(tmp_path / "out.txt", "written before manifests\n")
+    audio = _write(tmp_path / "a.wav", "a")
+    manifest = BatchManifest(output)
+    (entry,) = manifest.add([audio])
+    manifest.mark_done(entry, "new")
+    manifest.write_output()
+    with open(output, encoding="utf-8") as f:
+        assert f.read().startswith("written before manifests\n---- Transcription: a.wav ----")
+    # The legacy section is not a file of the batch
+    assert manifest.counts()[DONE] == 1
+
+
+def test_corrupt_manifest_starts_over(tmp_path):
+    output = str(tmp_path / "out.txt")
+    _write(tmp_path / "out.txt.manifest.json", "{not json")
+    manifest = BatchManifest(output)
+    assert manifest.entries == []
+    (entry,) = manifest.add([_write(tmp_path / "a.wav", "a")])
+    with open(manifest.path, encoding="utf-8") as f:
+        assert json.load(f)["entries"][0]["id"] == entry["id"]
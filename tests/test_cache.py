@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+
+from app.core.cache import TranscriptionCache, hash_array, hash_file
+
+RESULT = {'text': " hi", 'segments': [{'start': 0.0, 'end': 1.0, 'text': " hi"}]}
+
+
+def test_key_depends_on_audio_model_and_options(tmp_path):
+    cache = TranscriptionCache(str(tmp_path))
+    key = cache.key("abc", "small", {"beam_size": 5})
+    assert key == cache.key("abc", "small", {"beam_size": 5})
+    assert key != cache.key("abd", "small", {"beam_size": 5})
+    assert key != cache.key("abc", "base", {"beam_size": 5})
+    assert key != cache.key("abc", "small", {"beam_size": 1})
+
+
+def test_content_hash_ignores_path(tmp_path):
+    first, second = tmp_path / "a.wav", tmp_path / "b.wav"
+    first.write_bytes(b"same audio")
+    second.write_bytes(b"same audio")
+    assert hash_file(str(first)) == hash_file(str(second))
+    audio = np.arange(10, dtype=np.float32)
+    assert hash_array(audio) == hash_array(audio.copy()) != hash_array(audio[::-1].copy())
+
+
+def test_round_trip_with_numpy_values(tmp_path):
+    cache = TranscriptionCache(str(tmp_path))
+    key = cache.key("abc", "small", {})
+    assert cache.get(key) is None
+    cache.put(key, dict(RESULT, avg_logprob=np.float32(-0.25)))
+    assert cache.get(key) == dict(RESULT, avg_logprob=-0.25)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = TranscriptionCache(str(tmp_path), max_bytes=10 ** 9)
+    keys = [cache.key(str(i), "small", {}) for i in range(3)]
+    for age, key in enumerate(keys):
+        cache.put(key, RESULT)
+        path = cache._path(key)
+        os.utime(path, (1000 + age, 1000 + age))
+    cache.get(keys[0])  # A hit makes the oldest entry the most recent
+
+    size = os.path.getsize(cache._path(keys[0]))
+    cache.max_bytes = 2 * size
+    assert cache.evict() == 1
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == RESULT and cache.get(keys[2]) == RESULT
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = TranscriptionCache(str(tmp_path))
+    key = cache.key("abc", "small", {})
+    cache.put(key, RESULT)
+    with open(cache._path(key), "w", encoding="utf-8") as f:
+        f.write("{truncated")
+    assert cache.get(key) is None
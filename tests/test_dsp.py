@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from app.utils.dsp import StreamingResampler, resample
+
+
+def _sine(freq, rate, seconds):
+    return np.sin(2 * np.pi * freq * np.arange(int(rate * seconds)) / rate).astype(np.float32)
+
+
+@pytest.mark.parametrize("orig_sr", [44100, 48000, 22050, 8000])
+def test_blocks_match_whole_signal(orig_sr):
+    signal = np.random.default_rng(0).standard_normal(orig_sr).astype(np.float32)
+    whole = resample(signal, orig_sr, 16000, block_size=len(signal))
+
+    resampler = StreamingResampler(orig_sr, 16000)
+    sizes = [1, 7, 160, 1023, 4096, 3]
+    blocks, position = [], 0
+    while position < len(signal):
+        size = sizes[len(blocks) % len(sizes)]
+        blocks.append(resampler.process(signal[position:position + size]))
+        position += size
+    blocks.append(resampler.flush())
+    assert np.allclose(np.concatenate(blocks), whole, atol=1e-5)
+
+
+@pytest.mark.parametrize("orig_sr,n", [(44100, 44100), (44100, 12345), (48000, 1), (8000, 999)])
+def test_output_length(orig_sr, n):
+    out = resample(np.zeros(n, dtype=np.float32), orig_sr, 16000)
+    assert len(out) == -(-n * 16000 // orig_sr)
+
+
+def test_sine_keeps_amplitude_and_phase():
+    out = resample(_sine(440, 44100, 1.0), 44100, 16000)
+    expected = _sine(440, 16000, 1.0)
+    # Away from the edges the filter delay is compensated and the passband is flat
+    assert np.max(np.abs(out[400:-400] - expected[400:-400])) < 0.01
+
+
+def test_removes_content_above_new_nyquist():
+    out = resample(_sine(12000, 48000, 1.0), 48000, 16000)
+    assert np.sqrt(np.mean(out[400:-400] ** 2)) < 0.01
+
+
+def test_same_rate_is_unchanged():
+    signal = _sine(440, 16000, 0.1)
+    assert np.array_equal(resample(signal, 16000, 16000), signal)
+
+
+def test_resampler_reusable_after_flush():
+    signal = _sine(300, 44100, 0.5)
+    resampler = StreamingResampler(44100, 16000)
+    first = np.concatenate([resampler.process(signal), resampler.flush()])
+    second = np.concatenate([resampler.process(signal), resampler.flush()])
+    assert np.array_equal(first, second)
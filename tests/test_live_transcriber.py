@@ -0,0 +1,71 @@
+import numpy as np
+
+from app.core.live_transcriber import LiveTranscriber
+
+RATE = LiveTranscriber.TARGET_RATE
+
+
+class FakeTranscriber:
+    """Stands in for AudioTranscriber: records window lengths, returns scripted words."""
+
+    def __init__(self, words=()):
+        self.words = list(words)  # (start, end, word) in recording time
+        self.window_seconds = []
+        self.live = None
+
+    def run_model(self, audio, **options):
+        self.window_seconds.append(len(audio) / RATE)
+        offset = self.live._window_offset
+        end = offset + len(audio) / RATE
+        words = [{'word': w, 'start': s - offset, 'end': e - offset}
+                 for s, e, w in self.words if s >= offset and e <= end]
+        return {'segments': [{'words': words}] if words else []}
+
+
+def _feed_seconds(live, seconds):
+    for _ in range(int(seconds)):
+        live.feed(np.zeros(RATE, dtype=np.int16))
+        live._decode()
+
+
+def _live(transcriber, **options):
+    live = LiveTranscriber(transcriber, source_rate=RATE, **options)
+    transcriber.live = live
+    return live
+
+
+def test_window_stays_bounded_without_speech():
+    transcriber = FakeTranscriber()
+    live = _live(transcriber, max_window_seconds=15.0)
+    _feed_seconds(live, 90)
+    assert max(transcriber.window_seconds) <= 16.0 + 1e-6
+    assert len(live._window) / RATE <= 16.0
+    assert live._window_offset >= 70.0
+
+
+def test_agreed_words_are_committed_and_trimmed():
+    transcriber = FakeTranscriber([(0.2, 0.6, " hello"), (0.7, 1.2, " world")])
+    live = _live(transcriber)
+    _feed_seconds(live, 3)
+    assert live.committed_text == "hello world"
+    assert live._window_offset == 1.2
+
+
+def test_forced_commit_keeps_word_at_the_horizon_whole():
+    # Words keep changing, so nothing is agreed; only the window limit commits them
+    transcriber = FakeTranscriber([(1.0, 1.5, " a"), (9.7, 10.4, " b")])
+    live = _live(transcriber, max_window_seconds=10.0)
+    original = transcriber.run_model
+
+    def unstable(audio, **options):
+        result = original(audio, **options)
+        for segment in result['segments']:
+            for word in segment['words']:
+                word['word'] += str(len(transcriber.window_seconds))
+        return result
+
+    transcriber.run_model = unstable
+    _feed_seconds(live, 11)
+    assert [w['word'].rstrip("0123456789") for w in live._committed] == [" a"]
+    # The trim stops at the start of " b", which straddles the horizon at 10 s
+    assert live._window_offset == 9.7
@@ -0,0 +1,69 @@
+from app.core.long_file import plan_chunks, stitch
+
+RATE = 16000
+
+
+def _segment(start, end, text, words=None):
+    segment = {'start': start, 'end': end, 'text': text}
+    if words is not None:
+        segment['words'] = [{'start': s, 'end': e, 'word': w} for s, e, w in words]
+    return segment
+
+
+def test_short_audio_is_one_chunk():
+    assert plan_chunks(100, [], 1000, 10) == [(0, 100, 0, 100)]
+
+
+def test_cuts_at_last_fitting_pause():
+    chunks = plan_chunks(2500, [300, 700, 900, 1600], 1000, 50)
+    # 300 leaves the first chunk less than half full; 900 is the last pause that fits
+    assert chunks == [(0, 900, 0, 900), (900, 1600, 900, 1600), (1600, 2500, 1600, 2500)]
+
+
+def test_hard_cut_overlaps_both_sides():
+    chunks = plan_chunks(2500, [], 1000, 50)
+    assert chunks == [(0, 1000, 0, 950), (900, 1950, 950, 1900), (1850, 2500, 1900, 2500)]
+
+
+def test_own_ranges_cover_audio_once():
+    chunks = plan_chunks(10_000, [1200, 2900, 3100, 7000], 1500, 40)
+    assert chunks[0][2] == 0 and chunks[-1][3] == 10_000
+    for (_, _, _, own_end), (_, _, own_start, _) in zip(chunks, chunks[1:]):
+        assert own_end == own_start
+    for start, end, own_start, own_end in chunks:
+        assert start <= own_start < own_end <= end
+        assert end - start <= 1500 + 40
+
+
+def test_stitch_offsets_segments_and_renumbers():
+    chunks = [(0, 10 * RATE, 0, 10 * RATE), (10 * RATE, 20 * RATE, 10 * RATE, 20 * RATE)]
+    results = [
+        {'segments': [_segment(1.0, 3.0, " one")], 'language': 'en'},
+        {'segments': [_segment(2.0, 4.0, " two")]},
+    ]
+    merged = stitch(results, chunks)
+    assert [(s['id'], s['start'], s['end']) for s in merged['segments']] == [(0, 1.0, 3.0), (1, 12.0, 14.0)]
+    assert merged['text'] == " one two"
+    assert merged['language'] == 'en'
+
+
+def test_stitch_keeps_overlapping_words_once():
+    # Hard cut at 10 s with 1 s of overlap: both chunks decode the words around the cut
+    chunks = [(0, 11 * RATE, 0, 10 * RATE), (9 * RATE, 20 * RATE, 10 * RATE, 20 * RATE)]
+    first = _segment(8.0, 10.8, " a b c", [(8.0, 8.9, " a"), (9.2, 9.7, " b"), (10.1, 10.8, " c")])
+    second = _segment(0.2, 3.0, " b c d", [(0.2, 0.7, " b"), (1.1, 1.8, " c"), (2.0, 3.0, " d")])
+    merged = stitch([{'segments': [first]}, {'segments': [second]}], chunks)
+    words = [w['word'] for s in merged['segments'] for w in s['words']]
+    assert words == [" a", " b", " c", " d"]
+    assert merged['text'] == " a b c d"
+    assert [(s['start'], s['end']) for s in merged['segments']] == [(8.0, 9.7), (10.1, 12.0)]
+
+
+def test_stitch_drops_wordless_segment_outside_own_range():
+    chunks = [(0, 11 * RATE, 0, 10 * RATE), (9 * RATE, 20 * RATE, 10 * RATE, 20 * RATE)]
+    results = [
+        {'segments': [_segment(9.6, 10.8, " late")]},  # Midpoint 10.2 s belongs to the second chunk
+        {'segments': [_segment(0.6, 1.8, " late"), _segment(3.0, 4.0, " next")]},
+    ]
+    merged = stitch(results, chunks)
+    assert [(s['start'], s['text']) for s in merged['segments']] == [(9.6, " late"), (12.0, " next")]
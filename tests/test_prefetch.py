@@ -0,0 +1,126 @@
+import queue
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from app.core import prefetch
+from app.core.prefetch import DecodeAhead, decode_to_shared, read_shared
+
+
+def _tasks(n, per_task=1):
+    return [[(i * per_task + j, f"f{i * per_task + j}.wav") for j in range(per_task)] for i in range(n)]
+
+
+def _skip(filepath, task_size):
+    return False, "hash:" + filepath
+
+
+class Consumer:
+    """Iterates a DecodeAhead on a thread, like Pool.imap pulling tasks as fast as it can."""
+
+    def __init__(self, ahead):
+        self.items = queue.Queue()
+        threading.Thread(target=lambda: [self.items.put(item) for item in ahead], daemon=True).start()
+
+    def take(self, timeout=0.5):
+        items = []
+        try:
+            while True:
+                items.append(self.items.get(timeout=timeout))
+        except queue.Empty:
+            return items
+
+
+@pytest.fixture
+def fake_decode(monkeypatch):
+    def decode(filepath):
+        return shared_memory.SharedMemory(create=True, size=4000), 1000
+
+    monkeypatch.setattr(prefetch, "decode_to_shared", decode)
+
+
+def test_outstanding_tasks_are_bounded():
+    ahead = DecodeAhead(_tasks(10), _skip, lambda path: 1.0, workers=2, ahead=3)
+    consumer = Consumer(ahead)
+    try:
+        assert len(consumer.take()) == 5  # 2 running + 3 ahead
+        ahead.release(0)
+        assert len(consumer.take()) == 1
+    finally:
+        ahead.close()
+
+
+def test_task_slot_frees_when_all_its_files_are_released():
+    ahead = DecodeAhead(_tasks(4, per_task=2), _skip, lambda path: 1.0, workers=1, ahead=1)
+    consumer = Consumer(ahead)
+    try:
+        assert len(consumer.take()) == 2
+        ahead.release(0)  # Half of the first task
+        assert consumer.take() == []
+        ahead.release(1)
+        assert len(consumer.take()) == 1
+    finally:
+        ahead.close()
+
+
+def test_declined_files_pass_through_with_their_hash():
+    ahead = DecodeAhead(_tasks(2), _skip, lambda path: 1.0, workers=2)
+    try:
+        assert list(ahead) == [[(0, "f0.wav", None, 0, "hash:f0.wav")], [(1, "f1.wav", None, 0, "hash:f1.wav")]]
+    finally:
+        ahead.close()
+
+
+def test_budget_holds_decoded_tasks_back(fake_decode):
+    ahead = DecodeAhead(_tasks(3), lambda path, size: (True, None), lambda path: 1.0, workers=4, max_bytes=1)
+    consumer = Consumer(ahead)
+    try:
+        # Over budget, but one task is always let through so large files still run
+        (first,) = consumer.take()
+        (index, _, shm_name, n_samples, _), = first
+        assert shm_name and n_samples == 1000
+        ahead.release(index)
+        assert len(consumer.take()) == 1
+    finally:
+        ahead.close()
+
+
+def test_close_frees_unreleased_audio(fake_decode):
+    ahead = DecodeAhead(_tasks(2), lambda path, size: (True, None), lambda path: 1.0, workers=2)
+    consumer = Consumer(ahead)
+    names = [task[0][2] for task in consumer.take()]
+    assert len(names) == 2
+    ahead.close()
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def _blocks(audio, size):
+    return lambda path: (audio[i:i + size] for i in range(0, len(audio), size))
+
+
+def test_decode_to_shared_writes_blocks_in_place(monkeypatch):
+    audio = np.random.default_rng(0).standard_normal(10_000).astype(np.float32)
+    monkeypatch.setattr(prefetch, "iter_blocks", _blocks(audio, 999))
+    monkeypatch.setattr(prefetch, "expected_samples", lambda path: len(audio))
+    shm, n_samples = decode_to_shared("clip.wav")
+    try:
+        assert shm.size >= len(audio) * 4 and n_samples == len(audio)
+        assert np.array_equal(read_shared(shm.name, n_samples), audio)
+    finally:
+        prefetch._unlink(shm)
+
+
+def test_decode_to_shared_grows_past_a_short_estimate(monkeypatch):
+    audio = np.random.default_rng(1).standard_normal(10_000).astype(np.float32)
+    monkeypatch.setattr(prefetch, "iter_blocks", _blocks(audio, 999))
+    monkeypatch.setattr(prefetch, "expected_samples", lambda path: 100)
+    shm, n_samples = decode_to_shared("clip.mp3")
+    try:
+        assert n_samples == len(audio)
+        assert np.array_equal(read_shared(shm.name, n_samples), audio)
+    finally:
+        prefetch._unlink(shm)
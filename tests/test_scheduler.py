@@ -0,0 +1,145 @@
+import threading
+import time
+
+import pytest
+
+from app.core.scheduler import (BULK, CANCELLED, DONE, FAILED, INTERACTIVE, MODEL, NETWORK, NORMAL, QUEUED,
+                                RUNNING, JobScheduler)
+
+
+class Gate:
+    """Job function that blocks until opened, recording the order jobs started in."""
+
+    def __init__(self, started):
+        self.started = started
+        self.event = threading.Event()
+
+    def __call__(self, job):
+        self.started.append(job.name)
+        assert self.event.wait(5)
+        return job.name
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = JobScheduler(limits={MODEL: 1, NETWORK: 1})
+    gates = []
+    yield scheduler, gates
+    for gate in gates:
+        gate.event.set()
+    scheduler.shutdown()
+
+
+def _submit(scheduler, gates, started, name, resource=MODEL, priority=NORMAL):
+    gate = Gate(started)
+    gates.append(gate)
+    return scheduler.submit(name, gate, resource, priority), gate
+
+
+def test_limit_queues_extra_jobs(scheduler):
+    scheduler, gates = scheduler
+    started = []
+    first, gate = _submit(scheduler, gates, started, "first")
+    second, _ = _submit(scheduler, gates, started, "second")
+    assert (first.status, second.status) == (RUNNING, QUEUED)
+
+    gate.event.set()
+    assert first.wait(5) == "first"
+    _wait_for(lambda: second.status == RUNNING)
+    assert first.status == DONE
+
+
+def test_interactive_job_gets_reserved_slot(scheduler):
+    scheduler, gates = scheduler
+    started = []
+    bulk, _ = _submit(scheduler, gates, started, "bulk", priority=BULK)
+    queued, _ = _submit(scheduler, gates, started, "normal")
+    interactive, _ = _submit(scheduler, gates, started, "interactive", priority=INTERACTIVE)
+    # The extra slot is only for interactive work: limit 1 runs two jobs, not three
+    assert (bulk.status, queued.status, interactive.status) == (RUNNING, QUEUED, RUNNING)
+
+    another, _ = _submit(scheduler, gates, started, "interactive 2", priority=INTERACTIVE)
+    assert another.status == QUEUED
+
+
+def test_queued_jobs_start_in_priority_order(scheduler):
+    scheduler, gates = scheduler
+    started = []
+    running, gate = _submit(scheduler, gates, started, "running")
+    bulk, bulk_gate = _submit(scheduler, gates, started, "bulk", priority=BULK)
+    normal, normal_gate = _submit(scheduler, gates, started, "normal", priority=NORMAL)
+
+    gate.event.set()
+    _wait_for(lambda: normal.status == RUNNING)
+    assert bulk.status == QUEUED
+    normal_gate.event.set()
+    _wait_for(lambda: bulk.status == RUNNING)
+    bulk_gate.event.set()
+    bulk.wait(5)
+    assert started == ["running", "normal", "bulk"]
+
+
+def test_busy_resource_does_not_block_others(scheduler):
+    scheduler, gates = scheduler
+    started = []
+    _submit(scheduler, gates, started, "model")
+    blocked, _ = _submit(scheduler, gates, started, "model 2")
+    network, _ = _submit(scheduler, gates, started, "network", resource=NETWORK)
+    assert (blocked.status, network.status) == (QUEUED, RUNNING)
+
+
+def test_cancel_queued_job(scheduler):
+    scheduler, gates = scheduler
+    started, finished = [], []
+    running, gate = _submit(scheduler, gates, started, "running")
+    queued = scheduler.submit("queued", lambda job: started.append(job.name), on_done=finished.append)
+    queued.cancel()
+    assert queued.status == CANCELLED and finished == [queued]
+
+    gate.event.set()
+    running.wait(5)
+    _wait_for(lambda: not any(job.status == RUNNING for job in scheduler.jobs()))
+    assert started == ["running"]
+
+
+def test_cancel_running_job_is_cooperative(scheduler):
+    scheduler, _ = scheduler
+    cancelled = []
+
+    def work(job):
+        job.on_cancel(lambda: cancelled.append(job.name))
+        while True:
+            job.check_cancelled()
+            time.sleep(0.01)
+
+    job = scheduler.submit("loop", work)
+    job.cancel()
+    job.wait(5)
+    assert job.status == CANCELLED and cancelled == ["loop"]
+
+
+def test_failed_job_frees_its_slot(scheduler):
+    scheduler, gates = scheduler
+
+    def fail(job):
+        raise ValueError("boom")
+
+    failed = scheduler.submit("fails", fail)
+    failed.wait(5)
+    assert (failed.status, failed.error) == (FAILED, "boom")
+    job, _ = _submit(scheduler, gates, [], "after")
+    assert job.status == RUNNING
+
+
+def test_submit_after_shutdown_raises():
+    scheduler = JobScheduler()
+    scheduler.shutdown()
+    with pytest.raises(RuntimeError):
+        scheduler.submit("late", lambda job: None)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from app.core.long_file import plan_chunks
+from app.core.stream_decode import iter_windows
+
+
+def _blocks(audio, size):
+    return (audio[i:i + size] for i in range(0, len(audio), size))
+
+
+@pytest.mark.parametrize("block_size", [1000, 7919, 40000])
+def test_windows_match_plan_chunks(block_size):
+    # A ramp has no pauses, so every cut is a hard cut with overlap
+    audio = np.arange(50_000, dtype=np.float32) / 50_000
+    windows = list(iter_windows(_blocks(audio, block_size), 16_000, 1_600))
+    assert [w[:4] for w in windows] == plan_chunks(len(audio), [], 16_000, 1_600)
+    for start, end, _, _, samples in windows:
+        assert np.array_equal(samples, audio[start:end])
+
+
+def test_short_stream_is_one_window():
+    audio = np.ones(500, dtype=np.float32)
+    ((start, end, own_start, own_end, samples),) = iter_windows(_blocks(audio, 100), 16_000, 1_600)
+    assert (start, end, own_start, own_end) == (0, 500, 0, 500)
+    assert len(samples) == 500
+
+
+def test_empty_stream_has_no_windows():
+    assert list(iter_windows(iter([]), 16_000, 1_600)) == []
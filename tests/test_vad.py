@@ -0,0 +1,73 @@
+import numpy as np
+
+from app.core.prosody_benchmark import synthetic_utterance
+from app.core.vad import SAMPLE_RATE, TimeMap, apply_vad, detect_speech
+
+
+def test_time_map_skips_removed_gaps():
+    # Speech at 1-3 s and 6-7 s: the compact audio is 3 s long with the join at 2 s
+    time_map = TimeMap([[1 * SAMPLE_RATE, 3 * SAMPLE_RATE], [6 * SAMPLE_RATE, 7 * SAMPLE_RATE]])
+    assert time_map.to_original(0.5) == 1.5
+    assert time_map.to_original(2.5) == 6.5
+    assert list(time_map.boundaries()) == [2 * SAMPLE_RATE]
+
+
+def test_time_map_boundary_depends_on_side():
+    time_map = TimeMap([[1 * SAMPLE_RATE, 3 * SAMPLE_RATE], [6 * SAMPLE_RATE, 7 * SAMPLE_RATE]])
+    # A start at the join belongs to the next region, an end to the previous one
+    assert time_map.to_original(2.0) == 6.0
+    assert time_map.to_original(2.0, end=True) == 3.0
+    # Times past the end are clamped to the last region
+    assert time_map.to_original(10.0) == 7.0
+
+
+def test_empty_time_map_is_identity():
+    assert TimeMap(np.zeros((0, 2))).to_original(4.2) == 4.2
+
+
+def test_remap_moves_segments_and_words():
+    time_map = TimeMap([[1 * SAMPLE_RATE, 3 * SAMPLE_RATE], [6 * SAMPLE_RATE, 7 * SAMPLE_RATE]])
+    result = {'text': " a b", 'segments': [{
+        'start': 1.5, 'end': 2.5, 'text': " a b",
+        'words': [{'start': 1.5, 'end': 2.0, 'word': " a"}, {'start': 2.0, 'end': 2.5, 'word': " b"}],
+    }]}
+    remapped = time_map.remap(result)
+    segment = remapped['segments'][0]
+    assert (segment['start'], segment['end']) == (2.5, 6.5)
+    assert [(w['start'], w['end']) for w in segment['words']] == [(2.5, 3.0), (6.0, 6.5)]
+    assert result['segments'][0]['start'] == 1.5  # The input is not modified
+
+
+def test_silence_and_steady_tone_are_not_speech():
+    silence = np.zeros(3 * SAMPLE_RATE, dtype=np.float32)
+    tone = 0.5 * np.sin(2 * np.pi * 440 * np.arange(3 * SAMPLE_RATE) / SAMPLE_RATE).astype(np.float32)
+    assert len(detect_speech(silence)) == 0
+    assert len(detect_speech(tone)) == 0
+    audio, _, stats = apply_vad(silence)
+    assert len(audio) == 0 and stats['skipped_ratio'] == 1.0
+
+
+def test_apply_vad_cuts_pauses_between_utterances():
+    speech = synthetic_utterance(3)[0].astype(np.float32)
+    pause = np.zeros(3 * SAMPLE_RATE, dtype=np.float32)
+    audio = np.concatenate([pause, speech, pause, speech])
+    compact, time_map, stats = apply_vad(audio)
+
+    assert 0 < len(compact) < len(audio)
+    assert stats['skipped_seconds'] >= 4.0
+    regions = detect_speech(audio) / SAMPLE_RATE
+    assert regions[0, 0] >= 2.5 and regions[-1, 1] <= 12.0
+    assert not ((regions[:, 0] < 7.5) & (regions[:, 1] > 7.5)).any()  # Nothing kept mid-pause
+    # The first compact sample maps back into the first utterance, the last into the second
+    assert 3.0 - 0.5 <= time_map.to_original(0.0) <= 4.0
+    assert 9.0 <= time_map.to_original(len(compact) / SAMPLE_RATE, end=True) <= 12.0
+
+
+def test_audio_shorter_than_modulation_window():
+    # Fewer frames than the 0.5 s modulation window
+    for seconds in (0.01, 0.1, 0.3, 0.47):
+        speech = synthetic_utterance(3)[0][:int(seconds * SAMPLE_RATE)].astype(np.float32)
+        regions = detect_speech(speech)
+        assert regions.shape[1] == 2
+        audio, time_map, stats = apply_vad(speech)
+        assert len(audio) <= len(speech) and stats['total_seconds'] == len(speech) / SAMPLE_RATE
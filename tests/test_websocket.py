@@ -0,0 +1,86 @@
+import io
+import struct
+
+import pytest
+
+from app.service import websocket
+from app.service.websocket import (OP_BINARY, OP_CLOSE, OP_CONTINUATION, OP_PING, OP_PONG, OP_TEXT,
+                                   ConnectionClosed, read_frame, read_message, write_frame)
+
+
+def _frames(*frames):
+    """Frames as the peer would send them, in one readable buffer."""
+    stream = io.BytesIO()
+    for opcode, payload, fin in frames:
+        data = io.BytesIO()
+        write_frame(data, opcode, payload, mask=True)
+        raw = bytearray(data.getvalue())
+        if not fin:
+            raw[0] &= 0x7F
+        stream.write(raw)
+    stream.seek(0)
+    return stream
+
+
+def test_accept_key_matches_rfc_example():
+    assert websocket.accept_key("dGhlIHNhbXBsZSBub25jZQ==") == "s3pPLMBiTxaQ9kYGzzhZRbK+xOo="
+
+
+@pytest.mark.parametrize("length", [0, 1, 125, 126, 65535, 65536])
+@pytest.mark.parametrize("mask", [False, True])
+def test_frame_round_trip(length, mask):
+    payload = bytes(range(256)) * (length // 256) + bytes(range(length % 256))
+    stream = io.BytesIO()
+    write_frame(stream, OP_BINARY, payload, mask=mask)
+    raw = stream.getvalue()
+    assert bool(raw[1] & 0x80) == mask
+    stream.seek(0)
+    assert read_frame(stream) == (True, OP_BINARY, payload)
+
+
+def test_text_is_utf8_encoded():
+    stream = io.BytesIO()
+    write_frame(stream, OP_TEXT, "héllo")
+    stream.seek(0)
+    assert read_frame(stream)[2] == "héllo".encode("utf-8")
+
+
+def test_fragments_are_joined_and_pings_answered():
+    rfile = _frames((OP_BINARY, b"ab", False), (OP_PING, b"?", True), (OP_CONTINUATION, b"cd", True))
+    wfile = io.BytesIO()
+    assert read_message(rfile, wfile) == (OP_BINARY, b"abcd")
+    wfile.seek(0)
+    assert read_frame(wfile) == (True, OP_PONG, b"?")
+
+
+def test_close_is_echoed_and_raises():
+    code = struct.pack("!H", 1000)
+    rfile = _frames((OP_CLOSE, code + b"bye", True))
+    wfile = io.BytesIO()
+    with pytest.raises(ConnectionClosed):
+        read_message(rfile, wfile)
+    wfile.seek(0)
+    assert read_frame(wfile) == (True, OP_CLOSE, code)
+
+
+def test_truncated_frame_raises():
+    stream = io.BytesIO()
+    write_frame(stream, OP_BINARY, b"x" * 100)
+    with pytest.raises(ConnectionClosed):
+        read_frame(io.BytesIO(stream.getvalue()[:50]))
+
+
+def test_oversized_frame_is_rejected(monkeypatch):
+    monkeypatch.setattr(websocket, "MAX_MESSAGE_BYTES", 10)
+    stream = io.BytesIO()
+    write_frame(stream, OP_BINARY, b"x" * 11)
+    stream.seek(0)
+    with pytest.raises(ConnectionClosed):
+        read_frame(stream)
+
+
+def test_oversized_message_is_rejected(monkeypatch):
+    monkeypatch.setattr(websocket, "MAX_MESSAGE_BYTES", 10)
+    rfile = _frames((OP_BINARY, b"x" * 6, False), (OP_CONTINUATION, b"x" * 6, True))
+    with pytest.raises(ConnectionClosed):
+        read_message(rfile, io.BytesIO())
@@ -1,13 +1,11 @@
-import threading
 from tkinter import messagebox
 import warnings
 
-import torch
-
 from app.core.recorder import AudioRecorder
 from app.gui.components.waveform import WaveformVisualizer
-from app.gui.components.log_handler import TextBoxLogHandler
-recorder = AudioRecorder()
+from app.gui.components.spectrogram import SpectrogramView
+from app.gui.components.log_handler import LEVELS as LOG_LEVELS, TextBoxLogHandler, add_file_handler
+from app.gui.components.dispatcher import UIDispatcher
 
 # Suppress specific warning
 warnings.filterwarnings(
@@ -19,11 +17,14 @@ warnings.filterwarnings(
 
 import tkinter as tk
 
+from app.core.capture import CaptureEngine
 from app.core.recorder import AudioRecorder
 from app.core.transcriber import AudioTranscriber
 from app.core.emotion_analyzer import EmotionAnalyzer
 from app.core.text_processor import TextProcessor
 from app.core.text_analyzer import TextAnalyzer
+from app.core.translator import LANGUAGES, Translator
+from app.core.scheduler import JobScheduler, INTERACTIVE, MODEL
 from app.gui.handlers.export import export_transcription
 from app.gui.handlers.audio import start_recording, stop_recording, transcribe_with_progress, rename_audio_file
 from app.utils.config import get_styles
@@ -33,9 +34,9 @@ from app.gui.handlers.files import browse_directory, rename_transcription_file,
 from app.gui.layout.dashboard import open_new_dashboard
 from app.gui.layout.window import open_annotation_window
 from app.gui.components.setup import setup_tkdnd
+from app.gui.components.jobs_window import open_jobs_window
 import logging
 import warnings
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 import os
 from tkinterdnd2 import TkinterDnD
 import matplotlib
@@ -55,6 +56,7 @@ save_directory = os.getcwd()
 logging.info(f"Default save directory set to: {save_directory}")
 
 root = TkinterDnD.Tk()
+dispatcher = UIDispatcher(root).start()  # Worker threads update widgets only through this
 # Create a new horizontal frame
 main_frame = tk.Frame(root, bg="#2b2b2b")
 main_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -103,13 +105,16 @@ transcription_box = tk.Text(
 )
 transcription_box.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-recorder = AudioRecorder()
-transcriber = AudioTranscriber()
+capture_engine = CaptureEngine()  # One input stream shared by every audio consumer
+recorder = AudioRecorder(capture_engine)
+transcriber = AudioTranscriber(use_worker_process=True)  # Whisper decodes in its own process
 emotion_analyzer = EmotionAnalyzer()
+scheduler = JobScheduler()  # Every background job (transcription, batch, analysis) goes through here
 text_processor = TextProcessor()  # Will automatically load API key from .env if available
 waveform_frame = tk.Frame(root, bg="#2b2b2b")
 waveform_frame.pack(in_=main_frame, side=tk.RIGHT, padx=5)
-visualizer = WaveformVisualizer(waveform_frame)
+visualizer = WaveformVisualizer(waveform_frame, capture_engine)
+spectrogram = SpectrogramView(waveform_frame, capture_engine)  # Input level and spectrum while recording
 text_analyzer = TextAnalyzer()
 
 start_button = tk.Button(
@@ -118,76 +123,7 @@ start_button = tk.Button(
 start_button.pack(pady=3)
 
 # translation code start-----------------------------------------------------------------------------------------------------------------------------------------------------------------
-MODEL_NAME = "facebook/nllb-200-distilled-600M"  # Faster version of NLLB
-device = "cuda" if torch.cuda.is_available() else "cpu"
-
-try:
-    print(f"Loading NLLB-200 model ({MODEL_NAME}) on {device}...")
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME).to(device)
-    print("Model loaded successfully!")
-except Exception as e:
-    print(f"Failed to load NLLB model: {e}")
-    model, tokenizer = None, None
-
-#  Dictionary of Supported Languages (Including Indian Languages)
-LANGUAGES = {
-    "English": "eng_Latn",
-    "French": "fra_Latn",
-    "Spanish": "spa_Latn",
-    "German": "deu_Latn",
-    "Italian": "ita_Latn",
-    "Russian": "rus_Cyrl",
-    "Chinese": "zho_Hans",
-    # Indian Languages
-    "Hindi": "hin_Deva",
-    "Bengali": "ben_Beng",
-    "Tamil": "tam_Taml",
-    "Telugu": "tel_Telu",
-    "Marathi": "mar_Deva",
-    "Gujarati": "guj_Gujr",
-    "Punjabi": "pan_Guru",
-    "Malayalam": "mal_Mlym",
-    "Kannada": "kan_Knda",
-    "Odia": "ory_Orya",
-    "Urdu": "urd_Arab",
-}
-
-#Optimized translation function
-def translate_text_nllb(text, src_lang, tgt_lang):
-    if model is None or tokenizer is None:
-        return "Error: Model not loaded."
-
-    try:
-        # Convert language names to model-specific codes
-        src_lang_code = LANGUAGES.get(src_lang, "eng_Latn")
-        tgt_lang_code = LANGUAGES.get(tgt_lang, "hin_Deva")  # Default to Hindi
-
-        print(f"Translating from {src_lang} ({src_lang_code}) → {tgt_lang} ({tgt_lang_code})")
-
-        #  Set source language in tokenizer
-        tokenizer.src_lang = src_lang_code
-
-        # Encode input text
-        inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True).to(device)
-
-        #  Get `forced_bos_token_id` correctly
-        tgt_lang_id = tokenizer.convert_tokens_to_ids(tgt_lang_code)
-
-        if tgt_lang_id is None or tgt_lang_id == tokenizer.unk_token_id:
-            print(f"Error: Invalid target language ID for {tgt_lang_code}.")
-            return "Translation failed: Invalid target language."
-
-        # Generate translation
-        with torch.no_grad():
-            translated_tokens = model.generate(**inputs, forced_bos_token_id=tgt_lang_id)
-
-        translated_text = tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
-        return translated_text
-
-    except Exception as e:
-        print(f"Translation failed: {e}")
-        return f"Translation failed: {e}"
+translator = Translator()
 
 #  Translate the output_transcription.txt file
 def translate_file(src_lang, tgt_lang):
@@ -196,145 +132,7 @@ def translate_file(src_lang, tgt_lang):
     translated_file = os.path.join(save_directory, f"output_transcription_{tgt_lang}.txt")
 
     if not os.path.exists(transcription_file):
-        messagebox.showerror("Error", "No output_transcription file found. Please transcribe some audio first.")
-        return
-
-    try:
-        with open(transcription_file, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        if not content.strip():
-            messagebox.showerror("Error", "The output_transcription.txt file is empty.")
-            return
-
-        translated_text = translate_text_nllb(content, src_lang, tgt_lang)
-
-        with open(translated_file, "w", encoding="utf-8") as f:
-            f.write(translated_text)
-
-        messagebox.showinfo("Success", f"Translated file saved as output_transcription_{tgt_lang}.txt")
-
-    except Exception as e:
-        messagebox.showerror("Error", f"Translation failed: {e}")
-
-#  Asynchronous wrapper to prevent GUI from freezing
-def translate_async(src_lang, tgt_lang):
-    threading.Thread(target=lambda: translate_file(src_lang, tgt_lang), daemon=True).start()
-
-#  GUI for Translation
-def open_translation_dashboard():
-    save_directory = os.getcwd()
-    transcription_file = os.path.join(save_directory, "output_transcription.txt")
-
-    if not os.path.exists(transcription_file):
-        messagebox.showerror("Error", "No transcription file found. Please transcribe some audio first.")
-        return
-
-    # Create a new Tkinter window
-    dashboard = tk.Toplevel()
-    dashboard.title("Translate output_transcription.txt")
-    dashboard.geometry("300x300")
-
-    tk.Label(dashboard, text="Translate output_transcription.txt to:").pack(pady=10)
-
-    # Dropdown for source and target languages
-    tk.Label(dashboard, text="Source Language:").pack()
-    src_lang_var = tk.StringVar(dashboard)
-    src_lang_var.set("English")  # Default source language
-    src_lang_menu = tk.OptionMenu(dashboard, src_lang_var, *LANGUAGES.keys())
-    src_lang_menu.pack(pady=5)
-
-    tk.Label(dashboard, text="Target Language:").pack()
-    tgt_lang_var = tk.StringVar(dashboard)
-    tgt_lang_var.set("Hindi")  # Default target language
-    tgt_lang_menu = tk.OptionMenu(dashboard, tgt_lang_var, *LANGUAGES.keys())
-    tgt_lang_menu.pack(pady=5)
-
-    # Button to translate
-    translate_btn = tk.Button(dashboard, text="Translate", 
-                               command=lambda: translate_async(src_lang_var.get(), tgt_lang_var.get()))
-    translate_btn.pack(pady=10)
-
-    dashboard.mainloop()
-MODEL_NAME = "facebook/nllb-200-distilled-600M"  # Faster version of NLLB
-device = "cuda" if torch.cuda.is_available() else "cpu"
-
-try:
-    print(f"Loading NLLB-200 model ({MODEL_NAME}) on {device}...")
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME).to(device)
-    print("Model loaded successfully!")
-except Exception as e:
-    print(f"Failed to load NLLB model: {e}")
-    model, tokenizer = None, None
-
-#  Dictionary of Supported Languages (Including Indian Languages)
-LANGUAGES = {
-    "English": "eng_Latn",
-    "French": "fra_Latn",
-    "Spanish": "spa_Latn",
-    "German": "deu_Latn",
-    "Italian": "ita_Latn",
-    "Russian": "rus_Cyrl",
-    "Chinese": "zho_Hans",
-    # Indian Languages
-    "Hindi": "hin_Deva",
-    "Bengali": "ben_Beng",
-    "Tamil": "tam_Taml",
-    "Telugu": "tel_Telu",
-    "Marathi": "mar_Deva",
-    "Gujarati": "guj_Gujr",
-    "Punjabi": "pan_Guru",
-    "Malayalam": "mal_Mlym",
-    "Kannada": "kan_Knda",
-    "Odia": "ory_Orya",
-    "Urdu": "urd_Arab",
-}
-
-#  Optimized translation function
-def translate_text_nllb(text, src_lang, tgt_lang):
-    if model is None or tokenizer is None:
-        return "Error: Model not loaded."
-
-    try:
-        # Convert language names to model-specific codes
-        src_lang_code = LANGUAGES.get(src_lang, "eng_Latn")
-        tgt_lang_code = LANGUAGES.get(tgt_lang, "hin_Deva")  # Default to Hindi
-
-        print(f"Translating from {src_lang} ({src_lang_code}) → {tgt_lang} ({tgt_lang_code})")
-
-        # Set source language in tokenizer
-        tokenizer.src_lang = src_lang_code
-
-        # Encode input text
-        inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True).to(device)
-
-        #  Get `forced_bos_token_id` correctly
-        tgt_lang_id = tokenizer.convert_tokens_to_ids(tgt_lang_code)
-
-        if tgt_lang_id is None or tgt_lang_id == tokenizer.unk_token_id:
-            print(f"Error: Invalid target language ID for {tgt_lang_code}.")
-            return "Translation failed: Invalid target language."
-
-        # Generate translation
-        with torch.no_grad():
-            translated_tokens = model.generate(**inputs, forced_bos_token_id=tgt_lang_id)
-
-        translated_text = tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
-        return translated_text
-
-    except Exception as e:
-        print(f"Translation failed: {e}")
-        return f"Translation failed: {e}"
-
-# Translate the output_transcription.txt file
-def translate_file(src_lang, tgt_lang):
-    save_directory = os.getcwd()
-    transcription_file = os.path.join(save_directory, "output_transcription.txt")
-    translated_file = os.path.join(save_directory, f"output_transcription_{tgt_lang}.txt")
-
-    if not os.path.exists(transcription_file):
-        messagebox.showerror("Error", "No output_transcription file found. Please transcribe some audio first.")
+        dispatcher.post(messagebox.showerror, "Error", "No output_transcription file found. Please transcribe some audio first.")
         return
 
     try:
@@ -342,22 +140,22 @@ def translate_file(src_lang, tgt_lang):
             content = f.read()
 
         if not content.strip():
-            messagebox.showerror("Error", "The output_transcription.txt file is empty.")
+            dispatcher.post(messagebox.showerror, "Error", "The output_transcription.txt file is empty.")
             return
 
-        translated_text = translate_text_nllb(content, src_lang, tgt_lang)
+        translated_text = translator.translate(content, src_lang, tgt_lang)
 
         with open(translated_file, "w", encoding="utf-8") as f:
             f.write(translated_text)
 
-        messagebox.showinfo("Success", f"Translated file saved as output_transcription_{tgt_lang}.txt")
+        dispatcher.post(messagebox.showinfo, "Success", f"Translated file saved as output_transcription_{tgt_lang}.txt")
 
     except Exception as e:
-        messagebox.showerror("Error", f"Translation failed: {e}")
+        dispatcher.post(messagebox.showerror, "Error", f"Translation failed: {e}")
 
-# Asynchronous wrapper to prevent GUI from freezing
+#  Asynchronous wrapper to prevent GUI from freezing; user-triggered, so it gets the interactive slot over a bulk batch
 def translate_async(src_lang, tgt_lang):
-    threading.Thread(target=lambda: translate_file(src_lang, tgt_lang), daemon=True).start()
+    scheduler.submit(f"Translate to {tgt_lang}", lambda job: translate_file(src_lang, tgt_lang), MODEL, INTERACTIVE)
 
 #  GUI for Translation
 def open_translation_dashboard():
@@ -394,7 +192,6 @@ def open_translation_dashboard():
     translate_btn.pack(pady=10)
 
     dashboard.mainloop()
-
 #translation code end
 
 stop_button = tk.Button(
@@ -415,13 +212,28 @@ rename_audio_button = tk.Button(
 )
 rename_audio_button.pack(pady=3)
 
+# Live transcription toggle
+live_var = tk.BooleanVar(value=True)
+live_checkbox = tk.Checkbutton(
+    button_container,
+    text="Live Transcription",
+    variable=live_var,
+    bg="#2b2b2b",
+    fg="white",
+    selectcolor="#333333",
+    activebackground="#2b2b2b",
+    activeforeground="white",
+    font=("Helvetica", 10),
+)
+live_checkbox.pack(pady=3)
+
 root.title("Audio Recorder & Emotion Analyzer")
 root.geometry("1000x900")
 root.configure(bg="#2b2b2b")
 # root.tk.eval('package require tkdnd')
-Recording={"save_directory":save_directory,"recorder":recorder,"visualizer":visualizer,"start_button":start_button,"stop_button":stop_button,"transcribe_button":transcribe_button,"rename_audio_button":rename_audio_button,"rename_transcription_button":rename_transcription_button,"analyze_button":analyze_button,"transcription_box":transcription_box,"log_box":log_box,'root':root,'transcriber':transcriber}
-Analysis={'recorder':recorder,'emotion_analyzer':emotion_analyzer,'text_analyzer':text_analyzer,'text_processor':text_processor,'save_directory':save_directory,'transcription_box':transcription_box,'root':root}
-Files={"transcriber":transcriber,"transcription_box":transcription_box,"analyze_button":analyze_button,"root":root,"save_directory":save_directory}
+Recording={"save_directory":save_directory,"recorder":recorder,"visualizer":visualizer,"spectrogram":spectrogram,"start_button":start_button,"stop_button":stop_button,"transcribe_button":transcribe_button,"rename_audio_button":rename_audio_button,"rename_transcription_button":rename_transcription_button,"analyze_button":analyze_button,"transcription_box":transcription_box,"log_box":log_box,'root':root,'transcriber':transcriber,'live_var':live_var,'scheduler':scheduler,'dispatcher':dispatcher}
+Analysis={'recorder':recorder,'transcriber':transcriber,'emotion_analyzer':emotion_analyzer,'text_analyzer':text_analyzer,'text_processor':text_processor,'save_directory':save_directory,'transcription_box':transcription_box,'root':root,'scheduler':scheduler,'dispatcher':dispatcher}
+Files={"transcriber":transcriber,"transcription_box":transcription_box,"analyze_button":analyze_button,"root":root,"save_directory":save_directory,"scheduler":scheduler,"dispatcher":dispatcher,"batch_size":1}
 # Bind hotkeys
 root.bind("<d>", lambda event: browse_directory(Files))
 root.bind("<s>", lambda event: start_recording(Recording))
@@ -462,11 +274,15 @@ hotkey_label = tk.Label(
 )
 hotkey_label.pack(pady=5)
 # Configure logging to display in the log box
-log_handler = TextBoxLogHandler(log_box)
+log_handler = TextBoxLogHandler(log_box)  # Shows INFO and above; every level goes to the log file
 log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 logging.getLogger().addHandler(log_handler)
 logging.getLogger().setLevel(logging.DEBUG)
-Theme={"root":root,"main_frame":main_frame,"button_container":button_container,"waveform_frame":waveform_frame,"transcription_frame":transcription_frame,"text_container":text_container,"log_box":log_box,"transcription_box":transcription_box,"transcription_label":transcription_label,"hotkey_label":hotkey_label,"control_frame":control_frame,"visualizer":visualizer,'current_theme':current_theme}
+file_log_handler = add_file_handler()
+log_level_var = tk.StringVar(value="INFO")
+log_level_menu = tk.OptionMenu(button_container, log_level_var, *LOG_LEVELS.keys(), command=log_handler.set_display_level)
+log_level_menu.pack(after=log_box, pady=(0, 5))
+Theme={"root":root,"main_frame":main_frame,"button_container":button_container,"waveform_frame":waveform_frame,"transcription_frame":transcription_frame,"text_container":text_container,"log_box":log_box,"transcription_box":transcription_box,"transcription_label":transcription_label,"hotkey_label":hotkey_label,"control_frame":control_frame,"visualizer":visualizer,"spectrogram":spectrogram,'current_theme':current_theme}
 theme_button = tk.Button(
     button_container, 
     text="Toggle Theme", 
@@ -489,11 +305,21 @@ batch_button = tk.Button(
     
 )
 batch_button.pack(pady=3)
+# Checked: clips of up to 30 seconds are decoded 8 at a time in one batched pass
+batch_clips_var = tk.BooleanVar(value=False)
+batch_clips_check = tk.Checkbutton(
+    button_container, text="Batch short clips", variable=batch_clips_var,
+    command=lambda: Files.update(batch_size=8 if batch_clips_var.get() else 1)
+)
+batch_clips_check.pack(after=batch_button, pady=(0, 3))
 
 #Usage Dashboard Button
 dashboard_button = tk.Button(button_container, text="Usage Dashboard", command=lambda:open_new_dashboard(save_directory,root), **styles['button_style'])
 dashboard_button.pack(pady=3)
 
+jobs_button = tk.Button(button_container, text="Jobs", command=lambda:open_jobs_window(root, scheduler), **styles['button_style'])
+jobs_button.pack(pady=3)
+
 analyze_text_button = tk.Button(button_container, text="Analyze Text", command=lambda:analyze_text_content(Analysis), bg="#4caf50", fg="white", font=("Helvetica", 9, "bold"), bd=3)
 analyze_text_button.pack(side=tk.LEFT, padx=5)
 
@@ -520,4 +346,7 @@ scrollbar.config(command=transcription_box.yview)
 
 setup_tkdnd(root)
 
-root.mainloop()
\ No newline at end of file
+root.mainloop()
+scheduler.shutdown()
+logging.getLogger().removeHandler(log_handler)
+transcriber.close()
\ No newline at end of file